@@ -0,0 +1,115 @@
+"""
+Атомарная запись файлов.
+
+Данные записываются во временный файл в той же директории и сбрасываются на диск,
+после чего временный файл переименовывается в целевой. Поэтому читатели видят
+либо прежнюю, либо новую версию файла целиком, но не частично записанный файл,
+в том числе после сбоя во время записи.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+# права доступа к записанным файлам (mkstemp создает файлы с правами 0600)
+FILE_MODE = 0o644
+
+
+def create_temp(file_path: str) -> str:
+    """
+    Создание пустого временного файла рядом с целевым файлом.
+
+    :param file_path: Путь к целевому файлу
+    :return: Путь к временному файлу
+    """
+
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp"
+    )
+    os.fchmod(handle, FILE_MODE)
+    os.close(handle)
+
+    return temp_path
+
+
+def commit(temp_path: str, file_path: str) -> None:
+    """
+    Замена целевого файла записанным и сброшенным на диск временным файлом.
+
+    :param temp_path: Путь к временному файлу
+    :param file_path: Путь к целевому файлу
+    :return:
+    """
+
+    os.replace(temp_path, file_path)
+    # сохранение записи о переименовании файла в директории
+    fsync_path(os.path.dirname(file_path) or ".")
+
+
+def discard(temp_path: str) -> None:
+    """
+    Удаление временного файла, если он существует.
+
+    :param temp_path: Путь к временному файлу
+    :return:
+    """
+
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def fsync_path(path: str) -> None:
+    """
+    Сброс на диск содержимого и метаданных файла или изменений в директории.
+
+    :param path: Путь к файлу или директории
+    :return:
+    """
+
+    handle = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(handle)
+    finally:
+        os.close(handle)
+
+
+@contextmanager
+def open_atomic(file_path: str, mode: str = "wb") -> Iterator[IO]:
+    """
+    Открытие файла для атомарной записи.
+    Файл заменяется только при успешном завершении блока.
+
+    :param file_path: Путь к целевому файлу
+    :param mode: Режим открытия файла для записи (``wb`` или ``w``)
+    :return:
+    """
+
+    temp_path = create_temp(file_path)
+    try:
+        with open(temp_path, mode) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+
+        commit(temp_path, file_path)
+    except BaseException:
+        discard(temp_path)
+        raise
+
+
+def write_text(file_path: str, content: str) -> None:
+    """
+    Атомарная запись текстового файла.
+
+    :param file_path: Путь к файлу
+    :param content: Содержимое файла
+    :return:
+    """
+
+    with open_atomic(file_path, mode="w") as file:
+        file.write(content)
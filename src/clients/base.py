@@ -2,8 +2,176 @@
 Базовые функции для клиентов внешних сервисов.
 """
 
+import asyncio
+import hashlib
+import logging
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiofiles.threadpool.binary import AsyncBufferedIOBase
+
+import jsonlib
+from logger import trace_config
+from settings import (
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+    HTTP_CHUNK_SIZE,
+    HTTP_CONNECTIONS_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_RETRIES,
+    HTTP_TIMEOUT,
+)
+
+T = TypeVar("T")
+
+# коды ответов, при получении которых запрос выполняется повторно
+RETRY_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+
+@dataclass
+class CacheValidators:
+    """
+    Валидаторы сохраненного ответа внешнего сервиса для условных запросов.
+
+    Сервис может не изменять данные между обновлениями кэша. Тогда вместо полного
+    ответа он возвращает код 304 по заголовкам ``ETag`` / ``Last-Modified``,
+    а если сервис их не поддерживает, то совпадение определяется по хэшу ответа.
+    """
+
+    # значение заголовка ETag
+    etag: Optional[str] = None
+    # значение заголовка Last-Modified
+    last_modified: Optional[str] = None
+    # хэш SHA-256 тела ответа
+    content_hash: Optional[str] = None
+    # признак того, что данные не изменились с момента сохранения
+    not_modified: bool = False
+
+    def get_headers(self) -> dict[str, str]:
+        """
+        Получение заголовков условного запроса.
+
+        :return:
+        """
+
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def update(self, response: aiohttp.ClientResponse, content_hash: str) -> bool:
+        """
+        Обновление валидаторов значениями из ответа внешнего сервиса.
+
+        :param response: Ответ внешнего сервиса
+        :param content_hash: Хэш SHA-256 тела ответа
+        :return: False, если тело ответа не изменилось
+        """
+
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        if content_hash == self.content_hash:
+            # сервис не поддерживает условные запросы, но данные не изменились
+            self.not_modified = True
+            return False
+
+        self.content_hash = content_hash
+
+        return True
+
+    def to_dict(self) -> dict[str, Optional[str]]:
+        """
+        Получение валидаторов для сохранения рядом с файлом кэша.
+
+        :return:
+        """
+
+        return {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "content_hash": self.content_hash,
+        }
+
+
+class TokenBucket:
+    """
+    Ограничение частоты запросов к внешнему сервису по алгоритму «маркерной корзины».
+
+    Маркеры пополняются с постоянной скоростью, каждый запрос расходует один маркер.
+    Если маркеров нет, то запрос ожидает их пополнения.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """
+        Конструктор.
+
+        :param rate: Количество запросов в секунду (0 – без ограничений)
+        :param capacity: Максимальное количество запросов, выполняемых без ожидания
+        """
+
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # время, до которого запросы приостановлены по требованию внешнего сервиса
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Получение разрешения на выполнение запроса.
+
+        :return:
+        """
+
+        async with self._lock:
+            while (delay := self.paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+
+            if self.rate <= 0:
+                return
+
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, delay: float) -> None:
+        """
+        Приостановка всех запросов к внешнему сервису.
+
+        :param delay: Время приостановки (в секундах)
+        :return:
+        """
+
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
 
 
 class BaseClient(ABC):
@@ -11,6 +179,79 @@ class BaseClient(ABC):
     Базовый класс, реализующий интерфейс для клиентов.
     """
 
+    # общая для всех клиентов сессия с пулом соединений
+    _session: Optional[aiohttp.ClientSession] = None
+    # цикл событий, к которому привязана сессия
+    _session_loop: Optional[asyncio.AbstractEventLoop] = None
+    # ограничители частоты запросов для каждого внешнего сервиса
+    _buckets: dict[str, TokenBucket] = {}
+
+    # название внешнего сервиса, общее для клиентов с одной квотой запросов
+    provider: str = ""
+    # ограничение частоты запросов к внешнему сервису (запросов в секунду)
+    rate_limit: float = 0
+    # количество запросов к внешнему сервису, выполняемых без ожидания
+    # (0 – равно ограничению частоты)
+    rate_burst: float = 0
+
+    @staticmethod
+    async def get_session() -> aiohttp.ClientSession:
+        """
+        Получение общей сессии для выполнения запросов.
+        Сессия создается при первом обращении и переиспользуется всеми клиентами
+        до вызова :meth:`close_session`.
+
+        :return:
+        """
+
+        loop = asyncio.get_running_loop()
+        if (
+            BaseClient._session is None
+            or BaseClient._session.closed
+            or BaseClient._session_loop is not loop
+        ):
+            connector = aiohttp.TCPConnector(
+                limit_per_host=HTTP_CONNECTIONS_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            )
+            BaseClient._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[trace_config]
+            )
+            BaseClient._session_loop = loop
+
+        return BaseClient._session
+
+    @staticmethod
+    async def close_session() -> None:
+        """
+        Закрытие общей сессии и всех открытых соединений.
+
+        :return:
+        """
+
+        if BaseClient._session is not None and not BaseClient._session.closed:
+            await BaseClient._session.close()
+
+        BaseClient._session = None
+        BaseClient._session_loop = None
+        BaseClient._buckets.clear()
+
+    def get_bucket(self) -> TokenBucket:
+        """
+        Получение ограничителя частоты запросов для внешнего сервиса клиента.
+
+        :return:
+        """
+
+        key = self.provider or type(self).__name__
+        if key not in BaseClient._buckets:
+            BaseClient._buckets[key] = TokenBucket(
+                self.rate_limit, self.rate_burst or None
+            )
+
+        return BaseClient._buckets[key]
+
     @abstractmethod
     async def get_base_url(self) -> str:
         """
@@ -27,3 +268,212 @@ class BaseClient(ABC):
         :param endpoint:
         :return:
         """
+
+    async def _fetch(
+        self, endpoint: str, headers: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        Выполнение GET-запроса и разбор ответа в формате JSON.
+
+        :param endpoint: URL запроса
+        :param headers: Заголовки запроса
+        :return: Данные ответа или None, если их не удалось получить
+        """
+
+        async def read(response: aiohttp.ClientResponse) -> Optional[dict]:
+            return await response.json(loads=jsonlib.loads)
+
+        return await self._send(endpoint, read, headers)
+
+    async def _download(
+        self,
+        endpoint: str,
+        file: AsyncBufferedIOBase,
+        headers: Optional[dict] = None,
+        validators: Optional[CacheValidators] = None,
+    ) -> bool:
+        """
+        Выполнение GET-запроса с записью тела ответа в файл по частям,
+        без разбора и хранения всего ответа в памяти.
+
+        :param endpoint: URL запроса
+        :param file: Файл, открытый для записи в двоичном режиме
+        :param headers: Заголовки запроса
+        :param validators: Валидаторы сохраненного ответа
+        :return: True, если в файл записан полный непустой ответ в формате JSON
+        """
+
+        async def stream(response: aiohttp.ClientResponse) -> Optional[bool]:
+            return await self._stream(response, file, validators)
+
+        return bool(await self._send(endpoint, stream, headers, validators))
+
+    async def _send(
+        self,
+        endpoint: str,
+        handler: Callable[[aiohttp.ClientResponse], Awaitable[Optional[T]]],
+        headers: Optional[dict] = None,
+        validators: Optional[CacheValidators] = None,
+    ) -> Optional[T]:
+        """
+        Выполнение GET-запроса с ограничением частоты, тайм-аутом и повторными попытками.
+
+        Запрос повторяется при сетевых ошибках, тайм-ауте и ответах из
+        :data:`RETRY_STATUSES` с экспоненциально растущей случайной паузой.
+        Если сервис передал заголовок ``Retry-After``, то пауза не меньше указанной,
+        а при ответе 429 приостанавливаются все запросы к этому сервису. Если указанная
+        пауза больше ``HTTP_BACKOFF_MAX``, то запрос не повторяется и возвращается
+        None, чтобы использовались сохраненные ранее данные.
+
+        Если переданы валидаторы, то запрос выполняется условным. Когда данные
+        не изменились (ответ 304 или тот же хэш тела ответа), возвращается None,
+        а у валидаторов устанавливается признак ``not_modified``. После успешного
+        запроса валидаторы обновляются значениями из ответа.
+
+        :param endpoint: URL запроса
+        :param handler: Функция обработки успешного ответа
+        :param headers: Заголовки запроса
+        :param validators: Валидаторы сохраненного ответа
+        :return: Результат обработки ответа или None, если его не удалось получить
+        """
+
+        session = await self.get_session()
+        bucket = self.get_bucket()
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+        if validators is not None:
+            headers = {**(headers or {}), **validators.get_headers()}
+
+        for attempt in range(HTTP_RETRIES + 1):
+            await bucket.acquire()
+            retry_after = None
+            try:
+                async with session.get(
+                    endpoint, headers=headers, timeout=timeout
+                ) as response:
+                    if (
+                        response.status == HTTPStatus.NOT_MODIFIED
+                        and validators is not None
+                    ):
+                        validators.not_modified = True
+                        return None
+                    if response.status == HTTPStatus.OK:
+                        return await handler(response)
+                    if response.status not in RETRY_STATUSES:
+                        return None
+
+                    retry_after = self.parse_retry_after(
+                        response.headers.get("Retry-After")
+                    )
+                    if retry_after is not None and retry_after > HTTP_BACKOFF_MAX:
+                        # ожидание дольше допустимого: используются сохраненные данные
+                        logging.warning(
+                            "Запрос к %s завершился с кодом %s, повтор через %s с "
+                            "превышает допустимую паузу.",
+                            response.url.host,
+                            response.status,
+                            retry_after,
+                        )
+                        return None
+                    if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+                        bucket.pause(retry_after or self.get_backoff(attempt))
+
+                    logging.warning(
+                        "Запрос к %s завершился с кодом %s (попытка %s).",
+                        response.url.host,
+                        response.status,
+                        attempt + 1,
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                logging.warning(
+                    "Ошибка запроса к %s: %r (попытка %s).",
+                    urlsplit(endpoint).hostname,
+                    error,
+                    attempt + 1,
+                )
+
+            if attempt < HTTP_RETRIES:
+                await asyncio.sleep(max(retry_after or 0, self.get_backoff(attempt)))
+
+        return None
+
+    @staticmethod
+    async def _stream(
+        response: aiohttp.ClientResponse,
+        file: AsyncBufferedIOBase,
+        validators: Optional[CacheValidators],
+    ) -> Optional[bool]:
+        """
+        Запись тела ответа в файл по частям с вычислением хэша и проверкой
+        того, что получен полный ответ в формате JSON. Ответ, прошедший быструю
+        проверку границ, разбирается полностью из записанного файла в отдельном потоке.
+
+        :param response: Ответ внешнего сервиса
+        :param file: Файл, открытый для записи в двоичном режиме
+        :param validators: Валидаторы сохраненного ответа
+        :return: True, если ответ записан, None, если он некорректен или не изменился
+        """
+
+        # при повторной попытке ранее записанная часть ответа отбрасывается
+        await file.seek(0)
+        await file.truncate()
+
+        digest = hashlib.sha256()
+        check = jsonlib.JSONStreamCheck()
+        async for chunk in response.content.iter_chunked(HTTP_CHUNK_SIZE):
+            digest.update(chunk)
+            check.feed(chunk)
+            await file.write(chunk)
+
+        await file.flush()
+        if not check.is_valid() or not await asyncio.to_thread(
+            jsonlib.check_file, file.name
+        ):
+            logging.warning(
+                "Некорректный ответ от %s (%s байт).", response.url.host, check.size
+            )
+
+            return None
+
+        if validators is not None and not validators.update(
+            response, digest.hexdigest()
+        ):
+            return None
+
+        return True
+
+    @staticmethod
+    def get_backoff(attempt: int) -> float:
+        """
+        Получение паузы перед повторной попыткой («full jitter»).
+
+        :param attempt: Номер попытки, начиная с 0
+        :return:
+        """
+
+        return random.uniform(
+            0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2**attempt)
+        )
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Разбор значения заголовка ``Retry-After`` (количество секунд или дата).
+
+        :param value: Значение заголовка
+        :return: Время ожидания (в секундах)
+        """
+
+        if not value:
+            return None
+
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        return max((date - datetime.now(timezone.utc)).total_seconds(), 0)
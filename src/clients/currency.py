@@ -1,14 +1,12 @@
 """
 Функции для взаимодействия с внешним сервисом-провайдером данных о курсах валют.
 """
-from http import HTTPStatus
 from typing import Optional
 
-import aiohttp
+from aiofiles.threadpool.binary import AsyncBufferedIOBase
 
-from clients.base import BaseClient
-from logger import trace_config
-from settings import API_KEY_APILAYER
+from clients.base import BaseClient, CacheValidators
+from settings import API_KEY_APILAYER, RATE_LIMIT_APILAYER, RATE_LIMIT_APILAYER_BURST
 
 
 class CurrencyClient(BaseClient):
@@ -16,6 +14,10 @@ class CurrencyClient(BaseClient):
     Реализация функций для взаимодействия с внешним сервисом-провайдером данных о курсах валют.
     """
 
+    provider = "apilayer"
+    rate_limit = RATE_LIMIT_APILAYER
+    rate_burst = RATE_LIMIT_APILAYER_BURST
+
     async def get_base_url(self) -> str:
         return "https://api.apilayer.com/fixer/latest"
 
@@ -24,12 +26,7 @@ class CurrencyClient(BaseClient):
         # формирование заголовков запроса
         headers = {"apikey": API_KEY_APILAYER}
 
-        async with aiohttp.ClientSession(trace_configs=[trace_config]) as session:
-            async with session.get(endpoint, headers=headers) as response:
-                if response.status == HTTPStatus.OK:
-                    return await response.json()
-
-                return None
+        return await self._fetch(endpoint, headers=headers)
 
     async def get_rates(self, base: str = "rub") -> Optional[dict]:
         """
@@ -40,3 +37,25 @@ class CurrencyClient(BaseClient):
         """
 
         return await self._request(f"{await self.get_base_url()}?base={base}")
+
+    async def download_rates(
+        self,
+        file: AsyncBufferedIOBase,
+        base: str = "rub",
+        validators: Optional[CacheValidators] = None,
+    ) -> bool:
+        """
+        Загрузка данных о курсах валют с записью ответа в файл без его разбора.
+
+        :param file: Файл, открытый для записи в двоичном режиме
+        :param base: Базовая валюта
+        :param validators: Валидаторы сохраненного ответа для условного запроса
+        :return: True, если данные записаны в файл
+        """
+
+        return await self._download(
+            f"{await self.get_base_url()}?base={base}",
+            file,
+            headers={"apikey": API_KEY_APILAYER},
+            validators=validators,
+        )
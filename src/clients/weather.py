@@ -1,14 +1,14 @@
 """
 Функции для взаимодействия с внешним сервисом-провайдером данных о погоде.
 """
-from http import HTTPStatus
 from typing import Optional
 
-import aiohttp
-
 from clients.base import BaseClient
-from logger import trace_config
-from settings import API_KEY_OPENWEATHER
+from settings import (
+    API_KEY_OPENWEATHER,
+    RATE_LIMIT_OPENWEATHER,
+    RATE_LIMIT_OPENWEATHER_BURST,
+)
 
 
 class WeatherClient(BaseClient):
@@ -16,17 +16,24 @@ class WeatherClient(BaseClient):
     Реализация функций для взаимодействия с внешним сервисом-провайдером данных о погоде.
     """
 
+    provider = "openweather"
+    rate_limit = RATE_LIMIT_OPENWEATHER
+    rate_burst = RATE_LIMIT_OPENWEATHER_BURST
+
     async def get_base_url(self) -> str:
         return "https://api.openweathermap.org/data/2.5/weather"
 
     async def _request(self, endpoint: str) -> Optional[dict]:
+        return await self._fetch(endpoint)
 
-        async with aiohttp.ClientSession(trace_configs=[trace_config]) as session:
-            async with session.get(endpoint) as response:
-                if response.status == HTTPStatus.OK:
-                    return await response.json()
+    async def get_group_url(self) -> str:
+        """
+        Получение адреса для группового запроса данных о погоде по идентификаторам городов.
 
-                return None
+        :return:
+        """
+
+        return f"{(await self.get_base_url()).rsplit('/', 1)[0]}/group"
 
     async def get_weather(self, location: str) -> Optional[dict]:
         """
@@ -39,3 +46,21 @@ class WeatherClient(BaseClient):
         return await self._request(
             f"{await self.get_base_url()}?units=metric&q={location}&appid={API_KEY_OPENWEATHER}"
         )
+
+    async def get_weather_group(self, city_ids: list[int]) -> Optional[dict[int, dict]]:
+        """
+        Получение данных о погоде для нескольких городов одним запросом.
+        Сервис обрабатывает не более 20 идентификаторов в одном запросе.
+
+        :param city_ids: Идентификаторы городов
+        :return: Идентификатор города -> данные о погоде
+        """
+
+        result = await self._request(
+            f"{await self.get_group_url()}?units=metric"
+            f"&id={','.join(map(str, city_ids))}&appid={API_KEY_OPENWEATHER}"
+        )
+        if result is None:
+            return None
+
+        return {item["id"]: item for item in result.get("list", [])}
@@ -3,11 +3,38 @@
 """
 import logging
 
+import asyncclick as click
+
 from collectors.collector import Collectors
+from collectors.scheduler import Scheduler
+
+
+@click.command()
+@click.option(
+    "--daemon",
+    "-d",
+    "daemon",
+    is_flag=True,
+    help="Запуск в режиме службы с обновлением данных по истечении срока их актуальности",
+)
+async def process_collect(daemon: bool) -> None:
+    """
+    Обновление данных о странах, курсах валют и погоде.
+
+    :param bool daemon: Запуск в режиме службы
+    """
+
+    if daemon:
+        logging.info("Запуск службы обновления данных ...")
+        await Scheduler().run()
+    else:
+        logging.info("Запуск обновления данных ...")
+        await Collectors.run()
+
+        logging.info("Обновление завершено.")
+
 
 if __name__ == "__main__":
-    logging.info("Запуск обновления данных ...")
     # запуск обработки
-    Collectors().collect()
-
-    logging.info("Обновление завершено.")
+    # pylint: disable=E1120
+    process_collect(_anyio_backend="asyncio")
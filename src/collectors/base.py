@@ -1,12 +1,49 @@
 """
 Базовые функции сборщиков информации о странах.
 """
+import asyncio
+import fcntl
+import os
 import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import Iterable, Any, Optional
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Any, Optional
 
 import aiofiles
 import aiofiles.os
+from aiofiles.threadpool.binary import AsyncBufferedIOBase
+
+import atomic
+import jsonlib
+from clients.base import CacheValidators
+from metrics import metrics
+
+
+# интервал повторных попыток захвата межпроцессной блокировки (в секундах)
+LOCK_POLL_INTERVAL = 0.1
+
+
+class CacheState(Enum):
+    """
+    Состояние данных в кэше.
+    """
+
+    # данные актуальны
+    FRESH = "fresh"
+    # срок актуальности истек, но данные еще можно использовать до их обновления
+    STALE = "stale"
+    # данные отсутствуют
+    MISSING = "missing"
+
+
+# результат обращения к кэшу для показателей
+CACHE_LOOKUP_RESULTS = {
+    CacheState.FRESH: "hit",
+    CacheState.STALE: "stale",
+    CacheState.MISSING: "miss",
+}
 
 
 class BaseCollector(ABC):
@@ -14,6 +51,12 @@ class BaseCollector(ABC):
     Базовый класс, реализующий интерфейс для сборщиков информации.
     """
 
+    # блокировки обновления кэша внутри процесса по пути к файлу,
+    # удаляются автоматически, когда ни одна задача их не использует
+    _locks: weakref.WeakValueDictionary[
+        str, asyncio.Lock
+    ] = weakref.WeakValueDictionary()
+
     @abstractmethod
     async def collect(self, **kwargs: Any) -> Optional[Iterable[Any]]:
         ...
@@ -36,22 +79,251 @@ class BaseCollector(ABC):
         :return: bool
         """
 
+        return await self.cache_state(**kwargs) is not CacheState.FRESH
+
+    async def cache_state(self, **kwargs: Any) -> CacheState:
+        """
+        Получение состояния данных в кэше.
+        Устаревшие данные (:attr:`CacheState.STALE`) остаются доступными для чтения,
+        пока не будут заменены актуальными.
+
+        :return: CacheState
+        """
+
+        state = self.get_cache_state(await self.get_cache_expires_in(**kwargs))
+        self.count_cache_lookup(state)
+
+        return state
+
+    @staticmethod
+    def get_cache_state(expires_in: float) -> CacheState:
+        """
+        Получение состояния данных в кэше по времени до истечения срока актуальности.
+
+        :param expires_in: Время до истечения срока актуальности (в секундах)
+        :return:
+        """
+
+        if not expires_in:
+            # файл не существует или он пустой
+            return CacheState.MISSING
+        if expires_in < 0:
+            # срок актуальности кэша истек
+            return CacheState.STALE
+
+        return CacheState.FRESH
+
+    def count_cache_lookup(self, state: CacheState, count: int = 1) -> None:
+        """
+        Учет обращений к кэшу в показателях (попадание, промах, устаревшие данные).
+
+        :param state: Состояние данных в кэше
+        :param count: Количество обращений
+        :return:
+        """
+
+        metrics.inc(
+            "cache_lookups_total",
+            count,
+            collector=type(self).__name__,
+            result=CACHE_LOOKUP_RESULTS[state],
+        )
+
+    async def get_cache_expires_in(self, **kwargs: Any) -> float:
+        """
+        Получение времени (в секундах), оставшегося до истечения срока актуальности кэша.
+        Если файл отсутствует или пуст, то возвращается 0,
+        если срок актуальности уже истек, то возвращается отрицательное значение.
+
+        :return: float
+        """
+
+        file_path = await self.get_file_path(**kwargs)
+
+        try:
+            stat = await aiofiles.os.stat(file_path)
+        except FileNotFoundError:
+            return 0
+
+        if not stat.st_size:
+            return 0
+
+        return stat.st_mtime + await self.get_cache_ttl() - time.time()
+
+    async def update_cache(
+        self,
+        download: Callable[[AsyncBufferedIOBase, CacheValidators], Awaitable[bool]],
+        **kwargs: Any,
+    ) -> Optional[bool]:
+        """
+        Актуализация файла кэша условным запросом к внешнему сервису.
+
+        Обновление выполняется под блокировкой файла кэша (:meth:`cache_lock`),
+        поэтому одновременные обновления одного файла в разных задачах и процессах
+        выполняют один запрос к внешнему сервису и одну запись.
+
+        Если данные у внешнего сервиса не изменились, то файл не перезаписывается,
+        а только обновляется время его изменения, продлевающее срок актуальности.
+
+        :param download: Функция записи ответа внешнего сервиса в файл
+            с учетом валидаторов
+        :return: True – данные обновлены, False – данные не изменились
+            или уже обновлены другим сборщиком, None – данные не удалось получить
+        """
+
         file_path = await self.get_file_path(**kwargs)
+        async with self.cache_lock(file_path):
+            # пока ожидалась блокировка, данные могли обновить в другой задаче
+            state = self.get_cache_state(await self.get_cache_expires_in(**kwargs))
+            if state is CacheState.FRESH:
+                return False
 
-        if (
-            # проверка существования файла
-            # (если файл не существует)
-            not await aiofiles.os.path.isfile(file_path)
-            # проверка наличия содержимого в файле без валидации структуры и значений
-            # (или если файл существует, но он пустой)
-            or not await aiofiles.os.path.getsize(file_path)
-            # проверка срока актуальности кэша
-            # путем сравнения разницы между текущим временем
-            # и времени последнего изменения файла
-            # (или если файл существует и не пустой, но данные в нем уже устарели)
-            or (time.time() - await aiofiles.os.path.getmtime(file_path))
-            > await self.get_cache_ttl()
-        ):
+            # валидаторы имеют смысл, только если сохраненные данные еще есть
+            if state is CacheState.STALE:
+                validators = await self.read_validators(file_path)
+            else:
+                validators = CacheValidators()
+
+            # ответ записывается в файл кэша без разбора и повторной сериализации
+            if await self.write_cache_stream(
+                file_path, lambda file: download(file, validators)
+            ):
+                await self.write_cache(
+                    self.get_validators_path(file_path),
+                    jsonlib.dumps(validators.to_dict()),
+                )
+
+                return True
+
+            if validators.not_modified:
+                await asyncio.to_thread(os.utime, file_path)
+
+                return False
+
+            return None
+
+    @staticmethod
+    @asynccontextmanager
+    async def cache_lock(file_path: str) -> AsyncIterator[None]:
+        """
+        Блокировка обновления файла кэша.
+
+        Внутри процесса задачи ожидают общую блокировку :class:`asyncio.Lock`,
+        а между процессами (например, при пересечении запусков ``collect.py``)
+        используется блокировка ``flock`` файла ``.<имя файла>.lock``
+        в директории файла кэша.
+
+        :param file_path: Путь к файлу кэша
+        :return:
+        """
+
+        lock = BaseCollector._locks.get(file_path)
+        if lock is None:
+            lock = BaseCollector._locks[file_path] = asyncio.Lock()
+
+        directory, filename = os.path.split(file_path)
+        await aiofiles.os.makedirs(directory or ".", exist_ok=True)
+
+        async with lock:
+            handle = os.open(
+                os.path.join(directory, f".{filename}.lock"), os.O_RDWR | os.O_CREAT
+            )
+            try:
+                while True:
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        # блокировка удерживается другим процессом
+                        await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+                yield
+            finally:
+                # блокировка снимается при закрытии файла
+                os.close(handle)
+
+    @staticmethod
+    def get_validators_path(file_path: str) -> str:
+        """
+        Получение пути к файлу с валидаторами, сохраненному рядом с файлом кэша.
+
+        :param file_path: Путь к файлу кэша
+        :return:
+        """
+
+        directory, filename = os.path.split(file_path)
+
+        return os.path.join(directory, f".{filename}.validators")
+
+    @staticmethod
+    async def read_validators(file_path: str) -> CacheValidators:
+        """
+        Чтение валидаторов сохраненного ответа внешнего сервиса.
+        Если их нет или они повреждены, то запрос выполняется безусловным.
+
+        :param file_path: Путь к файлу кэша
+        :return:
+        """
+
+        try:
+            async with aiofiles.open(
+                BaseCollector.get_validators_path(file_path), mode="r"
+            ) as file:
+                content = jsonlib.loads(await file.read())
+
+            return CacheValidators(
+                etag=content.get("etag"),
+                last_modified=content.get("last_modified"),
+                content_hash=content.get("content_hash"),
+            )
+        except (OSError, ValueError, AttributeError):
+            return CacheValidators()
+
+    @staticmethod
+    async def write_cache(file_path: str, content: str) -> None:
+        """
+        Атомарная запись данных в файл кэша (см. :meth:`write_cache_stream`).
+
+        :param file_path: Путь к файлу кэша
+        :param content: Содержимое файла
+        :return:
+        """
+
+        async def write(file: AsyncBufferedIOBase) -> bool:
+            await file.write(content.encode())
             return True
 
-        return False
+        await BaseCollector.write_cache_stream(file_path, write)
+
+    @staticmethod
+    async def write_cache_stream(
+        file_path: str, writer: Callable[[AsyncBufferedIOBase], Awaitable[bool]]
+    ) -> bool:
+        """
+        Атомарная запись данных в файл кэша (см. :mod:`atomic`)
+        с записью ответа внешнего сервиса по частям.
+
+        :param file_path: Путь к файлу кэша
+        :param writer: Функция записи данных в файл, открытый в двоичном режиме;
+            если она возвращает False, то файл кэша не изменяется
+        :return: True, если файл кэша записан
+        """
+
+        temp_path = atomic.create_temp(file_path)
+        try:
+            async with aiofiles.open(temp_path, mode="wb") as file:
+                written = await writer(file)
+                if written:
+                    await file.flush()
+                    await asyncio.to_thread(os.fsync, file.fileno())
+
+            if written:
+                await asyncio.to_thread(atomic.commit, temp_path, file_path)
+        except BaseException:
+            atomic.discard(temp_path)
+            raise
+
+        if not written:
+            atomic.discard(temp_path)
+
+        return bool(written)
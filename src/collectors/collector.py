@@ -5,113 +5,217 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import Any, Optional, FrozenSet
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, Iterable, Optional, FrozenSet
 
 import aiofiles
 import aiofiles.os
+from pydantic import ValidationError
 
+import jsonlib
+from clients.base import BaseClient
 from clients.country import CountryClient
 from clients.currency import CurrencyClient
 from clients.weather import WeatherClient
-from collectors.base import BaseCollector
+from collectors.base import BaseCollector, CacheState
 from collectors.models import (
     LocationDTO,
     CountryDTO,
-    CurrencyRatesDTO,
     CurrencyInfoDTO,
-    WeatherInfoDTO,
 )
+from collectors.readers import CountryReader, CurrencyRatesReader, WeatherReader
+from collectors.refresh import RefreshQueue
+from collectors.store import store
+from metrics import metrics
 from settings import (
-    MEDIA_PATH,
-    CACHE_TTL_COUNTRY,
-    CACHE_TTL_CURRENCY_RATES,
-    CACHE_TTL_WEATHER,
+    COUNTRY_BLOCS,
+    CURRENCY_RATES_BASE,
+    WEATHER_CONCURRENCY_LIMIT,
+    WEATHER_GROUP_SIZE,
+    WEATHER_REFRESH_JITTER,
 )
 
 
-class CountryCollector(BaseCollector):
+class CountryCollector(CountryReader, BaseCollector):
     """
     Сбор информации о странах (географическое описание).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, blocs: Optional[list[str]] = None) -> None:
+        """
+        Конструктор.
+
+        :param blocs: Список регионов, по умолчанию – из настроек
+        """
+
         self.client = CountryClient()
+        self.blocs = blocs or COUNTRY_BLOCS
 
-    @staticmethod
-    async def get_file_path(**kwargs: Any) -> str:
-        return f"{MEDIA_PATH}/country.json"
+    async def get_cache_expires_in(self, **kwargs: Any) -> float:
+        if "bloc" in kwargs:
+            return await super().get_cache_expires_in(**kwargs)
 
-    @staticmethod
-    async def get_cache_ttl() -> int:
-        return CACHE_TTL_COUNTRY
+        # объединенные данные актуальны, пока актуальны данные всех регионов
+        expires_in = []
+        for bloc in self.blocs:
+            expires_in.append(await super().get_cache_expires_in(bloc=bloc))
+
+        return min(expires_in)
 
+    @metrics.timed("collector_duration_seconds")
     async def collect(self, **kwargs: Any) -> Optional[FrozenSet[LocationDTO]]:
-        if await self.cache_invalid():
-            # если кэш уже невалиден, то актуализируем его
-            result = await self.client.get_countries()
-            if result:
-                result_str = json.dumps(result)
-                async with aiofiles.open(await self.get_file_path(), mode="w") as file:
-                    await file.write(result_str)
-
-        # получение данных из кэша
-        async with aiofiles.open(await self.get_file_path(), mode="r") as file:
-            content = await file.read()
-
-        result = json.loads(content)
-        if result:
-            locations = frozenset(
-                LocationDTO(
-                    capital=item["capital"],
-                    alpha2code=item["alpha2code"],
-                )
-                for item in result
+        # регионы обновляются одновременно и независимо друг от друга
+        refreshed = await asyncio.gather(
+            *(self.collect_bloc(bloc) for bloc in self.blocs)
+        )
+        # объединение повторяется и при изменении списка регионов в настройках
+        if (
+            any(refreshed)
+            or not await aiofiles.os.path.isfile(self.get_storage().get_path())
+            or await self.read_merged_blocs() != list(self.blocs)
+        ):
+            await self.merge()
+
+        # получение данных из хранилища
+        if countries := await self.read():
+            return frozenset(
+                LocationDTO(capital=country.capital, alpha2code=country.alpha2code)
+                for country in countries
             )
 
-            return locations
-
         return None
 
-    @classmethod
-    async def read(cls) -> Optional[list[CountryDTO]]:
+    async def collect_bloc(self, bloc: str) -> bool:
         """
-        Чтение данных из кэша.
+        Актуализация данных о странах одного региона.
+
+        :param bloc: Регион
+        :return: True, если данные региона были обновлены
+        """
+
+        if (state := await self.cache_state(bloc=bloc)) is CacheState.FRESH:
+            return False
+
+        # если кэш уже невалиден, то актуализируем его
+        updated = await self.update_cache(
+            lambda file, validators: self.client.download_countries(
+                file, bloc, validators=validators
+            ),
+            bloc=bloc,
+        )
+
+        if updated is None and state is CacheState.STALE:
+            logging.warning(
+                "Не удалось обновить данные о странах региона %s, "
+                "используются устаревшие данные.",
+                bloc,
+            )
+
+        return bool(updated)
+
+    async def merge(self) -> None:
+        """
+        Объединение сохраненных данных всех регионов в хранилище данных о странах.
+        Страны, входящие в несколько регионов, сохраняются один раз,
+        некорректные данные о странах и нечитаемые файлы регионов пропускаются.
 
         :return:
         """
 
-        async with aiofiles.open(await cls.get_file_path(), mode="r") as file:
-            content = await file.read()
+        countries: dict[str, CountryDTO] = {}
+        for bloc in self.blocs:
+            file_path = await self.get_file_path(bloc=bloc)
+            if not await aiofiles.os.path.isfile(file_path):
+                continue
+
+            try:
+                async with aiofiles.open(file_path, mode="r") as file:
+                    items = jsonlib.loads(await file.read()) or []
+                if not isinstance(items, list):
+                    raise ValueError("Ожидается список стран.")
+            except (OSError, ValueError):
+                logging.warning(
+                    "Некорректный файл данных региона %s.", bloc, exc_info=True
+                )
+                continue
 
-        if content:
-            items = json.loads(content)
-            result_list = []
             for item in items:
-                result_list.append(
-                    CountryDTO(
-                        capital=item["capital"],
-                        alpha2code=item["alpha2code"],
-                        alt_spellings=item["alt_spellings"],
-                        currencies={
-                            CurrencyInfoDTO(code=currency["code"])
-                            for currency in item["currencies"]
-                        },
-                        flag=item["flag"],
-                        languages=item["languages"],
-                        name=item["name"],
-                        population=item["population"],
-                        subregion=item["subregion"],
-                        timezones=item["timezones"],
+                if item.get("alpha2code") in countries:
+                    continue
+
+                # данные проверяются при записи, чтобы при чтении не валидировать их
+                try:
+                    country = self.validate_country(item)
+                except (ValidationError, KeyError, TypeError):
+                    logging.warning(
+                        "Некорректные данные о стране в регионе %s: %s.",
+                        bloc,
+                        item.get("name"),
+                        exc_info=True,
                     )
-                )
+                    continue
 
-            return result_list
+                countries[country.alpha2code] = country
 
-        return None
+        if countries:
+            await self.get_storage().save(list(countries.values()))
+            await self.write_cache(self.get_blocs_path(), jsonlib.dumps(self.blocs))
+
+    def get_blocs_path(self) -> str:
+        """
+        Получение пути к файлу со списком регионов последнего объединения,
+        сохраненному рядом с хранилищем данных о странах.
+
+        :return:
+        """
 
+        directory, filename = os.path.split(self.get_storage().get_path())
+
+        return os.path.join(directory, f".{filename}.blocs")
+
+    async def read_merged_blocs(self) -> Optional[list[str]]:
+        """
+        Чтение списка регионов, данные которых объединены в хранилище.
+
+        :return: Список регионов или None, если он не сохранен или поврежден
+        """
+
+        try:
+            async with aiofiles.open(self.get_blocs_path(), mode="r") as file:
+                return jsonlib.loads(await file.read())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def validate_country(item: dict) -> CountryDTO:
+        """
+        Создание модели страны с полной валидацией данных внешнего сервиса.
 
-class CurrencyRatesCollector(BaseCollector):
+        :param item: Данные о стране
+        :return:
+        """
+
+        return CountryDTO(
+            capital=item["capital"],
+            alpha2code=item["alpha2code"],
+            alt_spellings=item["alt_spellings"],
+            currencies={
+                CurrencyInfoDTO(code=currency["code"])
+                for currency in item["currencies"]
+            },
+            flag=item["flag"],
+            languages=item["languages"],
+            name=item["name"],
+            population=item["population"],
+            subregion=item["subregion"],
+            timezones=item["timezones"],
+        )
+
+
+class CurrencyRatesCollector(CurrencyRatesReader, BaseCollector):
     """
     Сбор информации о курсах валют.
     """
@@ -119,109 +223,363 @@ class CurrencyRatesCollector(BaseCollector):
     def __init__(self) -> None:
         self.client = CurrencyClient()
 
-    @staticmethod
-    async def get_file_path(**kwargs: Any) -> str:
-        return f"{MEDIA_PATH}/currency_rates.json"
-
-    @staticmethod
-    async def get_cache_ttl() -> int:
-        return CACHE_TTL_CURRENCY_RATES
-
+    @metrics.timed("collector_duration_seconds")
     async def collect(self, **kwargs: Any) -> None:
-        if await self.cache_invalid():
+        updated = None
+        if (state := await self.cache_state()) is not CacheState.FRESH:
             # если кэш уже невалиден, то актуализируем его
-            result = await self.client.get_rates()
-            if result:
-                result_str = json.dumps(result)
-                async with aiofiles.open(await self.get_file_path(), mode="w") as file:
-                    await file.write(result_str)
+            updated = await self.update_cache(
+                lambda file, validators: self.client.download_rates(
+                    file, CURRENCY_RATES_BASE, validators=validators
+                )
+            )
+            if updated is None and state is CacheState.STALE:
+                logging.warning(
+                    "Не удалось обновить курсы валют, используются устаревшие данные."
+                )
+
+        # хранилище заполняется и при первом запуске с уже загруженным ответом
+        if updated or (
+            not await aiofiles.os.path.isfile(self.get_storage().get_path())
+            and await aiofiles.os.path.isfile(await self.get_file_path())
+        ):
+            await self.save()
 
-    @classmethod
-    async def read(cls) -> Optional[CurrencyRatesDTO]:
+    async def save(self) -> None:
         """
-        Чтение данных из кэша.
+        Сохранение загруженного ответа внешнего сервиса в хранилище курсов валют.
 
         :return:
         """
 
-        async with aiofiles.open(await cls.get_file_path(), mode="r") as file:
-            content = await file.read()
-
-        if content:
-            result = json.loads(content)
-
-            return CurrencyRatesDTO(
-                base=result["base"],
-                date=result["date"],
-                rates=result["rates"],
-            )
-
-        return None
+        if table := await store.get(await self.get_file_path(), self._parse):
+            await self.get_storage().save(table.currency_rates)
 
 
-class WeatherCollector(BaseCollector):
+class WeatherCollector(WeatherReader, BaseCollector):
     """
     Сбор информации о прогнозе погоды для столиц стран.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, concurrency_limit: int = WEATHER_CONCURRENCY_LIMIT) -> None:
+        """
+        Конструктор.
+
+        :param concurrency_limit: Максимальное количество одновременных запросов
+        """
+
         self.client = WeatherClient()
+        self.concurrency_limit = concurrency_limit
 
-    @staticmethod
-    async def get_file_path(filename: str = "", **kwargs: Any) -> str:
-        return f"{MEDIA_PATH}/weather/{filename}.json"
+        # очередь обновления и версия хранилища, для которой она построена
+        self.queue: Optional[RefreshQueue] = None
+        self.queue_version: Optional[int] = None
+        # соответствует ли манифест на диске очереди обновления
+        self.manifest_actual = False
+        # ключ записи -> идентификатор города для групповых запросов
+        self.cities: Optional[dict[str, int]] = None
 
-    @staticmethod
-    async def get_cache_ttl() -> int:
-        return CACHE_TTL_WEATHER
+    async def get_service_path(self, suffix: str) -> str:
+        """
+        Получение пути к служебному файлу, сохраненному рядом с хранилищем
+        данных о погоде: манифесту (``manifest``) – файлу со временем обновления
+        всех записей, или файлу с идентификаторами городов (``cities``).
+
+        :param suffix: Вид служебного файла
+        :return:
+        """
+
+        directory, name = os.path.split(os.path.dirname(await self.get_file_path()))
+
+        return os.path.join(directory, f".{name}.{suffix}")
+
+    async def get_queue(self) -> RefreshQueue:
+        """
+        Получение очереди обновления данных о погоде.
+
+        Очередь строится один раз по манифесту, сохраненному при предыдущем сборе,
+        и перестраивается только при изменении хранилища другим процессом.
+        Если манифест отсутствует или не соответствует хранилищу, то время обновления
+        записей получается из самого хранилища.
+
+        :return:
+        """
+
+        storage = self.get_storage()
+        version = await storage.get_version()
+        if self.queue is None or version != self.queue_version:
+            updated = await self.read_manifest(version)
+            self.manifest_actual = updated is not None
+            if updated is None:
+                updated = await storage.get_updated()
 
+            self.queue = RefreshQueue(
+                updated, await self.get_cache_ttl(), WEATHER_REFRESH_JITTER
+            )
+            self.queue_version = version
+
+        return self.queue
+
+    async def read_manifest(self, version: Optional[int]) -> Optional[dict[str, float]]:
+        """
+        Чтение манифеста, сохраненного для версии хранилища.
+
+        :param version: Текущая версия хранилища
+        :return: Ключ записи -> время обновления или None, если манифест
+            отсутствует или сохранен для другой версии хранилища
+        """
+
+        try:
+            async with aiofiles.open(
+                await self.get_service_path("manifest"), mode="r"
+            ) as file:
+                manifest = jsonlib.loads(await file.read())
+        except (OSError, ValueError):
+            return None
+
+        if manifest.get("version") != version:
+            return None
+
+        return manifest["updated"]
+
+    async def write_manifest(self, queue: RefreshQueue) -> None:
+        """
+        Сохранение манифеста для текущей версии хранилища.
+
+        :param queue: Очередь обновления
+        :return:
+        """
+
+        await self.write_cache(
+            await self.get_service_path("manifest"),
+            jsonlib.dumps({"version": self.queue_version, "updated": queue.updated}),
+        )
+        self.manifest_actual = True
+
+    async def get_expires_in(
+        self, locations: Iterable[LocationDTO]
+    ) -> dict[LocationDTO, float]:
+        """
+        Получение времени (в секундах), оставшегося до обновления данных
+        для каждой локации. Для отсутствующих данных возвращается 0.
+
+        :param locations: Локации
+        :return:
+        """
+
+        queue = await self.get_queue()
+        now = time.time()
+
+        return {
+            location: queue.get_expires_in(self.get_filename(location), now)
+            for location in locations
+        }
+
+    @metrics.timed("collector_duration_seconds")
     async def collect(
         self, locations: FrozenSet[LocationDTO] = frozenset(), **kwargs: Any
     ) -> None:
 
-        target_dir_path = f"{MEDIA_PATH}/weather"
-        # если целевой директории еще не существует, то она создается
-        if not await aiofiles.os.path.exists(target_dir_path):
-            await aiofiles.os.mkdir(target_dir_path)
+        # данные о погоде обновляются одним пакетом, поэтому блокируется
+        # все хранилище, а не отдельные записи
+        async with self.cache_lock(os.path.dirname(await self.get_file_path())):
+            await self.collect_due(locations)
 
-        for location in locations:
-            filename = f"{location.capital}_{location.alpha2code}".lower()
-            if await self.cache_invalid(filename=filename):
-                # если кэш уже невалиден, то актуализируем его
-                result = await self.client.get_weather(
-                    f"{location.capital},{location.alpha2code}"
+    async def collect_due(self, locations: FrozenSet[LocationDTO]) -> None:
+        """
+        Обновление данных о погоде для локаций, время обновления которых наступило.
+        Хранилище не проверяется для остальных локаций: их время обновления
+        известно из очереди обновления.
+
+        :param locations: Локации
+        :return:
+        """
+
+        storage = self.get_storage()
+        queue = await self.get_queue()
+        keys = {self.get_filename(location): location for location in locations}
+        due = {key for key in queue.pop_due(time.time()) if key in keys}
+        # обновляются также новые записи и записи, которые не удалось обновить ранее
+        due.update(key for key in keys if not queue.is_scheduled(key))
+
+        states = Counter(
+            CacheState.STALE if key in queue.updated else CacheState.MISSING
+            for key in due
+        )
+        states[CacheState.FRESH] = len(keys) - len(due)
+        for state, count in states.items():
+            if count:
+                self.count_cache_lookup(state, count)
+
+        early = await self.fill_groups(queue, keys, due)
+        payloads = await self.fetch({key: keys[key] for key in due | early})
+        for key in due - payloads.keys():
+            if key in queue.updated:
+                logging.warning(
+                    "Не удалось обновить данные о погоде для %s, "
+                    "используются устаревшие данные.",
+                    keys[key].capital,
                 )
-                if result:
-                    result_str = json.dumps(result)
-                    async with aiofiles.open(
-                        await self.get_file_path(filename), mode="w"
-                    ) as file:
-                        await file.write(result_str)
 
-    @classmethod
-    async def read(cls, location: LocationDTO) -> Optional[WeatherInfoDTO]:
+        if payloads:
+            await storage.save(payloads)
+            updated_at = time.time()
+            for key in payloads:
+                queue.update(key, updated_at)
+            self.queue_version = await storage.get_version()
+
+        if payloads or not self.manifest_actual:
+            await self.write_manifest(queue)
+
+    async def fill_groups(
+        self, queue: RefreshQueue, keys: dict[str, LocationDTO], due: set[str]
+    ) -> set[str]:
+        """
+        Дополнение групповых запросов записями, обновление которых наступит раньше
+        других в пределах окна ``WEATHER_REFRESH_JITTER`` времени актуальности.
+
+        Очередь распределяет обновления по окну, поэтому при каждом запуске
+        обновляются лишь отдельные записи. Чтобы групповой запрос не выполнялся
+        для одного-двух городов, свободные места в группах занимаются
+        ближайшими по времени обновления записями с известным идентификатором города.
+
+        :param queue: Очередь обновления
+        :param keys: Ключ записи -> локация
+        :param due: Ключи записей, время обновления которых наступило
+        :return: Ключи записей, обновляемых досрочно
         """
-        Чтение данных из кэша.
 
-        :param location:
-        :return:
+        cities = await self.read_cities()
+        grouped = sum(1 for key in due if key in cities)
+        if not grouped:
+            return set()
+
+        return set(
+            queue.pop_next(
+                time.time() + queue.jitter * queue.ttl,
+                -grouped % WEATHER_GROUP_SIZE,
+                lambda key: key in keys and key in cities,
+            )
+        )
+
+    async def fetch(self, locations: dict[str, LocationDTO]) -> dict[str, dict]:
         """
+        Получение данных о погоде для локаций.
 
-        filename = f"{location.capital}_{location.alpha2code}".lower()
-        async with aiofiles.open(await cls.get_file_path(filename), mode="r") as file:
-            content = await file.read()
+        Для локаций с известным идентификатором города данные получаются групповыми
+        запросами (до :data:`settings.WEATHER_GROUP_SIZE` городов в запросе).
+        Для остальных локаций, а также для отсутствующих в ответе на групповой запрос,
+        выполняется отдельный запрос по названию города, ответ на который содержит
+        идентификатор города для следующих обновлений.
 
-        result = json.loads(content)
-        if result:
-            return WeatherInfoDTO(
-                temp=result["main"]["temp"],
-                pressure=result["main"]["pressure"],
-                humidity=result["main"]["humidity"],
-                wind_speed=result["wind"]["speed"],
-                description=result["weather"][0]["description"],
+        :param locations: Ключ записи -> локация
+        :return: Ключ записи -> ответ внешнего сервиса
+        """
+
+        cities = await self.read_cities()
+        known = [(key, cities[key]) for key in locations if key in cities]
+        groups = [
+            known[start : start + WEATHER_GROUP_SIZE]  # noqa: E203
+            for start in range(0, len(known), WEATHER_GROUP_SIZE)
+        ]
+
+        # ограничение количества одновременно выполняемых запросов
+        semaphore = asyncio.Semaphore(self.concurrency_limit)
+        payloads: dict[str, dict] = {}
+        for result in await asyncio.gather(
+            *(self.collect_group(group, semaphore) for group in groups)
+        ):
+            payloads.update(result)
+
+        single = [key for key in locations if key not in payloads]
+        results = await asyncio.gather(
+            *(self.collect_location(locations[key], semaphore) for key in single)
+        )
+
+        resolved = False
+        for key, result in zip(single, results):
+            if result:
+                payloads[key] = result
+                if "id" in result and cities.get(key) != result["id"]:
+                    cities[key] = result["id"]
+                    resolved = True
+
+        if resolved:
+            await self.write_cache(
+                await self.get_service_path("cities"), jsonlib.dumps(cities)
             )
 
-        return None
+        return payloads
+
+    async def read_cities(self) -> dict[str, int]:
+        """
+        Получение идентификаторов городов, сохраненных при предыдущих обновлениях.
+        Файл читается один раз для экземпляра сборщика.
+
+        :return: Ключ записи -> идентификатор города
+        """
+
+        if self.cities is None:
+            try:
+                async with aiofiles.open(
+                    await self.get_service_path("cities"), mode="r"
+                ) as file:
+                    self.cities = jsonlib.loads(await file.read())
+            except (OSError, ValueError):
+                self.cities = {}
+
+        return self.cities
+
+    async def collect_group(
+        self, cities: list[tuple[str, int]], semaphore: asyncio.Semaphore
+    ) -> dict[str, dict]:
+        """
+        Получение данных о погоде для группы городов одним запросом.
+        Ошибка при обработке группы не прерывает сбор данных для остальных локаций.
+
+        :param cities: Ключи записей и идентификаторы городов
+        :param semaphore: Семафор для ограничения количества одновременных запросов
+        :return: Ключ записи -> ответ внешнего сервиса
+        """
+
+        async with semaphore:
+            try:
+                result = await self.client.get_weather_group(
+                    [city_id for _, city_id in cities]
+                )
+            except Exception:
+                logging.exception("Ошибка при групповом запросе данных о погоде.")
+
+                return {}
+
+        if not result:
+            return {}
+
+        return {key: result[city_id] for key, city_id in cities if city_id in result}
+
+    async def collect_location(
+        self, location: LocationDTO, semaphore: asyncio.Semaphore
+    ) -> Optional[dict]:
+        """
+        Получение актуальных данных о погоде для одной локации.
+        Ошибка при обработке локации не прерывает сбор данных для остальных локаций.
+
+        :param location: Объект локации
+        :param semaphore: Семафор для ограничения количества одновременных запросов
+        :return:
+        """
+
+        async with semaphore:
+            try:
+                return await self.client.get_weather(
+                    f"{location.capital},{location.alpha2code}"
+                )
+            except Exception:
+                logging.exception(
+                    "Ошибка при сборе данных о погоде для %s.", location.capital
+                )
+
+                return None
 
 
 class Collectors:
@@ -232,12 +590,28 @@ class Collectors:
             CountryCollector().collect(),
         )
 
+    @staticmethod
+    async def run() -> None:
+        """
+        Сбор всех данных с использованием общей сессии для HTTP-запросов.
+
+        :return:
+        """
+
+        try:
+            with metrics.timer("collect_run_duration_seconds"):
+                results = await Collectors.gather()
+                await WeatherCollector().collect(results[1])
+        finally:
+            # закрытие общих соединений после завершения сбора данных
+            await BaseClient.close_session()
+            await metrics.export()
+
     @staticmethod
     def collect() -> None:
         loop = asyncio.get_event_loop()
         try:
-            results = loop.run_until_complete(Collectors.gather())
-            loop.run_until_complete(WeatherCollector().collect(results[1]))
+            loop.run_until_complete(Collectors.run())
             loop.run_until_complete(loop.shutdown_asyncgens())
 
         finally:
@@ -2,16 +2,27 @@
 Описание моделей данных (DTO).
 """
 
-from pydantic import Field, BaseModel
+from typing import Any, Optional
+
+from pydantic import Field, BaseModel, PrivateAttr
 
 
 class HashableBaseModel(BaseModel):
     """
     Добавление хэшируемости для моделей.
+    Модели неизменяемы, поэтому хэш вычисляется один раз и сохраняется.
     """
 
+    _hash: Optional[int] = PrivateAttr(default=None)
+
+    class Config:
+        allow_mutation = False
+
     def __hash__(self) -> int:
-        return hash((type(self),) + tuple(self.__dict__.values()))
+        if self._hash is None:
+            self._hash = hash((type(self),) + tuple(self.__dict__.values()))
+
+        return self._hash
 
 
 class LocationDTO(HashableBaseModel):
@@ -201,3 +212,24 @@ class LocationInfoDTO(BaseModel):
     location: CountryDTO
     weather: WeatherInfoDTO
     currency_rates: dict[str, float]
+
+
+def json_default(value: Any) -> Any:
+    """
+    Преобразование моделей и множеств для сериализации в JSON.
+    Используется вместо ``BaseModel.json()``, который не поддерживает множества моделей.
+
+    .. code-block::
+
+        json.dumps(location_info, default=json_default)
+
+    :param value: Значение, не поддерживаемое модулем json
+    :return:
+    """
+
+    if isinstance(value, BaseModel):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
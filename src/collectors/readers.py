@@ -0,0 +1,252 @@
+"""
+Чтение собранной информации из хранилищ (файлов кэша или баз данных SQLite).
+
+Модуль не зависит от клиентов внешних сервисов и функций сбора данных, поэтому
+поиск информации (:mod:`reader`) не загружает их при запуске.
+"""
+
+from typing import Any, Optional
+
+import jsonlib
+from collectors.models import (
+    CountryDTO,
+    CurrencyRatesDTO,
+    LocationDTO,
+    WeatherInfoDTO,
+)
+from collectors.storage import (
+    BaseCountryStorage,
+    BaseCurrencyRatesStorage,
+    FileCountryStorage,
+    FileCurrencyRatesStorage,
+    SQLiteCountryStorage,
+    SQLiteCurrencyRatesStorage,
+    construct_country,
+)
+from collectors.store import CountryIndex, CurrencyRateTable
+from collectors.weather_storage import (
+    BaseWeatherStorage,
+    FileWeatherStorage,
+    SQLiteWeatherStorage,
+)
+from settings import (
+    MEDIA_PATH,
+    CACHE_STORAGE,
+    CACHE_TTL_COUNTRY,
+    CACHE_TTL_CURRENCY_RATES,
+    CACHE_TTL_WEATHER,
+    WEATHER_STORAGE,
+)
+
+
+class CountryReader:
+    """
+    Чтение информации о странах.
+    """
+
+    @staticmethod
+    async def get_file_path(bloc: str = "", **kwargs: Any) -> str:
+        """
+        Получение пути к файлу кэша.
+
+        :param bloc: Регион; если не указан, то путь к объединенным данным всех регионов
+        :return:
+        """
+
+        if bloc:
+            return f"{MEDIA_PATH}/country/{bloc}.json"
+
+        return f"{MEDIA_PATH}/country.json"
+
+    @staticmethod
+    async def get_cache_ttl() -> int:
+        return CACHE_TTL_COUNTRY
+
+    @classmethod
+    async def read(cls) -> Optional[list[CountryDTO]]:
+        """
+        Чтение данных из кэша.
+
+        :return:
+        """
+
+        if index := await cls.read_index():
+            return index.countries
+
+        return None
+
+    @classmethod
+    def get_storage(cls) -> BaseCountryStorage:
+        """
+        Получение хранилища данных о странах в соответствии с настройками.
+
+        :return:
+        """
+
+        if CACHE_STORAGE == "sqlite":
+            return SQLiteCountryStorage(f"{MEDIA_PATH}/country.sqlite3")
+
+        return FileCountryStorage(f"{MEDIA_PATH}/country.json", cls._parse)
+
+    @classmethod
+    async def read_index(cls) -> Optional[CountryIndex]:
+        """
+        Чтение данных из кэша вместе с индексами для поиска.
+        Данные читаются только при первом обращении и после их изменения.
+
+        :return:
+        """
+
+        return await cls.get_storage().read()
+
+    @classmethod
+    async def filter(
+        cls, subregion: Optional[str] = None, min_population: int = 0
+    ) -> list[CountryDTO]:
+        """
+        Выборка стран по субрегиону и минимальной численности населения.
+
+        :param subregion: Субрегион
+        :param min_population: Минимальная численность населения
+        :return:
+        """
+
+        return await cls.get_storage().filter(subregion, min_population)
+
+    @staticmethod
+    def _parse(content: str) -> Optional[CountryIndex]:
+        """
+        Разбор содержимого файла кэша.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        if content:
+            items = jsonlib.loads(content)
+
+            return CountryIndex([construct_country(item) for item in items])
+
+        return None
+
+
+class CurrencyRatesReader:
+    """
+    Чтение информации о курсах валют.
+    """
+
+    @staticmethod
+    async def get_file_path(**kwargs: Any) -> str:
+        return f"{MEDIA_PATH}/currency_rates.json"
+
+    @staticmethod
+    async def get_cache_ttl() -> int:
+        return CACHE_TTL_CURRENCY_RATES
+
+    @classmethod
+    async def read(cls) -> Optional[CurrencyRatesDTO]:
+        """
+        Чтение данных из кэша.
+
+        :return:
+        """
+
+        if table := await cls.read_table():
+            return table.currency_rates
+
+        return None
+
+    @classmethod
+    def get_storage(cls) -> BaseCurrencyRatesStorage:
+        """
+        Получение хранилища курсов валют в соответствии с настройками.
+
+        :return:
+        """
+
+        if CACHE_STORAGE == "sqlite":
+            return SQLiteCurrencyRatesStorage(f"{MEDIA_PATH}/currency_rates.sqlite3")
+
+        return FileCurrencyRatesStorage(f"{MEDIA_PATH}/currency_rates.json", cls._parse)
+
+    @classmethod
+    async def read_table(cls) -> Optional[CurrencyRateTable]:
+        """
+        Чтение данных из кэша в виде таблицы для пересчета курсов.
+        Таблица строится только при первом обращении и после обновления данных.
+
+        :return:
+        """
+
+        return await cls.get_storage().read()
+
+    @staticmethod
+    def _parse(content: str) -> Optional[CurrencyRateTable]:
+        """
+        Разбор содержимого файла кэша.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        if content:
+            result = jsonlib.loads(content)
+
+            return CurrencyRateTable(
+                CurrencyRatesDTO(
+                    base=result["base"],
+                    date=result["date"],
+                    rates=result["rates"],
+                )
+            )
+
+        return None
+
+
+class WeatherReader:
+    """
+    Чтение информации о погоде в столицах стран.
+    """
+
+    @staticmethod
+    async def get_file_path(filename: str = "", **kwargs: Any) -> str:
+        return f"{MEDIA_PATH}/weather/{filename}.json"
+
+    @staticmethod
+    async def get_cache_ttl() -> int:
+        return CACHE_TTL_WEATHER
+
+    @staticmethod
+    def get_filename(location: LocationDTO) -> str:
+        """
+        Получение имени файла (ключа записи) кэша для локации.
+
+        :param location: Объект локации
+        :return:
+        """
+
+        return f"{location.capital}_{location.alpha2code}".lower()
+
+    @staticmethod
+    def get_storage() -> BaseWeatherStorage:
+        """
+        Получение хранилища данных о погоде в соответствии с настройками.
+
+        :return:
+        """
+
+        if WEATHER_STORAGE == "sqlite":
+            return SQLiteWeatherStorage(f"{MEDIA_PATH}/weather.sqlite3")
+
+        return FileWeatherStorage(f"{MEDIA_PATH}/weather")
+
+    @classmethod
+    async def read(cls, location: LocationDTO) -> Optional[WeatherInfoDTO]:
+        """
+        Чтение данных из кэша.
+
+        :param location:
+        :return:
+        """
+
+        return await cls.get_storage().read(cls.get_filename(location))
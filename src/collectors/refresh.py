@@ -0,0 +1,143 @@
+"""
+Очередь обновления данных, упорядоченная по времени истечения срока актуальности.
+"""
+
+import heapq
+import zlib
+from typing import Callable
+
+
+class RefreshQueue:
+    """
+    Очередь обновления записей кэша на основе двоичной кучи (min-heap).
+
+    Время следующего обновления каждой записи вычисляется один раз при ее добавлении,
+    поэтому при каждом запуске извлекаются только записи с истекшим сроком
+    актуальности, а остальные не проверяются.
+
+    Срок актуальности записи сокращается на постоянную для ее ключа долю окна
+    ``jitter * ttl``: записи, полученные одновременно, обновляются в разное время
+    в пределах этого окна, а не одним пакетом при каждом истечении срока.
+    """
+
+    def __init__(
+        self, updated: dict[str, float], ttl: float, jitter: float = 0
+    ) -> None:
+        """
+        Конструктор.
+
+        :param updated: Ключ записи -> время ее последнего обновления (timestamp)
+        :param ttl: Время актуальности данных (в секундах)
+        :param jitter: Доля времени актуальности, в пределах которой распределяются
+            обновления записей
+        """
+
+        self.ttl = ttl
+        self.jitter = jitter
+        self.updated = dict(updated)
+        # ключ записи -> запланированное время обновления
+        self._due = {key: self.get_due(key, value) for key, value in updated.items()}
+        self._heap = [(due, key) for key, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def get_due(self, key: str, updated_at: float) -> float:
+        """
+        Получение времени следующего обновления записи.
+
+        :param key: Ключ записи
+        :param updated_at: Время последнего обновления записи
+        :return:
+        """
+
+        # доля окна определяется хэшем ключа, поэтому не изменяется между запусками
+        share = zlib.crc32(key.encode()) / 0xFFFFFFFF
+
+        return updated_at + self.ttl * (1 - self.jitter * share)
+
+    def is_scheduled(self, key: str) -> bool:
+        """
+        Проверка того, что обновление записи запланировано.
+
+        :param key: Ключ записи
+        :return:
+        """
+
+        return key in self._due
+
+    def get_expires_in(self, key: str, now: float) -> float:
+        """
+        Получение времени (в секундах), оставшегося до обновления записи.
+        Для записей, обновление которых не запланировано, возвращается 0.
+
+        :param key: Ключ записи
+        :param now: Текущее время
+        :return:
+        """
+
+        if (due := self._due.get(key)) is None:
+            return 0
+
+        return due - now
+
+    def update(self, key: str, updated_at: float) -> None:
+        """
+        Учет обновления записи и планирование ее следующего обновления.
+
+        :param key: Ключ записи
+        :param updated_at: Время обновления
+        :return:
+        """
+
+        self.updated[key] = updated_at
+        self._due[key] = due = self.get_due(key, updated_at)
+        heapq.heappush(self._heap, (due, key))
+
+    def pop_due(self, now: float) -> list[str]:
+        """
+        Извлечение из очереди ключей записей, время обновления которых наступило.
+        Обновление извлеченных записей снова планируется методом :meth:`update`.
+
+        :param now: Текущее время
+        :return:
+        """
+
+        keys = []
+        while self._heap and self._heap[0][0] <= now:
+            due, key = heapq.heappop(self._heap)
+            # элементы кучи для записей, обновление которых перепланировано, пропускаются
+            if self._due.get(key) == due:
+                del self._due[key]
+                keys.append(key)
+
+        return keys
+
+    def pop_next(
+        self, until: float, count: int, accept: Callable[[str], bool]
+    ) -> list[str]:
+        """
+        Досрочное извлечение из очереди ключей записей, время обновления которых
+        ближе всего и наступает не позже ``until``.
+        Записи, не подходящие по условию, остаются в очереди.
+
+        :param until: Время, до которого должно наступить обновление записей
+        :param count: Максимальное количество извлекаемых записей
+        :param accept: Функция проверки того, что запись можно обновить досрочно
+        :return:
+        """
+
+        keys: list[str] = []
+        skipped = []
+        while len(keys) < count and self._heap and self._heap[0][0] <= until:
+            due, key = heapq.heappop(self._heap)
+            if self._due.get(key) != due:
+                continue
+            if accept(key):
+                del self._due[key]
+                keys.append(key)
+            else:
+                skipped.append((due, key))
+
+        for item in skipped:
+            heapq.heappush(self._heap, item)
+
+        return keys
@@ -0,0 +1,146 @@
+"""
+Периодический сбор информации о странах в режиме службы.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, FrozenSet, Optional
+
+from clients.base import BaseClient
+from collectors.collector import (
+    CountryCollector,
+    CurrencyRatesCollector,
+    WeatherCollector,
+)
+from collectors.models import LocationDTO
+from metrics import metrics
+from settings import SCHEDULER_MIN_DELAY
+
+
+class Scheduler:
+    """
+    Планировщик сбора данных в одном долгоживущем процессе.
+
+    Каждый набор данных обновляется в отдельной задаче, которая засыпает до момента
+    истечения срока актуальности своего кэша. Цикл событий, общая HTTP-сессия
+    и список локаций сохраняются между обновлениями.
+    """
+
+    def __init__(self, min_delay: int = SCHEDULER_MIN_DELAY) -> None:
+        """
+        Конструктор.
+
+        :param min_delay: Минимальная пауза между попытками обновления (в секундах)
+        """
+
+        self.min_delay = min_delay
+
+        self.country_collector = CountryCollector()
+        self.currency_rates_collector = CurrencyRatesCollector()
+        self.weather_collector = WeatherCollector()
+
+        # локации, для которых собираются данные о погоде
+        self.locations: FrozenSet[LocationDTO] = frozenset()
+        self.locations_changed = asyncio.Event()
+
+    async def run(self) -> None:
+        """
+        Запуск обновления всех наборов данных.
+
+        :return:
+        """
+
+        try:
+            await asyncio.gather(
+                self.run_countries(),
+                self.run_currency_rates(),
+                self.run_weather(),
+            )
+        finally:
+            await BaseClient.close_session()
+
+    async def run_countries(self) -> None:
+        """
+        Обновление данных о странах.
+
+        :return:
+        """
+
+        while True:
+            locations = await self.safe_collect(self.country_collector.collect())
+            if locations and locations != self.locations:
+                self.locations = locations
+                # данные о погоде обновляются для нового списка локаций без ожидания
+                self.locations_changed.set()
+
+            await self.wait(await self.country_collector.get_cache_expires_in())
+
+    async def run_currency_rates(self) -> None:
+        """
+        Обновление данных о курсах валют.
+
+        :return:
+        """
+
+        while True:
+            await self.safe_collect(self.currency_rates_collector.collect())
+            await self.wait(await self.currency_rates_collector.get_cache_expires_in())
+
+    async def run_weather(self) -> None:
+        """
+        Обновление данных о погоде.
+
+        :return:
+        """
+
+        # ожидание получения списка локаций
+        await self.locations_changed.wait()
+
+        while True:
+            self.locations_changed.clear()
+            locations = self.locations
+            await self.safe_collect(self.weather_collector.collect(locations))
+
+            expires_in = await self.weather_collector.get_expires_in(locations)
+            await self.wait(min(expires_in.values(), default=0), self.locations_changed)
+
+    async def wait(self, delay: float, event: Optional[asyncio.Event] = None) -> None:
+        """
+        Ожидание следующего обновления.
+
+        :param delay: Время до истечения срока актуальности кэша (в секундах)
+        :param event: Событие, досрочно прерывающее ожидание
+        :return:
+        """
+
+        # если обновление не удалось, то следующая попытка выполняется не сразу
+        delay = max(delay, self.min_delay)
+        logging.debug("Следующее обновление через %.0f с.", delay)
+
+        if event is None:
+            await asyncio.sleep(delay)
+            return
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    async def safe_collect(collect: Awaitable[Any]) -> Any:
+        """
+        Выполнение сбора данных без прерывания работы планировщика при ошибках.
+
+        :param collect: Корутина сбора данных
+        :return:
+        """
+
+        try:
+            return await collect
+        except Exception:
+            logging.exception("Ошибка при обновлении данных.")
+
+            return None
+        finally:
+            # показатели выгружаются после каждого обновления
+            await metrics.export()
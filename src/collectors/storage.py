@@ -0,0 +1,468 @@
+"""
+Хранилища данных о странах и курсах валют.
+
+Данные хранятся либо в файлах JSON, либо в базе данных SQLite (по одному файлу
+базы данных для каждого вида данных). База данных используется в режиме WAL:
+чтение не блокируется записью сборщика, поэтому читатели (поиск, HTTP-сервис)
+работают одновременно с ним, а выборки выполняются по индексам таблиц.
+"""
+
+import asyncio
+import errno
+import os
+import pathlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+import jsonlib
+from collectors.models import (
+    CountryDTO,
+    CurrencyInfoDTO,
+    CurrencyRatesDTO,
+    LanguagesInfoDTO,
+    json_default,
+)
+from collectors.store import CountryIndex, CurrencyRateTable, store
+
+# время ожидания блокировки базы данных другим процессом (в секундах)
+SQLITE_TIMEOUT = 30
+
+# соединения для чтения, отдельные для каждого потока:
+# путь к файлу базы данных -> (соединение, идентификатор файла)
+_readers = threading.local()
+
+
+def connect(file_path: str, schema: str) -> sqlite3.Connection:
+    """
+    Открытие соединения с базой данных SQLite в режиме WAL.
+
+    :param file_path: Путь к файлу базы данных
+    :param schema: Запросы для создания таблиц и индексов
+    :return:
+    """
+
+    connection = sqlite3.connect(file_path, timeout=SQLITE_TIMEOUT)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # в режиме WAL синхронизация при каждой транзакции не требуется для целостности
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(schema)
+
+    return connection
+
+
+def write(
+    file_path: str, schema: str, statements: Callable[[sqlite3.Connection], Any]
+) -> None:
+    """
+    Выполнение запросов на запись в одной транзакции.
+
+    В режиме WAL изменения записываются в файл журнала, а не в файл базы данных,
+    поэтому время изменения файла базы данных обновляется явно: по нему читатели
+    (:class:`collectors.store.CacheStore`) определяют, что данные изменились.
+
+    :param file_path: Путь к файлу базы данных
+    :param schema: Запросы для создания таблиц и индексов
+    :param statements: Функция, выполняющая запросы
+    :return:
+    """
+
+    connection = connect(file_path, schema)
+    try:
+        with connection:
+            statements(connection)
+    finally:
+        connection.close()
+
+    os.utime(file_path)
+
+
+def connect_readonly(file_path: str) -> sqlite3.Connection:
+    """
+    Получение соединения с базой данных SQLite только для чтения.
+
+    Соединение открывается без создания таблиц и изменения режима журнала
+    (их выполняет запись) и переиспользуется последующими запросами того же потока.
+    Если файл базы данных заменен (например, при загрузке снимка), то соединение
+    открывается заново.
+
+    :param file_path: Путь к файлу базы данных
+    :return:
+    """
+
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        # чтение не создает базу данных, если данные еще не собраны
+        raise FileNotFoundError(
+            errno.ENOENT, os.strerror(errno.ENOENT), file_path
+        ) from None
+
+    connections = _readers.__dict__.setdefault("connections", {})
+    file_id = (stat.st_dev, stat.st_ino)
+    if file_path in connections:
+        connection, connected_id = connections[file_path]
+        if connected_id == file_id:
+            return connection
+        connection.close()
+
+    connection = sqlite3.connect(
+        f"{pathlib.Path(file_path).absolute().as_uri()}?mode=ro",
+        uri=True,
+        timeout=SQLITE_TIMEOUT,
+    )
+    connections[file_path] = (connection, file_id)
+
+    return connection
+
+
+def query(file_path: str, sql: str, parameters: tuple = ()) -> list:
+    """
+    Выполнение запроса на чтение.
+
+    :param file_path: Путь к файлу базы данных
+    :param sql: Запрос
+    :param parameters: Параметры запроса
+    :return: Строки результата
+    """
+
+    return connect_readonly(file_path).execute(sql, parameters).fetchall()
+
+
+def construct_country(item: dict) -> CountryDTO:
+    """
+    Создание модели страны без валидации.
+    Используется для сохраненных данных, которые проверяются при записи
+    в :meth:`collectors.collector.CountryCollector.merge`.
+
+    :param item: Данные о стране
+    :return:
+    """
+
+    return CountryDTO.construct(
+        capital=item["capital"],
+        alpha2code=item["alpha2code"],
+        alt_spellings=item["alt_spellings"],
+        currencies={
+            CurrencyInfoDTO.construct(code=currency["code"])
+            for currency in item["currencies"]
+        },
+        flag=item["flag"],
+        languages={
+            LanguagesInfoDTO.construct(
+                name=language["name"], native_name=language["native_name"]
+            )
+            for language in item["languages"]
+        },
+        name=item["name"],
+        population=item["population"],
+        subregion=item["subregion"],
+        timezones=item["timezones"],
+    )
+
+
+class BaseCountryStorage(ABC):
+    """
+    Базовый класс, реализующий интерфейс для хранилищ данных о странах.
+    """
+
+    @abstractmethod
+    def get_path(self) -> str:
+        """
+        Получение пути к файлу, при изменении которого изменяются данные.
+
+        :return:
+        """
+
+    @abstractmethod
+    async def save(self, countries: list[CountryDTO]) -> None:
+        """
+        Сохранение проверенных данных о странах (с заменой сохраненных ранее).
+
+        :param countries: Список стран
+        :return:
+        """
+
+    @abstractmethod
+    async def read(self) -> Optional[CountryIndex]:
+        """
+        Чтение данных о странах вместе с индексами для поиска.
+        Данные читаются только при первом обращении и после их изменения.
+
+        :return:
+        """
+
+    async def filter(
+        self, subregion: Optional[str] = None, min_population: int = 0
+    ) -> list[CountryDTO]:
+        """
+        Выборка стран по субрегиону (без учета регистра) и минимальной численности
+        населения в порядке сохранения.
+
+        :param subregion: Субрегион
+        :param min_population: Минимальная численность населения
+        :return:
+        """
+
+        index = await self.read()
+        if index is None:
+            return []
+
+        return [
+            country
+            for country in index.countries
+            if country.population >= min_population
+            and (subregion is None or country.subregion.lower() == subregion.lower())
+        ]
+
+
+class FileCountryStorage(BaseCountryStorage):
+    """
+    Хранение данных о странах в одном файле JSON.
+    """
+
+    def __init__(
+        self, file_path: str, parser: Callable[[str], Optional[CountryIndex]]
+    ) -> None:
+        """
+        Конструктор.
+
+        :param file_path: Путь к файлу
+        :param parser: Функция разбора содержимого файла
+        """
+
+        self.file_path = file_path
+        self.parser = parser
+
+    def get_path(self) -> str:
+        return self.file_path
+
+    async def save(self, countries: list[CountryDTO]) -> None:
+        # импорт при записи, чтобы чтение не загружало модули сбора данных
+        from collectors.base import (  # pylint: disable=import-outside-toplevel
+            BaseCollector,
+        )
+
+        await BaseCollector.write_cache(
+            self.file_path, jsonlib.dumps(countries, default=json_default)
+        )
+
+    async def read(self) -> Optional[CountryIndex]:
+        return await store.get(self.file_path, self.parser)
+
+
+class SQLiteCountryStorage(BaseCountryStorage):
+    """
+    Хранение данных о странах в таблице SQLite.
+
+    Данные страны сохраняются в JSON, а поля для выборки – в отдельных
+    индексированных столбцах.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS country (
+            alpha2code TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            subregion TEXT NOT NULL COLLATE NOCASE,
+            population INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS country_subregion
+            ON country (subregion, population);
+        CREATE INDEX IF NOT EXISTS country_population ON country (population);
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Конструктор.
+
+        :param file_path: Путь к файлу базы данных
+        """
+
+        self.file_path = file_path
+
+    def get_path(self) -> str:
+        return self.file_path
+
+    async def save(self, countries: list[CountryDTO]) -> None:
+        rows = [
+            (
+                country.alpha2code,
+                country.name,
+                country.subregion,
+                country.population,
+                jsonlib.dumps(country, default=json_default),
+            )
+            for country in countries
+        ]
+
+        def statements(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM country")
+            connection.executemany("INSERT INTO country VALUES (?, ?, ?, ?, ?)", rows)
+
+        await asyncio.to_thread(write, self.file_path, self.schema, statements)
+
+    async def read(self) -> Optional[CountryIndex]:
+        return await store.load(
+            self.file_path, lambda path: asyncio.to_thread(self._read_all)
+        )
+
+    def _read_all(self) -> Optional[CountryIndex]:
+        """
+        Чтение всех стран одним запросом.
+
+        :return:
+        """
+
+        rows = query(self.file_path, "SELECT data FROM country ORDER BY rowid")
+        if rows:
+            return CountryIndex(
+                [construct_country(jsonlib.loads(data)) for (data,) in rows]
+            )
+
+        return None
+
+    async def filter(
+        self, subregion: Optional[str] = None, min_population: int = 0
+    ) -> list[CountryDTO]:
+        # выборка выполняется по индексу без чтения всех стран
+        sql = "SELECT data FROM country WHERE population >= ?"
+        parameters: tuple = (min_population,)
+        if subregion is not None:
+            sql += " AND subregion = ?"
+            parameters += (subregion,)
+
+        rows = await asyncio.to_thread(
+            query, self.file_path, f"{sql} ORDER BY rowid", parameters
+        )
+
+        return [construct_country(jsonlib.loads(data)) for (data,) in rows]
+
+
+class BaseCurrencyRatesStorage(ABC):
+    """
+    Базовый класс, реализующий интерфейс для хранилищ курсов валют.
+    """
+
+    @abstractmethod
+    def get_path(self) -> str:
+        """
+        Получение пути к файлу, при изменении которого изменяются данные.
+
+        :return:
+        """
+
+    @abstractmethod
+    async def save(self, currency_rates: CurrencyRatesDTO) -> None:
+        """
+        Сохранение курсов валют (с заменой сохраненных ранее).
+
+        :param currency_rates: Курсы валют
+        :return:
+        """
+
+    @abstractmethod
+    async def read(self) -> Optional[CurrencyRateTable]:
+        """
+        Чтение курсов валют в виде таблицы для пересчета курсов.
+        Таблица строится только при первом обращении и после изменения данных.
+
+        :return:
+        """
+
+
+class FileCurrencyRatesStorage(BaseCurrencyRatesStorage):
+    """
+    Хранение курсов валют в файле ответа внешнего сервиса.
+    """
+
+    def __init__(
+        self, file_path: str, parser: Callable[[str], Optional[CurrencyRateTable]]
+    ) -> None:
+        """
+        Конструктор.
+
+        :param file_path: Путь к файлу
+        :param parser: Функция разбора содержимого файла
+        """
+
+        self.file_path = file_path
+        self.parser = parser
+
+    def get_path(self) -> str:
+        return self.file_path
+
+    async def save(self, currency_rates: CurrencyRatesDTO) -> None:
+        # ответ внешнего сервиса уже сохранен в файл хранилища при загрузке
+        pass
+
+    async def read(self) -> Optional[CurrencyRateTable]:
+        return await store.get(self.file_path, self.parser)
+
+
+class SQLiteCurrencyRatesStorage(BaseCurrencyRatesStorage):
+    """
+    Хранение курсов валют в таблице SQLite (по строке на валюту).
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS currency_rates (
+            code TEXT PRIMARY KEY,
+            rate REAL NOT NULL,
+            base TEXT NOT NULL,
+            date TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Конструктор.
+
+        :param file_path: Путь к файлу базы данных
+        """
+
+        self.file_path = file_path
+
+    def get_path(self) -> str:
+        return self.file_path
+
+    async def save(self, currency_rates: CurrencyRatesDTO) -> None:
+        rows = [
+            (code, rate, currency_rates.base, currency_rates.date)
+            for code, rate in currency_rates.rates.items()
+        ]
+
+        def statements(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM currency_rates")
+            connection.executemany(
+                "INSERT INTO currency_rates VALUES (?, ?, ?, ?)", rows
+            )
+
+        await asyncio.to_thread(write, self.file_path, self.schema, statements)
+
+    async def read(self) -> Optional[CurrencyRateTable]:
+        return await store.load(
+            self.file_path, lambda path: asyncio.to_thread(self._read_all)
+        )
+
+    def _read_all(self) -> Optional[CurrencyRateTable]:
+        """
+        Чтение всех курсов валют одним запросом.
+
+        :return:
+        """
+
+        rows = query(
+            self.file_path, "SELECT code, rate, base, date FROM currency_rates"
+        )
+        if rows:
+            return CurrencyRateTable(
+                CurrencyRatesDTO(
+                    base=rows[0][2],
+                    date=rows[0][3],
+                    rates={code: rate for code, rate, _, _ in rows},
+                )
+            )
+
+        return None
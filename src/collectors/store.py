@@ -0,0 +1,393 @@
+"""
+Хранение в памяти процесса данных, прочитанных из файлов кэша.
+"""
+
+import logging
+import sqlite3
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+
+import aiofiles
+import aiofiles.os
+
+from collectors.models import CountryDTO, CurrencyRatesDTO
+from metrics import metrics
+
+T = TypeVar("T")
+
+
+class CacheStore:
+    """
+    Хранилище разобранных данных из файлов кэша.
+
+    Содержимое файла читается и разбирается один раз, после чего результат
+    переиспользуется до тех пор, пока не изменятся время модификации или размер файла.
+    Если файл не удается прочитать или разобрать, то возвращаются ранее прочитанные данные.
+    """
+
+    def __init__(self, check_interval: float = 0) -> None:
+        """
+        Конструктор.
+
+        :param check_interval: Интервал (в секундах), в течение которого данные
+            возвращаются без проверки изменения файла; 0 – проверять при каждом обращении
+        """
+
+        self.check_interval = check_interval
+        # путь к файлу -> ((время модификации, размер), разобранные данные)
+        self._entries: dict[str, tuple[tuple[int, int], Any]] = {}
+        # путь к файлу -> время последней проверки изменения файла
+        self._checked: dict[str, float] = {}
+
+    async def get(self, file_path: str, parser: Callable[[str], T]) -> T:
+        """
+        Получение разобранных данных файла.
+
+        :param file_path: Путь к файлу кэша
+        :param parser: Функция разбора содержимого файла
+        :return:
+        """
+
+        async def loader(path: str) -> T:
+            async with aiofiles.open(path, mode="r") as file:
+                content = await file.read()
+
+            return parser(content)
+
+        return await self.load(file_path, loader)
+
+    async def load(self, file_path: str, loader: Callable[[str], Awaitable[T]]) -> T:
+        """
+        Получение данных файла, загружаемых переданной функцией.
+
+        :param file_path: Путь к файлу кэша
+        :param loader: Функция загрузки данных по пути к файлу
+        :return:
+        """
+
+        entry = self._entries.get(file_path)
+        now = time.monotonic()
+        if (
+            entry is not None
+            and self.check_interval
+            and now - self._checked.get(file_path, 0) < self.check_interval
+        ):
+            return entry[1]
+
+        try:
+            stat = await aiofiles.os.stat(file_path)
+            self._checked[file_path] = now
+            version = (stat.st_mtime_ns, stat.st_size)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+            value = await loader(file_path)
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error):
+            if entry is None:
+                raise
+
+            # при ошибке чтения продолжают использоваться ранее прочитанные данные
+            logging.warning(
+                "Не удалось прочитать файл %s, используются ранее прочитанные данные.",
+                file_path,
+                exc_info=True,
+            )
+
+            return entry[1]
+
+        self._entries[file_path] = (version, value)
+
+        return value
+
+    def get_loaded_version(self, file_path: str) -> Optional[tuple[int, int]]:
+        """
+        Получение версии (время модификации, размер) файла, из которого
+        были получены данные, хранящиеся в памяти.
+
+        :param file_path: Путь к файлу кэша
+        :return: None, если данные файла еще не читались
+        """
+
+        if entry := self._entries.get(file_path):
+            return entry[0]
+
+        return None
+
+    async def is_current(self, file_path: str, version: tuple[int, int]) -> bool:
+        """
+        Проверка того, что файл не изменился с указанной версии.
+        С учетом интервала проверки (:attr:`check_interval`) обращение
+        к файловой системе выполняется не при каждом вызове.
+
+        :param file_path: Путь к файлу кэша
+        :param version: Версия (время модификации, размер) файла
+        :return:
+        """
+
+        entry = self._entries.get(file_path)
+        now = time.monotonic()
+        if (
+            entry is not None
+            and entry[0] == version
+            and self.check_interval
+            and now - self._checked.get(file_path, 0) < self.check_interval
+        ):
+            return True
+
+        try:
+            stat = await aiofiles.os.stat(file_path)
+        except OSError:
+            return False
+
+        if (stat.st_mtime_ns, stat.st_size) != version:
+            return False
+
+        if entry is not None and entry[0] == version:
+            self._checked[file_path] = now
+
+        return True
+
+    def clear(self) -> None:
+        """
+        Очистка хранилища.
+
+        :return:
+        """
+
+        self._entries.clear()
+        self._checked.clear()
+
+
+class ResultCache:
+    """
+    Кэш результатов, вычисленных на основе данных из файлов кэша (LRU).
+
+    Результат хранится, пока не истечет срок актуальности одного из файлов,
+    от которых он зависит, и пока эти файлы не изменились, но не дольше ``ttl``.
+    При превышении размера удаляются результаты, которые дольше всего не запрашивались.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Конструктор.
+
+        :param maxsize: Максимальное количество результатов (0 – кэш отключен)
+        :param ttl: Максимальное время хранения результата (в секундах)
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # ключ -> (результат, время истечения, путь к файлу -> версия файла)
+        self._entries: OrderedDict[
+            str, tuple[Any, float, dict[str, tuple[int, int]]]
+        ] = OrderedDict()
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """
+        Получение результата.
+
+        :param key: Ключ
+        :param default: Значение, возвращаемое при отсутствии актуального результата
+        :return:
+        """
+
+        if (entry := self._entries.get(key)) is not None:
+            value, expires_at, versions = entry
+            if time.time() < expires_at and await self._is_current(versions):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc("result_cache_total", result="hit")
+
+                return value
+
+            del self._entries[key]
+
+        self.misses += 1
+        metrics.inc("result_cache_total", result="miss")
+
+        return default
+
+    @staticmethod
+    async def _is_current(versions: dict[str, tuple[int, int]]) -> bool:
+        """
+        Проверка того, что ни один из файлов не изменился.
+
+        :param versions: Путь к файлу кэша -> версия файла
+        :return:
+        """
+
+        for file_path, version in versions.items():
+            if not await store.is_current(file_path, version):
+                return False
+
+        return True
+
+    def put(self, key: str, value: Any, dependencies: dict[str, float]) -> None:
+        """
+        Сохранение результата.
+
+        :param key: Ключ
+        :param value: Результат
+        :param dependencies: Путь к файлу кэша -> срок актуальности данных (в секундах)
+            для файлов, данные которых использованы для вычисления результата
+        :return:
+        """
+
+        if not self.maxsize:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl
+        versions = {}
+        for file_path, ttl in dependencies.items():
+            if (version := store.get_loaded_version(file_path)) is None:
+                # данные файла не хранятся в памяти, их изменение невозможно проверить
+                return
+
+            versions[file_path] = version
+            # устаревшие данные не станут актуальнее до изменения файла
+            if (data_expires_at := version[0] / 1e9 + ttl) > now:
+                expires_at = min(expires_at, data_expires_at)
+
+        self._entries[key] = (value, expires_at, versions)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Очистка кэша и счетчиков.
+
+        :return:
+        """
+
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class CountryIndex:
+    """
+    Индекс для поиска стран по точному совпадению.
+
+    Ключи индекса приводятся к нижнему регистру, поэтому поиск не зависит от регистра.
+    При совпадении ключей у нескольких стран в индексе остается первая из них.
+    """
+
+    def __init__(self, countries: list[CountryDTO]) -> None:
+        """
+        Конструктор.
+
+        :param countries: Список стран
+        """
+
+        self.countries = countries
+
+        self.by_alpha2code: dict[str, CountryDTO] = {}
+        self.by_capital: dict[str, CountryDTO] = {}
+        self.by_name: dict[str, CountryDTO] = {}
+        self.by_alt_spelling: dict[str, CountryDTO] = {}
+
+        for country in countries:
+            self.by_alpha2code.setdefault(country.alpha2code.lower(), country)
+            self.by_capital.setdefault(country.capital.lower(), country)
+            self.by_name.setdefault(country.name.lower(), country)
+            for spelling in country.alt_spellings:
+                self.by_alt_spelling.setdefault(spelling.lower(), country)
+
+    def get(self, search: str) -> Optional[CountryDTO]:
+        """
+        Поиск страны по точному совпадению с кодом, столицей, названием
+        или альтернативным написанием.
+
+        :param search: Строка для поиска
+        :return:
+        """
+
+        key = search.strip().lower()
+
+        return (
+            self.by_alpha2code.get(key)
+            or self.by_capital.get(key)
+            or self.by_name.get(key)
+            or self.by_alt_spelling.get(key)
+        )
+
+
+class CurrencyRateTable:
+    """
+    Таблица для пересчета курсов валют относительно любой базовой валюты.
+
+    Курсы из файла кэша заданы относительно одной базовой валюты. Таблица хранит
+    их и обратные им значения в компактных массивах, индексированных кодом валюты,
+    поэтому курс любой валюты относительно любой другой получается одним умножением.
+    Валюты с некорректным (неположительным) курсом в таблицу не попадают.
+    """
+
+    def __init__(self, currency_rates: CurrencyRatesDTO) -> None:
+        """
+        Конструктор.
+
+        :param currency_rates: Курсы валют относительно базовой валюты
+        """
+
+        self.currency_rates = currency_rates
+
+        # код валюты -> позиция в массивах курсов
+        self.index: dict[str, int] = {}
+        # количество единиц валюты за единицу базовой валюты
+        self.rates = array("d")
+        # стоимость единицы валюты в базовой валюте
+        self.inverse = array("d")
+
+        for code, rate in {currency_rates.base: 1.0, **currency_rates.rates}.items():
+            if rate > 0:
+                self.index[code.upper()] = len(self.rates)
+                self.rates.append(rate)
+                self.inverse.append(1 / rate)
+
+    def get_rate(self, code: str, base: str) -> Optional[float]:
+        """
+        Получение стоимости единицы валюты в другой валюте.
+
+        :param code: Код валюты
+        :param base: Код валюты, в которой выражается стоимость
+        :return: None, если курс одной из валют неизвестен
+        """
+
+        position = self.index.get(code.upper())
+        base_position = self.index.get(base.upper())
+        if position is None or base_position is None:
+            return None
+
+        return self.rates[base_position] * self.inverse[position]
+
+    def get_rates(self, codes: Iterable[str], base: str) -> dict[str, float]:
+        """
+        Получение стоимости единицы каждой из валют в другой валюте.
+        Валюты с неизвестным курсом пропускаются.
+
+        :param codes: Коды валют
+        :param base: Код валюты, в которой выражается стоимость
+        :return:
+        """
+
+        base_position = self.index.get(base.upper())
+        if base_position is None:
+            return {}
+
+        base_rate = self.rates[base_position]
+        result = {}
+        for code in codes:
+            if (position := self.index.get(code.upper())) is not None:
+                result[code] = base_rate * self.inverse[position]
+
+        return result
+
+
+# общее для процесса хранилище данных из файлов кэша
+store = CacheStore()
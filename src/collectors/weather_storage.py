@@ -0,0 +1,311 @@
+"""
+Хранилища данных о погоде.
+"""
+
+import asyncio
+import errno
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import aiofiles.os
+
+import jsonlib
+from collectors.models import WeatherInfoDTO
+from collectors.storage import query, write
+from collectors.store import store
+
+
+def parse_weather(payload: dict) -> WeatherInfoDTO:
+    """
+    Получение данных о погоде из ответа внешнего сервиса.
+
+    :param payload: Ответ внешнего сервиса
+    :return:
+    """
+
+    return WeatherInfoDTO(
+        temp=payload["main"]["temp"],
+        pressure=payload["main"]["pressure"],
+        humidity=payload["main"]["humidity"],
+        wind_speed=payload["wind"]["speed"],
+        description=payload["weather"][0]["description"],
+    )
+
+
+async def get_mtime(path: str) -> Optional[int]:
+    """
+    Получение времени изменения файла или директории (в наносекундах).
+
+    :param path: Путь к файлу или директории
+    :return: Время изменения или None, если файл отсутствует
+    """
+
+    try:
+        return (await aiofiles.os.stat(path)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class BaseWeatherStorage(ABC):
+    """
+    Базовый класс, реализующий интерфейс для хранилищ данных о погоде.
+
+    Данные хранятся по ключу вида ``<столица>_<код страны>``.
+    """
+
+    @abstractmethod
+    async def get_updated(self) -> dict[str, float]:
+        """
+        Получение времени последнего обновления (timestamp) всех сохраненных записей.
+
+        :return:
+        """
+
+    @abstractmethod
+    async def get_version(self) -> Optional[int]:
+        """
+        Получение версии хранилища (времени изменения в наносекундах), которая
+        изменяется при каждом сохранении данных. Для отсутствующего хранилища – None.
+
+        :return:
+        """
+
+    @abstractmethod
+    async def save(self, payloads: dict[str, dict]) -> None:
+        """
+        Сохранение ответов внешнего сервиса.
+
+        :param payloads: Ключ записи -> ответ внешнего сервиса
+        :return:
+        """
+
+    @abstractmethod
+    async def read(self, key: str) -> Optional[WeatherInfoDTO]:
+        """
+        Чтение данных о погоде.
+
+        :param key: Ключ записи
+        :return:
+        :raises FileNotFoundError: Если данные для записи еще не собраны
+        """
+
+    @abstractmethod
+    def get_path(self, key: str) -> str:
+        """
+        Получение пути к файлу, при изменении которого изменяются данные записи.
+
+        :param key: Ключ записи
+        :return:
+        """
+
+
+class FileWeatherStorage(BaseWeatherStorage):
+    """
+    Хранение данных о погоде в отдельном JSON-файле для каждой столицы.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Конструктор.
+
+        :param directory: Путь к директории с файлами
+        """
+
+        self.directory = directory
+
+    def get_file_path(self, key: str) -> str:
+        """
+        Получение пути к файлу записи.
+
+        :param key: Ключ записи
+        :return:
+        """
+
+        return f"{self.directory}/{key}.json"
+
+    def get_path(self, key: str) -> str:
+        return self.get_file_path(key)
+
+    async def get_updated(self) -> dict[str, float]:
+        return await asyncio.to_thread(self._scan)
+
+    async def get_version(self) -> Optional[int]:
+        # запись файлов (через переименование) изменяет время изменения директории
+        return await get_mtime(self.directory)
+
+    def _scan(self) -> dict[str, float]:
+        """
+        Получение времени изменения непустых файлов за один обход директории.
+
+        :return:
+        """
+
+        if not os.path.isdir(self.directory):
+            return {}
+
+        result = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    if stat.st_size:
+                        result[entry.name[: -len(".json")]] = stat.st_mtime
+
+        return result
+
+    async def save(self, payloads: dict[str, dict]) -> None:
+        # если целевой директории еще не существует, то она создается
+        if not await aiofiles.os.path.exists(self.directory):
+            await aiofiles.os.makedirs(self.directory, exist_ok=True)
+
+        # импорт при записи, чтобы чтение не загружало модули сбора данных
+        from collectors.base import (  # pylint: disable=import-outside-toplevel
+            BaseCollector,
+        )
+
+        for key, payload in payloads.items():
+            await BaseCollector.write_cache(
+                self.get_file_path(key), jsonlib.dumps(payload)
+            )
+
+    async def read(self, key: str) -> Optional[WeatherInfoDTO]:
+        return await store.get(self.get_file_path(key), self._parse)
+
+    @staticmethod
+    def _parse(content: str) -> Optional[WeatherInfoDTO]:
+        """
+        Разбор содержимого файла.
+
+        :param content: Содержимое файла
+        :return:
+        """
+
+        if result := jsonlib.loads(content):
+            return parse_weather(result)
+
+        return None
+
+
+class SQLiteWeatherStorage(BaseWeatherStorage):
+    """
+    Хранение данных о погоде всех столиц в одной таблице SQLite.
+
+    Сохраняются только поля, необходимые для :class:`WeatherInfoDTO`, и время обновления.
+    Для чтения таблица загружается в память целиком одним запросом
+    и переиспользуется до изменения файла базы данных. База данных используется
+    в режиме WAL (:func:`collectors.storage.connect`).
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS weather (
+            key TEXT PRIMARY KEY,
+            temp REAL NOT NULL,
+            pressure INTEGER NOT NULL,
+            humidity INTEGER NOT NULL,
+            wind_speed REAL NOT NULL,
+            description TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Конструктор.
+
+        :param file_path: Путь к файлу базы данных
+        """
+
+        self.file_path = file_path
+
+    def get_path(self, key: str) -> str:
+        return self.file_path
+
+    async def get_updated(self) -> dict[str, float]:
+        return await asyncio.to_thread(self._get_updated)
+
+    async def get_version(self) -> Optional[int]:
+        return await get_mtime(self.file_path)
+
+    def _get_updated(self) -> dict[str, float]:
+        """
+        Получение времени обновления всех записей одним запросом.
+
+        :return:
+        """
+
+        if not os.path.isfile(self.file_path):
+            return {}
+
+        return dict(query(self.file_path, "SELECT key, updated_at FROM weather"))
+
+    async def save(self, payloads: dict[str, dict]) -> None:
+        updated_at = time.time()
+        rows: list[tuple] = []
+        for key, payload in payloads.items():
+            weather = parse_weather(payload)
+            rows.append(
+                (
+                    key,
+                    weather.temp,
+                    weather.pressure,
+                    weather.humidity,
+                    weather.wind_speed,
+                    weather.description,
+                    updated_at,
+                )
+            )
+
+        await asyncio.to_thread(self._save, rows)
+
+    def _save(self, rows: list[tuple]) -> None:
+        """
+        Сохранение записей в одной транзакции.
+
+        :param rows: Строки таблицы
+        :return:
+        """
+
+        write(
+            self.file_path,
+            self.schema,
+            lambda connection: connection.executemany(
+                "INSERT OR REPLACE INTO weather VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            ),
+        )
+
+    async def read(self, key: str) -> Optional[WeatherInfoDTO]:
+        items = await store.load(
+            self.file_path, lambda path: asyncio.to_thread(self._read_all)
+        )
+
+        # отсутствие записи обрабатывается так же, как отсутствие файла записи
+        if key not in items:
+            raise FileNotFoundError(
+                errno.ENOENT, os.strerror(errno.ENOENT), f"{self.file_path}#{key}"
+            )
+
+        return items[key]
+
+    def _read_all(self) -> dict[str, WeatherInfoDTO]:
+        """
+        Чтение всех записей одним запросом.
+
+        :return:
+        """
+
+        return {
+            key: WeatherInfoDTO(
+                temp=temp,
+                pressure=pressure,
+                humidity=humidity,
+                wind_speed=wind_speed,
+                description=description,
+            )
+            for key, temp, pressure, humidity, wind_speed, description in query(
+                self.file_path,
+                "SELECT key, temp, pressure, humidity, wind_speed, description "
+                "FROM weather",
+            )
+        }
@@ -0,0 +1,229 @@
+"""
+Выгрузка информации обо всех собранных странах в файл.
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Optional
+
+import asyncclick as click
+from aiofiles.threadpool.binary import AsyncBufferedIOBase
+from pydantic import ValidationError
+
+import jsonlib
+from collectors.base import BaseCollector
+from collectors.models import CountryDTO, LocationInfoDTO, json_default
+from collectors.readers import CountryReader
+from reader import Reader
+from renderer import Renderer
+from settings import EXPORT_CHUNK_SIZE, EXPORT_WORKERS, LOGGING_LEVEL
+
+# поддерживаемые форматы выгрузки
+FORMATS = ("text", "json", "csv")
+
+
+def render_chunk(location_infos: list[LocationInfoDTO], output_format: str) -> str:
+    """
+    Форматирование информации о группе стран.
+    Выполняется в отдельном процессе, поэтому является функцией модуля.
+
+    :param location_infos: Информация о странах
+    :param output_format: Формат выгрузки
+    :return:
+    """
+
+    if output_format == "json":
+        return "".join(
+            jsonlib.dumps(location_info, default=json_default) + "\n"
+            for location_info in location_infos
+        )
+
+    if output_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for location_info in location_infos:
+            writer.writerow(Renderer(location_info).get_row())
+
+        return buffer.getvalue()
+
+    return "".join(
+        "\n".join(Renderer(location_info).get_lines()) + "\n\n"
+        for location_info in location_infos
+    )
+
+
+async def read_chunks(chunk_size: int) -> AsyncIterator[list[LocationInfoDTO]]:
+    """
+    Формирование информации обо всех собранных странах группами.
+    Следующая группа формируется только при обращении к ней.
+
+    :param chunk_size: Количество стран в группе
+    :return:
+    """
+
+    countries = await CountryReader.read() or []
+    reader = Reader()
+
+    async def get_location_info(country: CountryDTO) -> Optional[LocationInfoDTO]:
+        try:
+            return await reader.get_location_info(country)
+        except (OSError, ValidationError):
+            logging.warning(
+                "Нет данных о погоде для %s, страна не выгружается.", country.name
+            )
+
+            return None
+
+    for start in range(0, len(countries), chunk_size):
+        # файлы с данными о погоде для группы стран читаются одновременно
+        results = await asyncio.gather(
+            *(
+                get_location_info(country)
+                for country in countries[start : start + chunk_size]  # noqa: E203
+            )
+        )
+
+        yield [location_info for location_info in results if location_info]
+
+
+async def render(
+    chunks: AsyncIterator[list[LocationInfoDTO]], output_format: str, workers: int
+) -> AsyncIterator[str]:
+    """
+    Форматирование групп стран в пуле процессов с сохранением их порядка.
+
+    Одновременно в обработке находится не больше ``2 * workers`` групп,
+    поэтому все данные не накапливаются в памяти. Количество процессов
+    не превышает количество процессоров, а при одном процессе форматирование
+    выполняется в текущем процессе без затрат на передачу данных.
+
+    :param chunks: Группы стран
+    :param output_format: Формат выгрузки
+    :param workers: Количество процессов
+    :return:
+    """
+
+    workers = min(workers, os.cpu_count() or 1)
+    if workers <= 1:
+        async for chunk in chunks:
+            yield render_chunk(chunk, output_format)
+
+        return
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(workers) as pool:
+        pending: deque[asyncio.Future[str]] = deque()
+        async for chunk in chunks:
+            pending.append(
+                loop.run_in_executor(pool, render_chunk, chunk, output_format)
+            )
+            if len(pending) >= 2 * workers:
+                yield await pending.popleft()
+
+        while pending:
+            yield await pending.popleft()
+
+
+async def export(
+    file_path: str,
+    output_format: str = "text",
+    workers: int = EXPORT_WORKERS,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """
+    Выгрузка информации обо всех собранных странах с погодой и курсами валют.
+    Результат записывается в файл по мере форматирования, а файл заменяется
+    целиком после успешной выгрузки.
+
+    :param file_path: Путь к файлу
+    :param output_format: Формат выгрузки (text, json – JSON Lines, csv)
+    :param workers: Количество процессов для форматирования
+    :param chunk_size: Количество стран в одном задании процесса
+    :return: Количество выгруженных стран
+    """
+
+    count = 0
+
+    async def count_chunks() -> AsyncIterator[list[LocationInfoDTO]]:
+        nonlocal count
+        async for chunk in read_chunks(chunk_size):
+            count += len(chunk)
+            yield chunk
+
+    async def write(file: AsyncBufferedIOBase) -> bool:
+        if output_format == "csv":
+            await file.write(render_header().encode())
+
+        async for content in render(count_chunks(), output_format, workers):
+            await file.write(content.encode())
+
+        return True
+
+    await BaseCollector.write_cache_stream(file_path, write)
+
+    return count
+
+
+def render_header() -> str:
+    """
+    Форматирование заголовка таблицы для выгрузки в формате CSV.
+
+    :return:
+    """
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(Renderer.ROW_HEADER)
+
+    return buffer.getvalue()
+
+
+@click.command()
+@click.option(
+    "--output",
+    "-o",
+    "file_path",
+    type=click.Path(dir_okay=False, writable=True),
+    required=True,
+    help="Путь к файлу для выгрузки",
+)
+@click.option(
+    "--format",
+    "-f",
+    "output_format",
+    type=click.Choice(FORMATS),
+    default="text",
+    show_default=True,
+    help="Формат выгрузки",
+)
+@click.option(
+    "--workers",
+    "-w",
+    "workers",
+    type=click.IntRange(min=0),
+    default=EXPORT_WORKERS,
+    show_default=True,
+    help="Количество процессов для форматирования данных (0 – без пула процессов)",
+)
+async def process_export(file_path: str, output_format: str, workers: int) -> None:
+    """
+    Выгрузка информации обо всех собранных странах в файл.
+
+    :param str file_path: Путь к файлу
+    :param str output_format: Формат выгрузки
+    :param int workers: Количество процессов
+    """
+
+    count = await export(file_path, output_format, workers)
+    logging.info("Выгружена информация о %s странах в %s.", count, file_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOGGING_LEVEL)
+    # запуск выгрузки
+    # pylint: disable=E1120
+    process_export(_anyio_backend="asyncio")
@@ -0,0 +1,109 @@
+"""
+Функции для работы с JSON.
+
+Если установлен пакет ``orjson``, то разбор и сериализация выполняются с его помощью,
+иначе используется стандартный модуль :mod:`json`.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Разбор JSON.
+
+    :param data: Строка или байты в формате JSON
+    :return:
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def dumps(value: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    Сериализация в строку в формате JSON.
+
+    :param value: Значение
+    :param default: Функция преобразования значений, не поддерживаемых сериализатором
+    :return:
+    """
+
+    if orjson is not None:
+        return orjson.dumps(value, default=default).decode()
+
+    return json.dumps(value, default=default)
+
+
+def check_file(file_path: str) -> bool:
+    """
+    Проверка того, что файл содержит непустой объект или массив в формате JSON.
+
+    Файл разбирается полностью, поэтому при работе в цикле событий
+    проверка выполняется в отдельном потоке.
+
+    :param file_path: Путь к файлу
+    :return:
+    """
+
+    try:
+        with open(file_path, mode="rb") as file:
+            value = loads(file.read())
+    except (OSError, ValueError):
+        return False
+
+    return isinstance(value, (dict, list)) and bool(value)
+
+
+class JSONStreamCheck:
+    """
+    Быстрая проверка ответа в формате JSON, получаемого по частям, без его разбора.
+
+    Проверяется, что документ является объектом или массивом и получен целиком
+    (первый и последний значимые символы – парные скобки), что отсекает
+    HTML-страницы ошибок и оборванные ответы без чтения записанного файла.
+    Синтаксис и содержимое документа проверяются :func:`check_file`.
+    """
+
+    # парные скобки в начале и в конце документа
+    brackets = {b"[": b"]", b"{": b"}"}
+
+    def __init__(self) -> None:
+        """
+        Конструктор.
+        """
+
+        self.first = b""
+        self.last = b""
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Учет очередной части документа.
+
+        :param chunk: Часть документа
+        :return:
+        """
+
+        self.size += len(chunk)
+        if stripped := chunk.strip():
+            if not self.first:
+                self.first = stripped[:1]
+            self.last = stripped[-1:]
+
+    def is_valid(self) -> bool:
+        """
+        Проверка того, что документ может быть объектом или массивом, полученным целиком.
+
+        :return:
+        """
+
+        return self.brackets.get(self.first) == self.last
@@ -2,11 +2,18 @@
 Функции для логирования.
 """
 import logging
+import time
 from types import SimpleNamespace
 
 import aiohttp
-from aiohttp import ClientSession, TraceRequestStartParams
+from aiohttp import (
+    ClientSession,
+    TraceRequestEndParams,
+    TraceRequestExceptionParams,
+    TraceRequestStartParams,
+)
 
+from metrics import metrics
 from settings import LOGGING_LEVEL
 
 
@@ -23,8 +30,66 @@ async def on_request_start(
     """
     # pylint: disable=unused-argument
     logging.getLogger("aiohttp.client").debug("Starting request <%s>", params)
+    context.started = time.perf_counter()
+
+
+async def on_request_end(
+    session: ClientSession, context: SimpleNamespace, params: TraceRequestEndParams
+) -> None:
+    """
+    Действия при получении ответа на HTTP-запрос.
+
+    :param ClientSession session: Сессия для HTTP-запроса
+    :param SimpleNamespace context: Контекст запроса
+    :param TraceRequestEndParams params: Параметры запроса и ответ
+    :return:
+    """
+    # pylint: disable=unused-argument
+    duration = time.perf_counter() - context.started
+    logging.getLogger("aiohttp.client").debug(
+        "Request to %s finished with %s in %.3f s",
+        params.url.host,
+        params.response.status,
+        duration,
+    )
+    metrics.observe(
+        "http_request_duration_seconds",
+        duration,
+        host=params.url.host,
+        status=params.response.status,
+    )
+
+
+async def on_request_exception(
+    session: ClientSession,
+    context: SimpleNamespace,
+    params: TraceRequestExceptionParams,
+) -> None:
+    """
+    Действия при ошибке выполнения HTTP-запроса.
+
+    :param ClientSession session: Сессия для HTTP-запроса
+    :param SimpleNamespace context: Контекст запроса
+    :param TraceRequestExceptionParams params: Параметры запроса и ошибка
+    :return:
+    """
+    # pylint: disable=unused-argument
+    metrics.observe(
+        "http_request_duration_seconds",
+        time.perf_counter() - context.started,
+        host=params.url.host,
+        status="error",
+    )
+    metrics.inc(
+        "http_request_errors_total",
+        host=params.url.host,
+        error=type(params.exception).__name__,
+    )
 
 
 logging.basicConfig(level=LOGGING_LEVEL)
 trace_config = aiohttp.TraceConfig()
-trace_config.on_request_start.append(on_request_start)
+# сигналы aiohttp типизированы для обработчиков с одним аргументом
+trace_config.on_request_start.append(on_request_start)  # type: ignore[arg-type]
+trace_config.on_request_end.append(on_request_end)  # type: ignore[arg-type]
+trace_config.on_request_exception.append(on_request_exception)  # type: ignore[arg-type]
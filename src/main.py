@@ -2,10 +2,17 @@
 Запуск приложения.
 """
 
+import asyncio
+import json
+import logging
+from typing import Optional, TextIO
+
 import asyncclick as click
 
+from collectors.models import LocationInfoDTO, json_default
 from reader import Reader
 from renderer import Renderer
+from settings import BATCH_CONCURRENCY_LIMIT, LOGGING_LEVEL
 
 
 @click.command()
@@ -15,16 +22,129 @@ from renderer import Renderer
     "location",
     type=str,
     help="Страна и/или город",
-    prompt="Страна и/или город",
 )
-async def process_input(location: str) -> None:
+@click.option(
+    "--batch",
+    "-b",
+    "batch",
+    type=click.File("r"),
+    help="Файл со списком мест (по одному в строке), «-» для стандартного ввода",
+)
+@click.option(
+    "--format",
+    "-f",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Формат вывода результатов",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    "concurrency",
+    type=click.IntRange(min=1),
+    default=BATCH_CONCURRENCY_LIMIT,
+    show_default=True,
+    help="Количество одновременно обрабатываемых запросов в пакетном режиме",
+)
+async def process_input(
+    location: Optional[str],
+    batch: Optional[TextIO],
+    output_format: str,
+    concurrency: int,
+) -> None:
     """
     Поиск и вывод информации о стране, погоде и курсах валют.
 
     :param str location: Страна и/или город
+    :param batch: Файл со списком мест для пакетной обработки
+    :param str output_format: Формат вывода результатов
+    :param int concurrency: Количество одновременно обрабатываемых запросов
+    """
+
+    if batch is not None:
+        await process_batch(batch, output_format, concurrency)
+        return
+
+    if location is None:
+        location = click.prompt("Страна и/или город", type=str)
+
+    await output(location, await Reader().find(location), output_format)
+
+
+async def process_batch(source: TextIO, output_format: str, concurrency: int) -> None:
+    """
+    Пакетный поиск информации для списка мест.
+
+    Строки читаются в отдельном потоке и передаются обработчикам через ограниченную
+    очередь, поэтому поиск начинается до окончания ввода (например, при чтении
+    из канала), а в памяти находится не больше ``2 * concurrency`` непрочитанных строк.
+    Результаты выводятся по мере готовности, а не в порядке следования строк.
+
+    :param source: Источник строк для поиска
+    :param output_format: Формат вывода результатов
+    :param concurrency: Количество одновременно обрабатываемых запросов
+    :return:
+    """
+
+    # общий экземпляр, чтобы файлы кэша разбирались один раз на весь пакет
+    reader = Reader()
+    queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=2 * concurrency)
+    # вывод одного результата не прерывается выводом другого
+    lock = asyncio.Lock()
+
+    async def produce() -> None:
+        try:
+            while line := await asyncio.to_thread(source.readline):
+                if search := line.strip():
+                    await queue.put(search)
+        finally:
+            # признак окончания ввода для каждого обработчика
+            for _ in range(concurrency):
+                await queue.put(None)
+
+    async def resolve() -> None:
+        while (search := await queue.get()) is not None:
+            try:
+                location_info = await reader.find(search)
+            except Exception:
+                logging.exception("Ошибка при поиске информации для %s.", search)
+                location_info = None
+
+            async with lock:
+                await output(search, location_info, output_format, show_search=True)
+
+    await asyncio.gather(produce(), *(resolve() for _ in range(concurrency)))
+
+
+async def output(
+    search: str,
+    location_info: Optional[LocationInfoDTO],
+    output_format: str,
+    show_search: bool = False,
+) -> None:
     """
+    Вывод результата поиска.
+
+    :param search: Строка для поиска
+    :param location_info: Найденная информация
+    :param output_format: Формат вывода результатов
+    :param show_search: Выводить ли строку для поиска перед результатом
+    :return:
+    """
+
+    if output_format == "json":
+        click.echo(
+            json.dumps(
+                {"search": search, "result": location_info}, default=json_default
+            )
+        )
+        return
+
+    if show_search:
+        click.secho(f"Поиск: {search}", bold=True)
 
-    location_info = await Reader().find(location)
     if location_info:
         lines = await Renderer(location_info).render()
 
@@ -35,6 +155,8 @@ async def process_input(location: str) -> None:
 
 
 if __name__ == "__main__":
+    # модули сбора данных (и настройка логирования в них) не загружаются при поиске
+    logging.basicConfig(level=LOGGING_LEVEL)
     # запуск обработки входного файла
     # pylint: disable=E1120
     process_input(_anyio_backend="asyncio")
@@ -0,0 +1,227 @@
+"""
+Сбор показателей работы приложения (счетчики и время выполнения операций).
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar, cast
+
+import atomic
+from settings import LOGGING_PATH, METRICS_FORMAT
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# метки показателя в виде упорядоченного набора пар (название, значение)
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    """
+    Хранилище показателей работы процесса.
+
+    Показатели накапливаются в памяти и выгружаются в файл в директории логов
+    в формате JSON или в текстовом формате Prometheus (для textfile collector).
+    """
+
+    def __init__(self) -> None:
+        """
+        Конструктор.
+        """
+
+        # название -> метки -> значение
+        self.counters: dict[str, dict[Labels, float]] = {}
+        # название -> метки -> [количество, суммарное время, максимальное время]
+        self.timers: dict[str, dict[Labels, list[float]]] = {}
+
+    @staticmethod
+    def get_labels(labels: dict[str, Any]) -> Labels:
+        """
+        Получение упорядоченных меток показателя.
+
+        :param labels: Метки
+        :return:
+        """
+
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Увеличение значения счетчика.
+
+        :param name: Название счетчика
+        :param value: Значение, на которое увеличивается счетчик
+        :param labels: Метки
+        :return:
+        """
+
+        counter = self.counters.setdefault(name, {})
+        key = self.get_labels(labels)
+        counter[key] = counter.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """
+        Сохранение времени выполнения операции.
+
+        :param name: Название показателя
+        :param seconds: Время выполнения (в секундах)
+        :param labels: Метки
+        :return:
+        """
+
+        timer = self.timers.setdefault(name, {})
+        key = self.get_labels(labels)
+        if key not in timer:
+            timer[key] = [0, 0, 0]
+
+        values = timer[key]
+        values[0] += 1
+        values[1] += seconds
+        values[2] = max(values[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """
+        Измерение времени выполнения блока кода.
+
+        :param name: Название показателя
+        :param labels: Метки
+        :return:
+        """
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """
+        Декоратор для измерения времени выполнения асинхронного метода.
+        В метку ``collector`` записывается название класса объекта.
+
+        :param name: Название показателя
+        :return:
+        """
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            async def wrapper(instance: Any, *args: Any, **kwargs: Any) -> Any:
+                with self.timer(name, collector=type(instance).__name__):
+                    return await func(instance, *args, **kwargs)
+
+            return cast(F, wrapper)
+
+        return decorator
+
+    def snapshot(self) -> dict:
+        """
+        Получение текущих значений всех показателей.
+
+        :return:
+        """
+
+        return {
+            "timestamp": time.time(),
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for name, counter in sorted(self.counters.items())
+                for labels, value in counter.items()
+            ],
+            "timers": [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": values[0],
+                    "sum": values[1],
+                    "max": values[2],
+                }
+                for name, timer in sorted(self.timers.items())
+                for labels, values in timer.items()
+            ],
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Получение значений всех показателей в текстовом формате Prometheus.
+
+        :return:
+        """
+
+        lines = []
+        for name, counter in sorted(self.counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in counter.items():
+                lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+        for name, timer in sorted(self.timers.items()):
+            lines.append(f"# TYPE {name} summary")
+            for labels, values in timer.items():
+                formatted = self._format_labels(labels)
+                lines.append(f"{name}_count{formatted} {values[0]}")
+                lines.append(f"{name}_sum{formatted} {values[1]}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _format_labels(labels: Labels) -> str:
+        """
+        Форматирование меток для текстового формата Prometheus.
+
+        :param labels: Метки
+        :return:
+        """
+
+        if not labels:
+            return ""
+
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+
+    async def export(self, directory: Optional[str] = None) -> Optional[str]:
+        """
+        Выгрузка показателей в файл в соответствии с настройками.
+        Ошибка выгрузки не прерывает работу приложения.
+
+        :param directory: Директория для файла, по умолчанию – директория логов
+        :return: Путь к файлу или None, если выгрузка отключена или не удалась
+        """
+
+        directory = directory or LOGGING_PATH
+
+        if METRICS_FORMAT == "prometheus":
+            file_path, content = f"{directory}/metrics.prom", self.to_prometheus()
+        elif METRICS_FORMAT == "json":
+            file_path, content = f"{directory}/metrics.json", json.dumps(
+                self.snapshot()
+            )
+        else:
+            return None
+
+        try:
+            await asyncio.to_thread(atomic.write_text, file_path, content)
+        except OSError:
+            logging.warning("Не удалось сохранить показатели в %s.", file_path)
+
+            return None
+
+        return file_path
+
+    def clear(self) -> None:
+        """
+        Сброс всех показателей.
+
+        :return:
+        """
+
+        self.counters.clear()
+        self.timers.clear()
+
+
+# общее для процесса хранилище показателей
+metrics = Metrics()
@@ -2,14 +2,8 @@
 Поиск собранной информации в файлах на диске.
 """
 
-from difflib import SequenceMatcher
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 
-from collectors.collector import (
-    CountryCollector,
-    CurrencyRatesCollector,
-    WeatherCollector,
-)
 from collectors.models import (
     CountryDTO,
     CurrencyInfoDTO,
@@ -17,6 +11,19 @@ from collectors.models import (
     LocationInfoDTO,
     WeatherInfoDTO,
 )
+from collectors.readers import CountryReader, CurrencyRatesReader, WeatherReader
+from collectors.store import ResultCache
+from search import CountrySearch, normalize
+from settings import (
+    CACHE_TTL_COUNTRY,
+    CACHE_TTL_CURRENCY_RATES,
+    CACHE_TTL_WEATHER,
+    READER_CACHE_SIZE,
+    READER_CACHE_TTL,
+)
+
+# признак отсутствия результата в кэше (None – сохраненный результат поиска)
+MISSING = object()
 
 
 class Reader:
@@ -24,46 +31,134 @@ class Reader:
     Чтение сохраненных данных.
     """
 
+    # поисковый индекс, построенный для последней прочитанной версии данных о странах
+    _search: Optional[CountrySearch] = None
+    # результаты поиска по нормализованной строке запроса
+    cache = ResultCache(maxsize=READER_CACHE_SIZE, ttl=READER_CACHE_TTL)
+
     async def find(self, location: str) -> Optional[LocationInfoDTO]:
         """
         Поиск данных о стране по строке.
+        Результаты поиска сохраняются в кэше (:attr:`cache`) по нормализованной строке.
 
         :param location: Строка для поиска
         :return:
         """
 
-        country = await self.find_country(location)
-        if country:
-            weather = await self.get_weather(
-                LocationDTO(capital=country.capital, alpha2code=country.alpha2code)
-            )
-            currency_rates = await self.get_currency_rates(country.currencies)
+        search = normalize(location)
+
+        async def find() -> Optional[LocationInfoDTO]:
+            if country := await self.find_country(search):
+                return await self.get_location_info(country)
+
+            return None
+
+        return await self._cached(search, find)
+
+    async def find_by_alpha2code(self, alpha2code: str) -> Optional[LocationInfoDTO]:
+        """
+        Получение данных о стране по ее коду (ISO 3166-1 alpha-2).
+
+        :param alpha2code: Код страны
+        :return:
+        """
+
+        code = alpha2code.strip().lower()
+
+        async def find() -> Optional[LocationInfoDTO]:
+            if index := await CountryReader.read_index():
+                if country := index.by_alpha2code.get(code):
+                    return await self.get_location_info(country)
+
+            return None
+
+        # код страны не пересекается с нормализованными строками поиска
+        return await self._cached(f"#{code}", find)
+
+    async def _cached(
+        self, key: str, find: Callable[[], Awaitable[Optional[LocationInfoDTO]]]
+    ) -> Optional[LocationInfoDTO]:
+        """
+        Получение результата поиска из кэша или его вычисление и сохранение.
+
+        :param key: Ключ кэша
+        :param find: Функция поиска
+        :return:
+        """
+
+        result: Any = await self.cache.get(key, MISSING)
+        if result is MISSING:
+            result = await find()
+            self.cache.put(key, result, await self.get_dependencies(result))
 
-            return LocationInfoDTO(
-                location=country,
-                weather=weather,
-                currency_rates=currency_rates,
+        return result
+
+    @staticmethod
+    async def get_dependencies(
+        location_info: Optional[LocationInfoDTO],
+    ) -> dict[str, float]:
+        """
+        Получение файлов кэша, от которых зависит результат поиска,
+        и сроков актуальности их данных.
+
+        :param location_info: Результат поиска
+        :return: Путь к файлу -> срок актуальности данных (в секундах)
+        """
+
+        dependencies: dict[str, float] = {
+            CountryReader.get_storage().get_path(): CACHE_TTL_COUNTRY
+        }
+        if location_info is not None:
+            location = LocationDTO(
+                capital=location_info.location.capital,
+                alpha2code=location_info.location.alpha2code,
             )
+            dependencies[
+                CurrencyRatesReader.get_storage().get_path()
+            ] = CACHE_TTL_CURRENCY_RATES
+            dependencies[
+                WeatherReader.get_storage().get_path(
+                    WeatherReader.get_filename(location)
+                )
+            ] = CACHE_TTL_WEATHER
+
+        return dependencies
+
+    async def get_location_info(self, country: CountryDTO) -> LocationInfoDTO:
+        """
+        Формирование информации о стране вместе с погодой в столице и курсами валют.
 
-        return None
+        :param country: Данные о стране
+        :return:
+        """
+
+        weather = await self.get_weather(
+            LocationDTO(capital=country.capital, alpha2code=country.alpha2code)
+        )
+        currency_rates = await self.get_currency_rates(country.currencies)
+
+        return LocationInfoDTO(
+            location=country,
+            weather=weather,
+            currency_rates=currency_rates,
+        )
 
     @staticmethod
-    async def get_currency_rates(currencies: set[CurrencyInfoDTO]) -> dict[str, float]:
+    async def get_currency_rates(
+        currencies: set[CurrencyInfoDTO], base: str = "RUB"
+    ) -> dict[str, float]:
         """
         Чтение и формирование информации о курсах валют.
 
         :param currencies: Множество с данными о курсах валют
+        :param base: Код валюты, в которой выражается стоимость валют
         :return:
         """
 
-        currency_rates = await CurrencyRatesCollector.read()
-        result = {}
-        for currency in currencies:
-            if currency_rates:
-                if isinstance(rate := currency_rates.rates.get(currency.code), float):
-                    result[currency.code] = 1 / rate
+        if table := await CurrencyRatesReader.read_table():
+            return table.get_rates((currency.code for currency in currencies), base)
 
-        return result
+        return {}
 
     @staticmethod
     async def get_weather(location: LocationDTO) -> Optional[WeatherInfoDTO]:
@@ -73,7 +168,7 @@ class Reader:
         :param location: Объект локации для получения данных
         :return:
         """
-        return await WeatherCollector.read(location=location)
+        return await WeatherReader.read(location=location)
 
     async def find_country(self, search: str) -> Optional[CountryDTO]:
         """
@@ -83,13 +178,30 @@ class Reader:
         :return:
         """
 
-        if countries := await CountryCollector.read():
-            for country in countries:
-                if await self._match(search, country):
-                    return country
+        if index := await CountryReader.read_index():
+            # поиск по точному совпадению с использованием индексов
+            if country := index.get(search):
+                return country
+
+            return self.get_search(index.countries).find(search)
 
         return None
 
+    @classmethod
+    def get_search(cls, countries: list[CountryDTO]) -> CountrySearch:
+        """
+        Получение поискового индекса для списка стран.
+        Индекс перестраивается только при изменении данных о странах.
+
+        :param countries: Список стран
+        :return:
+        """
+
+        if cls._search is None or cls._search.countries is not countries:
+            cls._search = CountrySearch(countries)
+
+        return cls._search
+
     @staticmethod
     async def _match(search: str, country: CountryDTO) -> bool:
         """
@@ -100,21 +212,4 @@ class Reader:
         :return:
         """
 
-        words = search.split()
-        # степень схожести сравниваемого текста
-        ratio = 0.67
-        for word in words:
-            if any(
-                [
-                    search.lower() in country.capital.lower()
-                    or SequenceMatcher(None, word, country.capital).ratio() > ratio,
-                    *[
-                        search.lower() in spelling.lower()
-                        or SequenceMatcher(None, word, spelling).ratio() > ratio
-                        for spelling in country.alt_spellings
-                    ],
-                ]
-            ):
-                return True
-
-        return False
+        return CountrySearch.match(search, country)
@@ -21,6 +21,19 @@ class Renderer:
 
         self.location_info = location_info
 
+    # заголовок таблицы для :meth:`get_row`
+    ROW_HEADER = (
+        "Код страны",
+        "Страна",
+        "Столица",
+        "Регион",
+        "Языки",
+        "Население страны",
+        "Курсы валют",
+        "Погода, °C",
+        "Описание погоды",
+    )
+
     async def render(self) -> tuple[str, ...]:
         """
         Форматирование прочитанных данных.
@@ -28,17 +41,46 @@ class Renderer:
         :return: Результат форматирования
         """
 
+        return self.get_lines()
+
+    def get_lines(self) -> tuple[str, ...]:
+        """
+        Форматирование прочитанных данных в виде строк текста.
+
+        :return:
+        """
+
         return (
             f"Страна: {self.location_info.location.name}",
             f"Столица: {self.location_info.location.capital}",
             f"Регион: {self.location_info.location.subregion}",
-            f"Языки: {await self._format_languages()}",
-            f"Население страны: {await self._format_population()} чел.",
-            f"Курсы валют: {await self._format_currency_rates()}",
+            f"Языки: {self._format_languages()}",
+            f"Население страны: {self._format_population()} чел.",
+            f"Курсы валют: {self._format_currency_rates()}",
             f"Погода: {self.location_info.weather.temp} °C",
         )
 
-    async def _format_languages(self) -> str:
+    def get_row(self) -> tuple[str, ...]:
+        """
+        Форматирование прочитанных данных в виде строки таблицы
+        (столбцы описаны в :attr:`ROW_HEADER`).
+
+        :return:
+        """
+
+        return (
+            self.location_info.location.alpha2code,
+            self.location_info.location.name,
+            self.location_info.location.capital,
+            self.location_info.location.subregion,
+            self._format_languages(),
+            self._format_population(),
+            self._format_currency_rates(),
+            str(self.location_info.weather.temp),
+            self.location_info.weather.description,
+        )
+
+    def _format_languages(self) -> str:
         """
         Форматирование информации о языках.
 
@@ -50,7 +92,7 @@ class Renderer:
             for item in self.location_info.location.languages
         )
 
-    async def _format_population(self) -> str:
+    def _format_population(self) -> str:
         """
         Форматирование информации о населении.
 
@@ -60,7 +102,7 @@ class Renderer:
         # pylint: disable=C0209
         return "{:,}".format(self.location_info.location.population).replace(",", ".")
 
-    async def _format_currency_rates(self) -> str:
+    def _format_currency_rates(self) -> str:
         """
         Форматирование информации о курсах валют.
 
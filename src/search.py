@@ -0,0 +1,241 @@
+"""
+Функции нечеткого поиска стран.
+"""
+
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from itertools import chain
+from typing import Collection, Iterable, Optional
+
+from collectors.models import CountryDTO
+
+
+def normalize(value: str) -> str:
+    """
+    Нормализация строки для сравнения: нижний регистр и одиночные пробелы.
+
+    :param value: Исходная строка
+    :return:
+    """
+
+    return " ".join(value.lower().split())
+
+
+class CountrySearch:
+    """
+    Поиск страны по столице и альтернативным написаниям названия.
+
+    Строки для сравнения нормализуются один раз при построении индекса.
+    Для каждого запроса сравниваются только строки, имеющие достаточно общих биграмм
+    с запросом (с учетом границ строк), а результатом является страна с наилучшей
+    оценкой сходства:
+    сначала точное совпадение, затем вхождение запроса в строку,
+    затем наибольшая степень схожести одного из слов запроса.
+    """
+
+    # степень схожести сравниваемого текста
+    ratio = 0.67
+    # длина n-грамм для индекса
+    size = 2
+    # символ, которым обозначаются границы строки в n-граммах
+    boundary = "\0"
+
+    # виды совпадений в порядке приоритета
+    FUZZY, CONTAINS, EXACT = range(3)
+
+    def __init__(self, countries: list[CountryDTO]) -> None:
+        """
+        Конструктор.
+
+        :param countries: Список стран для поиска
+        """
+
+        self.countries = countries
+
+        # нормализованные строки для сравнения и позиции стран, к которым они относятся
+        self._values: list[str] = []
+        self._owners: list[int] = []
+        # n-грамма (с учетом границ строки) -> идентификаторы строк, содержащих ее,
+        # по одному для каждого вхождения n-граммы в строку
+        self._ngrams: dict[str, list[int]] = defaultdict(list)
+
+        for position, country in enumerate(countries):
+            for value in dict.fromkeys(self._get_values(country)):
+                value_id = len(self._values)
+                self._values.append(value)
+                self._owners.append(position)
+                for ngram in self._get_ngrams(value, padded=True, unique=False):
+                    self._ngrams[ngram].append(value_id)
+
+    def find(self, search: str) -> Optional[CountryDTO]:
+        """
+        Поиск наиболее подходящей страны.
+
+        :param search: Строка для поиска
+        :return:
+        """
+
+        query = normalize(search)
+        if not query:
+            return None
+
+        # позиция страны -> лучшая оценка (вид совпадения, степень схожести)
+        scores: dict[int, tuple[int, float]] = {}
+
+        for value_id in self._find_containing(query):
+            value = self._values[value_id]
+            kind = self.EXACT if value == query else self.CONTAINS
+            self._update(
+                scores, self._owners[value_id], (kind, len(query) / len(value))
+            )
+
+        for word in query.split():
+            matcher = SequenceMatcher(None, b=word)
+            for value_id in self._find_similar(word):
+                matcher.set_seq1(self._values[value_id])
+                if (
+                    matcher.real_quick_ratio() > self.ratio
+                    and matcher.quick_ratio() > self.ratio
+                    and (ratio := matcher.ratio()) > self.ratio
+                ):
+                    self._update(scores, self._owners[value_id], (self.FUZZY, ratio))
+
+        if not scores:
+            return None
+
+        # при равных оценках выбирается страна, расположенная раньше в списке
+        position = min(
+            scores, key=lambda item: (-scores[item][0], -scores[item][1], item)
+        )
+
+        return self.countries[position]
+
+    @classmethod
+    def match(cls, search: str, country: CountryDTO) -> bool:
+        """
+        Проверка сходства строки для поиска с данными одной страны.
+
+        :param search: Строка для сравнения
+        :param CountryDTO country: Данные о стране
+        :return:
+        """
+
+        query = normalize(search)
+        values = cls._get_values(country)
+        if any(query in value for value in values):
+            return True
+
+        for word in query.split():
+            matcher = SequenceMatcher(None, b=word)
+            for value in values:
+                matcher.set_seq1(value)
+                if (
+                    matcher.real_quick_ratio() > cls.ratio
+                    and matcher.quick_ratio() > cls.ratio
+                    and matcher.ratio() > cls.ratio
+                ):
+                    return True
+
+        return False
+
+    @staticmethod
+    def _get_values(country: CountryDTO) -> list[str]:
+        """
+        Получение нормализованных строк страны для сравнения.
+
+        :param CountryDTO country: Данные о стране
+        :return:
+        """
+
+        return [normalize(value) for value in (country.capital, *country.alt_spellings)]
+
+    @classmethod
+    def _get_ngrams(
+        cls, value: str, padded: bool = False, unique: bool = True
+    ) -> Collection[str]:
+        """
+        Получение n-грамм строки.
+
+        :param value: Строка
+        :param padded: Дополнить ли строку символами границы с обеих сторон
+        :param unique: Вернуть множество n-грамм (иначе – список всех вхождений)
+        :return:
+        """
+
+        size = cls.size
+        if padded:
+            value = f"{cls.boundary}{value}{cls.boundary}"
+
+        ngrams = [value[i : i + size] for i in range(len(value) - size + 1)]  # noqa
+        return set(ngrams) if unique else ngrams
+
+    def _find_containing(self, query: str) -> Iterable[int]:
+        """
+        Получение идентификаторов строк, содержащих запрос.
+
+        :param query: Нормализованная строка для поиска
+        :return:
+        """
+
+        if len(query) < self.size:
+            # короткие запросы проверяются простым перебором
+            candidates: Iterable[int] = range(len(self._values))
+        else:
+            # строка, содержащая запрос, содержит и все его n-граммы
+            postings = sorted(
+                (self._ngrams.get(ngram, []) for ngram in self._get_ngrams(query)),
+                key=len,
+            )
+            candidates = set(postings[0]).intersection(*postings[1:])
+
+        return (value_id for value_id in candidates if query in self._values[value_id])
+
+    def _find_similar(self, word: str) -> Iterable[int]:
+        """
+        Получение идентификаторов строк, которые могут быть схожи со словом
+        (степень схожести больше ``ratio``).
+
+        Строки отбираются по количеству общих биграмм с учетом границ строк.
+        Соседние совпадающие блоки :class:`SequenceMatcher` разделены хотя бы одним
+        несовпавшим символом, как и крайние блоки и границы строк (если блок
+        не начинается или не заканчивается на границе обеих строк). Поэтому
+        для ``M`` совпавших символов и ``C`` общих биграмм в блоках
+        ``3M <= len(a) + len(b) + C - 1``, а степень схожести ``2M / (len(a) + len(b))``
+        больше ``ratio`` только при ``C > (1.5 * ratio - 1) * (len(a) + len(b)) + 1``.
+        Количество вхождений биграмм слова в строку не меньше ``C``, поэтому
+        отбор не пропускает схожие строки любой длины.
+
+        :param word: Слово из строки для поиска
+        :return:
+        """
+
+        # идентификатор строки -> количество вхождений в нее биграмм слова
+        hits = Counter(
+            chain.from_iterable(
+                self._ngrams.get(ngram, ())
+                for ngram in self._get_ngrams(word, padded=True)
+            )
+        )
+        factor = 1.5 * self.ratio - 1
+
+        return sorted(
+            value_id
+            for value_id, count in hits.items()
+            if count > factor * (len(word) + len(self._values[value_id])) + 1
+        )
+
+    @staticmethod
+    def _update(
+        scores: dict[int, tuple[int, float]], position: int, score: tuple[int, float]
+    ) -> None:
+        """
+        Сохранение оценки страны, если она лучше сохраненной ранее.
+
+        :param scores: Оценки стран
+        :param position: Позиция страны
+        :param score: Оценка совпадения
+        :return:
+        """
+
+        if score > scores.get(position, (-1, 0.0)):
+            scores[position] = score
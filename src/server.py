@@ -0,0 +1,209 @@
+"""
+HTTP-сервис для поиска информации о странах.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+import asyncclick as click
+from aiohttp import web
+
+import jsonlib
+from collectors.models import LocationInfoDTO, json_default
+from collectors.readers import CountryReader, CurrencyRatesReader
+from collectors.store import store
+from metrics import metrics
+from reader import Reader
+from settings import SERVER_HOST, SERVER_PORT, SERVER_RELOAD_INTERVAL
+
+
+def create_app(reload_interval: float = SERVER_RELOAD_INTERVAL) -> web.Application:
+    """
+    Создание приложения HTTP-сервиса.
+
+    Данные из файлов кэша хранятся в памяти процесса, а изменение файлов
+    проверяется не чаще одного раза за ``reload_interval`` секунд,
+    поэтому запросы не обращаются к диску, пока сборщик не обновит данные.
+
+    :param reload_interval: Интервал проверки обновления файлов кэша (в секундах)
+    :return:
+    """
+
+    store.check_interval = reload_interval
+
+    app = web.Application(middlewares=[error_middleware])
+    app["reader"] = Reader()
+    app.router.add_get("/lookup", lookup)
+    app.router.add_get("/country/{alpha2code}", country)
+    app.router.add_get("/countries", countries)
+    app.router.add_get("/metrics", export_metrics)
+    app.on_startup.append(warm_up)
+    app.on_cleanup.append(save_metrics)
+
+    return app
+
+
+async def warm_up(app: web.Application) -> None:
+    """
+    Чтение данных о странах и курсах валют до обработки первого запроса.
+
+    :param app: Приложение
+    :return:
+    """
+
+    try:
+        await CountryReader.read_index()
+        await CurrencyRatesReader.read_table()
+    except OSError:
+        logging.warning("Данные еще не собраны, они будут прочитаны при запросе.")
+
+
+async def save_metrics(app: web.Application) -> None:
+    """
+    Выгрузка показателей работы сервиса в директорию логов при остановке.
+
+    :param app: Приложение
+    :return:
+    """
+
+    await metrics.export()
+
+
+@web.middleware
+async def error_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """
+    Обработка отсутствия файлов кэша (данные еще не собраны).
+
+    :param request: Запрос
+    :param handler: Обработчик запроса
+    :return:
+    """
+
+    try:
+        return await handler(request)
+    except OSError:
+        logging.exception("Ошибка чтения данных при обработке %s.", request.path)
+
+        return web.json_response({"error": "Данные недоступны."}, status=503)
+
+
+async def lookup(request: web.Request) -> web.Response:
+    """
+    Поиск информации о стране по строке: ``GET /lookup?q=<страна и/или город>``.
+
+    :param request: Запрос
+    :return:
+    """
+
+    search = request.query.get("q", "").strip()
+    if not search:
+        return web.json_response({"error": "Не задан параметр q."}, status=400)
+
+    return respond(await request.app["reader"].find(search))
+
+
+async def country(request: web.Request) -> web.Response:
+    """
+    Получение информации о стране по коду: ``GET /country/<код страны>``.
+
+    :param request: Запрос
+    :return:
+    """
+
+    return respond(
+        await request.app["reader"].find_by_alpha2code(request.match_info["alpha2code"])
+    )
+
+
+async def export_metrics(request: web.Request) -> web.Response:
+    """
+    Получение показателей работы сервиса (в том числе попаданий в кэш результатов
+    поиска) в текстовом формате Prometheus: ``GET /metrics``.
+
+    :param request: Запрос
+    :return:
+    """
+
+    return web.Response(text=metrics.to_prometheus(), content_type="text/plain")
+
+
+async def countries(request: web.Request) -> web.Response:
+    """
+    Выборка стран по субрегиону и минимальной численности населения:
+    ``GET /countries?subregion=<субрегион>&min_population=<численность>``.
+
+    :param request: Запрос
+    :return:
+    """
+
+    try:
+        min_population = int(request.query.get("min_population", 0))
+    except ValueError:
+        return web.json_response(
+            {"error": "Параметр min_population должен быть числом."}, status=400
+        )
+
+    result = await CountryReader.filter(request.query.get("subregion"), min_population)
+
+    return web.Response(
+        text=jsonlib.dumps(result, default=json_default),
+        content_type="application/json",
+    )
+
+
+def respond(location_info: Optional[LocationInfoDTO]) -> web.Response:
+    """
+    Формирование ответа с найденной информацией.
+
+    :param location_info: Найденная информация
+    :return:
+    """
+
+    if location_info is None:
+        return web.json_response({"error": "Информация отсутствует."}, status=404)
+
+    return web.Response(
+        text=jsonlib.dumps(location_info, default=json_default),
+        content_type="application/json",
+    )
+
+
+@click.command()
+@click.option("--host", "host", default=SERVER_HOST, show_default=True, help="Адрес")
+@click.option(
+    "--port",
+    "-p",
+    "port",
+    type=int,
+    default=SERVER_PORT,
+    show_default=True,
+    help="Порт",
+)
+async def process_serve(host: str, port: int) -> None:
+    """
+    Запуск HTTP-сервиса для поиска информации о странах.
+
+    :param str host: Адрес
+    :param int port: Порт
+    """
+
+    # журнал запросов отключен, чтобы не замедлять обработку
+    runner = web.AppRunner(create_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info("HTTP-сервис запущен на %s:%s.", host, port)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    # запуск HTTP-сервиса
+    # pylint: disable=E1120
+    process_serve(_anyio_backend="asyncio")
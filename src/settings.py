@@ -16,14 +16,85 @@ LOGGING_FORMAT: str = os.getenv(
 )
 # уровень логирования
 LOGGING_LEVEL: str = os.getenv("LOGGING_LEVEL", "INFO")
+# формат файла с показателями работы в директории логов:
+# "json", "prometheus" (текстовый формат Prometheus) или "none" – не сохранять
+METRICS_FORMAT: str = os.getenv("METRICS_FORMAT", "json")
+
+# регионы (через запятую), для которых собираются данные о странах
+COUNTRY_BLOCS: list[str] = [
+    bloc.strip() for bloc in os.getenv("COUNTRY_BLOCS", "eu").split(",") if bloc.strip()
+]
+
+# базовая валюта, относительно которой запрашиваются курсы валют
+CURRENCY_RATES_BASE: str = os.getenv("CURRENCY_RATES_BASE", "rub")
+
+# максимальное количество результатов поиска, сохраняемых в памяти (0 – не сохранять)
+READER_CACHE_SIZE: int = int(os.getenv("READER_CACHE_SIZE", "1024"))
+# максимальное время хранения результата поиска в памяти (в секундах)
+READER_CACHE_TTL: float = float(os.getenv("READER_CACHE_TTL", "60"))
+
+# адрес и порт HTTP-сервиса для поиска информации о странах
+SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8080"))
+# интервал проверки обновления файлов кэша HTTP-сервисом (в секундах)
+SERVER_RELOAD_INTERVAL: float = float(os.getenv("SERVER_RELOAD_INTERVAL", "1"))
 
 # ключи для доступа к API
 API_KEY_APILAYER: Optional[str] = os.getenv("API_KEY_APILAYER")
 API_KEY_OPENWEATHER: Optional[str] = os.getenv("API_KEY_OPENWEATHER")
 
+# хранилище данных о странах и курсах валют: "files" – файлы JSON,
+# "sqlite" – базы данных SQLite (режим WAL) с индексированными таблицами
+CACHE_STORAGE: str = os.getenv("CACHE_STORAGE", "files")
 # время актуальности данных о странах (в секундах), по умолчанию – один год
 CACHE_TTL_COUNTRY: int = int(os.getenv("CACHE_TTL_COUNTRY", "31_536_000"))
 # время актуальности данных о курсах валют (в секундах), по умолчанию – сутки
 CACHE_TTL_CURRENCY_RATES: int = int(os.getenv("CACHE_TTL_CURRENCY_RATES", "86_400"))
 # время актуальности данных о погоде (в секундах), по умолчанию ~ три часа
 CACHE_TTL_WEATHER: int = int(os.getenv("CACHE_TTL_WEATHER", "10_700"))
+# максимальное количество одновременных запросов при сборе данных о погоде
+WEATHER_CONCURRENCY_LIMIT: int = int(os.getenv("WEATHER_CONCURRENCY_LIMIT", "10"))
+# максимальное количество городов в одном групповом запросе данных о погоде
+WEATHER_GROUP_SIZE: int = int(os.getenv("WEATHER_GROUP_SIZE", "20"))
+# хранилище данных о погоде: "files" – JSON-файл для каждой столицы,
+# "sqlite" – одна таблица SQLite только с необходимыми полями,
+# по умолчанию – как для данных о странах и курсах валют
+WEATHER_STORAGE: str = os.getenv("WEATHER_STORAGE", CACHE_STORAGE)
+# доля времени актуальности данных о погоде, в пределах которой распределяются
+# обновления столиц (чтобы данные, полученные одновременно, не обновлялись одним пакетом)
+WEATHER_REFRESH_JITTER: float = float(os.getenv("WEATHER_REFRESH_JITTER", "0.2"))
+# минимальная пауза между попытками обновления данных в режиме службы (в секундах)
+SCHEDULER_MIN_DELAY: int = int(os.getenv("SCHEDULER_MIN_DELAY", "60"))
+# количество одновременно обрабатываемых запросов при пакетном поиске
+BATCH_CONCURRENCY_LIMIT: int = int(os.getenv("BATCH_CONCURRENCY_LIMIT", "10"))
+# количество процессов для форматирования данных при выгрузке справочника (0 – без пула)
+EXPORT_WORKERS: int = int(os.getenv("EXPORT_WORKERS", "4"))
+# количество стран в одном задании процесса при выгрузке справочника
+EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", "50"))
+
+# максимальное количество одновременных соединений с одним хостом
+HTTP_CONNECTIONS_LIMIT_PER_HOST: int = int(
+    os.getenv("HTTP_CONNECTIONS_LIMIT_PER_HOST", "10")
+)
+# время хранения результатов DNS-запросов (в секундах)
+HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+# время поддержания неактивного соединения открытым (в секундах)
+HTTP_KEEPALIVE_TIMEOUT: int = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+# максимальное время выполнения одного HTTP-запроса (в секундах)
+HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+# размер части ответа, записываемой в файл кэша за один раз (в байтах)
+HTTP_CHUNK_SIZE: int = int(os.getenv("HTTP_CHUNK_SIZE", "65536"))
+# количество повторных попыток выполнения HTTP-запроса
+HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", "3"))
+# начальная и максимальная паузы перед повторной попыткой (в секундах),
+# при большем значении Retry-After запрос не повторяется
+HTTP_BACKOFF_BASE: float = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX: float = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+# ограничения частоты запросов к внешним сервисам (запросов в секунду, 0 – без ограничений)
+RATE_LIMIT_APILAYER: float = float(os.getenv("RATE_LIMIT_APILAYER", "1"))
+RATE_LIMIT_OPENWEATHER: float = float(os.getenv("RATE_LIMIT_OPENWEATHER", "1"))
+# количество запросов к внешним сервисам, выполняемых без ожидания (0 – равно ограничению частоты)
+RATE_LIMIT_APILAYER_BURST: float = float(os.getenv("RATE_LIMIT_APILAYER_BURST", "10"))
+RATE_LIMIT_OPENWEATHER_BURST: float = float(
+    os.getenv("RATE_LIMIT_OPENWEATHER_BURST", "60")
+)
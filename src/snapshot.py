@@ -0,0 +1,289 @@
+"""
+Упаковка всех файлов кэша в один сжатый снимок и загрузка кэша из снимка.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import time
+from typing import Iterator, Optional
+
+import asyncclick as click
+
+import atomic
+from settings import LOGGING_LEVEL, MEDIA_PATH
+
+# версия формата снимка
+SNAPSHOT_FORMAT = 1
+# название описания снимка в архиве
+MANIFEST_NAME = "snapshot.json"
+# префикс временной директории при загрузке снимка
+STAGING_PREFIX = ".snapshot."
+
+
+def iter_files(directory: str) -> Iterator[str]:
+    """
+    Обход файлов кэша (включая служебные файлы с валидаторами и манифестами),
+    кроме файлов блокировок, временных файлов, ранее сохраненных снимков
+    и журналов баз данных SQLite (их изменения входят в копию базы данных).
+
+    :param directory: Директория с файлами кэша
+    :return: Пути к файлам относительно директории
+    """
+
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(name for name in dirs if not name.startswith(STAGING_PREFIX))
+        for name in sorted(files):
+            if not name.endswith((".lock", ".tmp", ".tar.gz", "-wal", "-shm")):
+                yield os.path.relpath(os.path.join(root, name), directory)
+
+
+def pack(directory: str, file_path: str) -> int:
+    """
+    Упаковка файлов кэша в снимок (архив tar, сжатый gzip).
+
+    Вместе с файлами в описании снимка сохраняются время их изменения
+    (по нему определяется актуальность данных) и хэши для проверки при загрузке.
+    Файл снимка записывается атомарно.
+
+    :param directory: Директория с файлами кэша
+    :param file_path: Путь к файлу снимка
+    :return: Количество упакованных файлов
+    """
+
+    manifest: dict = {
+        "format": SNAPSHOT_FORMAT,
+        "created": time.time(),
+        "files": {},
+        "directories": {},
+    }
+    with atomic.open_atomic(file_path) as file, tarfile.open(
+        fileobj=file, mode="w:gz", format=tarfile.PAX_FORMAT, compresslevel=6
+    ) as archive:
+        for name in iter_files(directory):
+            content, mtime_ns = read_file(os.path.join(directory, name))
+
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = mtime_ns // 10**9
+            archive.addfile(info, io.BytesIO(content))
+            manifest["files"][name] = {
+                "mtime_ns": mtime_ns,
+                "sha256": hashlib.sha256(content).hexdigest(),
+            }
+
+        # время изменения директорий используется хранилищем данных о погоде
+        for name in {os.path.dirname(name) for name in manifest["files"]} - {""}:
+            manifest["directories"][name] = os.stat(
+                os.path.join(directory, name)
+            ).st_mtime_ns
+
+        content = json.dumps(manifest).encode()
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(content)
+        info.mtime = int(manifest["created"])
+        archive.addfile(info, io.BytesIO(content))
+
+    return len(manifest["files"])
+
+
+def read_file(file_path: str) -> tuple[bytes, int]:
+    """
+    Чтение содержимого файла кэша и времени его изменения (в наносекундах).
+
+    Для базы данных SQLite читается ее согласованная копия, включающая изменения
+    из журнала WAL, поэтому снимок можно сохранять во время работы сборщика.
+
+    :param file_path: Путь к файлу
+    :return:
+    """
+
+    if file_path.endswith(".sqlite3"):
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        with tempfile.TemporaryDirectory() as temp_directory:
+            copy_path = os.path.join(temp_directory, "copy.sqlite3")
+            source = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True)
+            target = sqlite3.connect(copy_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+
+            with open(copy_path, "rb") as file:
+                return file.read(), mtime_ns
+
+    with open(file_path, "rb") as file:
+        # файлы кэша заменяются атомарно, поэтому открытый файл не изменится
+        return file.read(), os.fstat(file.fileno()).st_mtime_ns
+
+
+def load(file_path: str, directory: str) -> int:
+    """
+    Загрузка файлов кэша из снимка.
+
+    Снимок полностью распаковывается, проверяется и сбрасывается на диск
+    во временной директории, и только после этого файлы кэша заменяются
+    переименованием, поэтому некорректный снимок не изменяет кэш, а читатели
+    не видят частично записанных файлов. Атомарна замена каждого файла,
+    но не всего кэша: во время загрузки (или после сбоя посреди нее) часть
+    файлов может относиться к снимку, а часть – к прежним данным.
+    Время изменения файлов восстанавливается, поэтому актуальность данных
+    не изменяется.
+
+    :param file_path: Путь к файлу снимка
+    :param directory: Директория с файлами кэша
+    :return: Количество загруженных файлов
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=directory, prefix=STAGING_PREFIX)
+    try:
+        manifest, hashes = extract(file_path, staging)
+        if manifest is None or manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("Неподдерживаемый формат снимка.")
+
+        files = manifest["files"]
+        if hashes != {name: info["sha256"] for name, info in files.items()}:
+            raise ValueError("Содержимое снимка не соответствует его описанию.")
+
+        # запись данных на диск до замены файлов кэша
+        for name, info in files.items():
+            staged = os.path.join(staging, name)
+            os.utime(staged, ns=(info["mtime_ns"],) * 2)
+            atomic.fsync_path(staged)
+
+        for name in files:
+            target = os.path.join(directory, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # журналы заменяемой базы данных SQLite не применяются к загруженной
+            for suffix in ("-wal", "-shm") if name.endswith(".sqlite3") else ():
+                if os.path.exists(target + suffix):
+                    os.remove(target + suffix)
+            os.replace(os.path.join(staging, name), target)
+
+        for name, mtime_ns in manifest["directories"].items():
+            os.utime(os.path.join(directory, name), ns=(mtime_ns, mtime_ns))
+
+        # сохранение записей о переименовании файлов в директориях
+        for name in {os.path.dirname(name) for name in files} | {""}:
+            atomic.fsync_path(os.path.join(directory, name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    return len(files)
+
+
+def extract(file_path: str, staging: str) -> tuple[Optional[dict], dict[str, str]]:
+    """
+    Распаковка снимка во временную директорию с вычислением хэшей файлов.
+
+    :param file_path: Путь к файлу снимка
+    :param staging: Временная директория
+    :return: Описание снимка и хэши распакованных файлов
+    """
+
+    manifest = None
+    hashes = {}
+    with tarfile.open(file_path, mode="r:gz") as archive:
+        for member in archive:
+            source = archive.extractfile(member)
+            if source is None:
+                raise ValueError(f"Недопустимый элемент снимка: {member.name}.")
+
+            if member.name == MANIFEST_NAME:
+                manifest = json.load(source)
+                continue
+
+            # файлы распаковываются только внутрь временной директории
+            name = os.path.normpath(member.name)
+            if os.path.isabs(name) or name.startswith(os.pardir):
+                raise ValueError(f"Недопустимый путь в снимке: {member.name}.")
+
+            target = os.path.join(staging, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            digest = hashlib.sha256()
+            with open(target, "wb") as file:
+                while chunk := source.read(1 << 16):
+                    digest.update(chunk)
+                    file.write(chunk)
+            os.chmod(target, 0o644)
+            hashes[name] = digest.hexdigest()
+
+    return manifest, hashes
+
+
+@click.group()
+async def process_snapshot() -> None:
+    """
+    Упаковка и загрузка снимка файлов кэша.
+    """
+
+
+@process_snapshot.command("pack")
+@click.option(
+    "--output",
+    "-o",
+    "file_path",
+    type=click.Path(dir_okay=False, writable=True),
+    required=True,
+    help="Путь к файлу снимка",
+)
+@click.option(
+    "--media",
+    "directory",
+    type=click.Path(file_okay=False),
+    default=MEDIA_PATH,
+    show_default=True,
+    help="Директория с файлами кэша",
+)
+async def process_pack(file_path: str, directory: str) -> None:
+    """
+    Упаковка всех файлов кэша в один сжатый снимок.
+
+    :param str file_path: Путь к файлу снимка
+    :param str directory: Директория с файлами кэша
+    """
+
+    count = await asyncio.to_thread(pack, directory, file_path)
+    logging.info("В снимок %s упаковано файлов: %s.", file_path, count)
+
+
+@process_snapshot.command("load")
+@click.argument("file_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--media",
+    "directory",
+    type=click.Path(file_okay=False),
+    default=MEDIA_PATH,
+    show_default=True,
+    help="Директория с файлами кэша",
+)
+async def process_load(file_path: str, directory: str) -> None:
+    """
+    Загрузка файлов кэша из снимка.
+
+    :param str file_path: Путь к файлу снимка
+    :param str directory: Директория с файлами кэша
+    """
+
+    try:
+        count = await asyncio.to_thread(load, file_path, directory)
+    except (ValueError, tarfile.TarError) as error:
+        raise click.ClickException(f"Не удалось загрузить снимок: {error}") from error
+
+    logging.info("Из снимка %s загружено файлов: %s.", file_path, count)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=LOGGING_LEVEL)
+    # запуск обработки
+    # pylint: disable=E1120
+    process_snapshot(_anyio_backend="asyncio")
@@ -0,0 +1,12 @@
+"""
+Замеры производительности.
+
+Модули ``bench_*`` не собираются pytest и запускаются отдельно, например:
+
+.. code-block::
+
+    python -m tests.benchmarks.bench_search
+
+Модуль ``suite`` выполняет замеры основных сценариев и сравнивает их результаты
+с базовыми значениями, сохраненными командой ``make benchmark-baseline``.
+"""
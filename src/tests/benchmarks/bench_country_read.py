@@ -0,0 +1,66 @@
+"""
+Сравнение стоимости разбора файла кэша со списком стран:
+полная валидация pydantic и создание моделей без валидации.
+
+.. code-block::
+
+    python -m tests.benchmarks.bench_country_read
+"""
+
+import json
+import time
+from typing import Callable
+
+from collectors.collector import CountryCollector
+from collectors.models import CountryDTO, CurrencyInfoDTO
+from tests.benchmarks.data import generate_countries
+
+
+def measure(func: Callable[[], object], repeat: int = 20) -> float:
+    """
+    Минимальное время выполнения функции (в миллисекундах).
+
+    :param func: Функция
+    :param repeat: Количество повторений
+    :return:
+    """
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return min(timings) * 1000
+
+
+def read_validated(content: str) -> list[CountryDTO]:
+    """
+    Разбор файла с полной валидацией (прежний способ чтения).
+
+    :param content: Содержимое файла
+    :return:
+    """
+
+    return [CountryCollector.validate_country(item) for item in json.loads(content)]
+
+
+def main() -> None:
+    for count in (250, 2500):
+        content = json.dumps(generate_countries(count))
+
+        validated = measure(lambda: read_validated(content))
+        trusted = measure(lambda: CountryCollector._parse(content))
+
+        print(f"Стран: {count}")
+        print(f"  с валидацией:  {validated:.2f} мс/чтение")
+        print(f"  без валидации: {trusted:.2f} мс/чтение")
+        print(f"  ускорение:     {validated / trusted:.1f}x")
+
+    currencies = [CurrencyInfoDTO(code=f"C{index:03}") for index in range(1000)]
+    hashing = measure(lambda: {hash(currency) for currency in currencies})
+    print(f"Хэширование 1000 моделей (повторное): {hashing:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
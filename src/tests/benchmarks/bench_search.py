@@ -0,0 +1,130 @@
+"""
+Сравнение производительности поиска страны: прежний перебор с ``SequenceMatcher``
+для каждой страны и поиск с использованием n-граммного индекса.
+
+.. code-block::
+
+    python -m tests.benchmarks.bench_search
+"""
+
+import random
+import time
+from difflib import SequenceMatcher
+from typing import Callable, Optional
+
+from collectors.models import CountryDTO
+from search import CountrySearch
+from tests.benchmarks.data import generate_countries
+
+
+def legacy_match(search: str, country: CountryDTO) -> bool:
+    """
+    Прежняя реализация ``Reader._match`` (без изменений, кроме синхронного вызова).
+
+    :param search: Строка для сравнения
+    :param CountryDTO country: Данные о стране
+    :return:
+    """
+
+    words = search.split()
+    ratio = 0.67
+    for word in words:
+        if any(
+            [
+                search.lower() in country.capital.lower()
+                or SequenceMatcher(None, word, country.capital).ratio() > ratio,
+                *[
+                    search.lower() in spelling.lower()
+                    or SequenceMatcher(None, word, spelling).ratio() > ratio
+                    for spelling in country.alt_spellings
+                ],
+            ]
+        ):
+            return True
+
+    return False
+
+
+def legacy_find(search: str, countries: list[CountryDTO]) -> Optional[CountryDTO]:
+    """
+    Прежний поиск первой подходящей страны.
+
+    :param search: Строка для поиска
+    :param countries: Список стран
+    :return:
+    """
+
+    for country in countries:
+        if legacy_match(search, country):
+            return country
+
+    return None
+
+
+def make_queries(countries: list[CountryDTO], count: int = 200) -> list[str]:
+    """
+    Формирование набора запросов: точные совпадения, опечатки, подстроки и промахи.
+
+    :param countries: Список стран
+    :param count: Количество запросов
+    :return:
+    """
+
+    rng = random.Random(2)
+    queries = []
+    for position in range(count):
+        country = rng.choice(countries)
+        kind = position % 4
+        if kind == 0:
+            queries.append(country.capital)
+        elif kind == 1:
+            # опечатка в одном символе
+            index = rng.randrange(len(country.capital))
+            queries.append(
+                country.capital[:index] + "x" + country.capital[index + 1 :]  # noqa
+            )
+        elif kind == 2:
+            queries.append(country.alt_spellings[-1][1:-1])
+        else:
+            queries.append("Atlantis")
+
+    return queries
+
+
+def measure(func: Callable[[str], object], queries: list[str]) -> float:
+    """
+    Среднее время выполнения одного запроса (в миллисекундах).
+
+    :param func: Функция поиска
+    :param queries: Запросы
+    :return:
+    """
+
+    started = time.perf_counter()
+    for query in queries:
+        func(query)
+
+    return (time.perf_counter() - started) / len(queries) * 1000
+
+
+def main() -> None:
+    for count in (250, 2500):
+        countries = [CountryDTO(**item) for item in generate_countries(count)]
+        queries = make_queries(countries)
+
+        started = time.perf_counter()
+        search = CountrySearch(countries)
+        build = (time.perf_counter() - started) * 1000
+
+        legacy = measure(lambda query: legacy_find(query, countries), queries)
+        indexed = measure(search.find, queries)
+
+        print(f"Стран: {count}, запросов: {len(queries)}")
+        print(f"  построение индекса: {build:.2f} мс")
+        print(f"  прежний поиск:      {legacy:.3f} мс/запрос")
+        print(f"  поиск по индексу:   {indexed:.3f} мс/запрос")
+        print(f"  ускорение:          {legacy / indexed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
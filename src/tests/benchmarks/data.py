@@ -0,0 +1,66 @@
+"""
+Генерация синтетических данных для замеров производительности.
+"""
+
+import random
+from typing import Any
+
+# слоги для генерации правдоподобных названий
+SYLLABLES = (
+    "ba be bi bo da de di do ka ke ki ko la le li lo ma me mi mo na ne ni no "
+    "ra re ri ro sa se si so ta te ti to va ve vi vo za ze zi zo an en in on "
+    "ar er ir or ul ol ish ost ava ena ria land burg stan"
+).split()
+
+
+def generate_name(rng: random.Random, syllables: int) -> str:
+    """
+    Генерация названия из случайных слогов.
+
+    :param rng: Генератор случайных чисел
+    :param syllables: Количество слогов
+    :return:
+    """
+
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def generate_countries(count: int = 250, seed: int = 1) -> list[dict[str, Any]]:
+    """
+    Генерация данных о странах в формате файла кэша.
+
+    :param count: Количество стран
+    :param seed: Начальное значение генератора случайных чисел
+    :return:
+    """
+
+    rng = random.Random(seed)
+    countries = []
+    for position in range(count):
+        name = generate_name(rng, rng.randint(2, 4))
+        capital = generate_name(rng, rng.randint(2, 3))
+        alpha2code = f"{chr(65 + position // 26 % 26)}{chr(65 + position % 26)}"
+        countries.append(
+            {
+                "capital": capital,
+                "alpha2code": alpha2code,
+                "alt_spellings": [
+                    alpha2code,
+                    f"Republic of {name}",
+                    generate_name(rng, rng.randint(2, 4)),
+                ],
+                "currencies": [{"code": f"{alpha2code}X"}],
+                "flag": f"http://assets.promptapi.com/flags/{alpha2code}.svg",
+                "languages": [
+                    {"name": f"{name}ian", "native_name": f"{name.lower()}ski"}
+                ],
+                "name": name,
+                "population": rng.randint(10_000, 150_000_000),
+                "subregion": rng.choice(
+                    ["Northern Europe", "Southern Europe", "Western Asia"]
+                ),
+                "timezones": [f"UTC+0{rng.randint(0, 9)}:00"],
+            }
+        )
+
+    return countries
@@ -0,0 +1,394 @@
+"""
+Набор замеров производительности основных сценариев чтения и сбора данных
+с сохранением базовых значений для выявления регрессий.
+
+Данные генерируются во временной директории в двух масштабах: реалистичном
+(сотни стран и файлов с погодой) и увеличенном в 10 раз. Сбор данных о погоде
+выполняется с локальным тестовым HTTP-сервером вместо внешнего сервиса.
+Отдельно замеряется запуск нового процесса с импортом :mod:`main`
+(холодный старт консольного приложения).
+
+.. code-block::
+
+    # замер и сравнение с сохраненными базовыми значениями
+    python -m tests.benchmarks.suite
+    # сохранение результатов в качестве базовых значений
+    python -m tests.benchmarks.suite --save
+"""
+
+import asyncio
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+from unittest import mock
+
+import asyncclick as click
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from clients.base import BaseClient
+from clients.weather import WeatherClient
+from collectors.collector import CountryCollector, WeatherCollector
+from collectors.models import LocationDTO, json_default
+from collectors.store import store
+from reader import Reader
+from renderer import Renderer
+from tests.benchmarks.data import generate_countries
+
+# файл с базовыми значениями
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+# директория с исходным кодом приложения
+SOURCE_PATH = Path(__file__).parents[2]
+# количество повторений замера холодного старта
+STARTUP_REPEAT = 7
+
+# ответ тестового сервера с данными о погоде
+WEATHER_PAYLOAD = {
+    "main": {"temp": 13.92, "pressure": 1023, "humidity": 54},
+    "wind": {"speed": 4.63},
+    "weather": [{"description": "scattered clouds"}],
+}
+
+
+class Scale(NamedTuple):
+    """
+    Масштаб синтетических данных.
+    """
+
+    # количество стран (а также файлов с погодой и валют)
+    countries: int
+    # количество поисковых запросов
+    queries: int
+    # количество повторений замера
+    repeat: int
+
+
+SCALES = {
+    "realistic": Scale(countries=250, queries=200, repeat=7),
+    "10x": Scale(countries=2500, queries=200, repeat=3),
+}
+
+
+@dataclass
+class Case:
+    """
+    Сценарий замера.
+    """
+
+    name: str
+    # замеряемая функция
+    run: Callable[[], Awaitable[Any]]
+    # подготовка перед каждым повторением (не входит в замер)
+    setup: Optional[Callable[[], Awaitable[Any]]] = None
+    # количество операций за один вызов для расчета времени одной операции
+    operations: int = 1
+
+
+def write_media(media_path: Path, countries: list[dict]) -> None:
+    """
+    Заполнение директории с файлами кэша синтетическими данными.
+
+    :param media_path: Директория с файлами кэша
+    :param countries: Данные о странах
+    :return:
+    """
+
+    content = json.dumps(
+        [CountryCollector.validate_country(item) for item in countries],
+        default=json_default,
+    )
+    (media_path / "country").mkdir()
+    (media_path / "country.json").write_text(content)
+    (media_path / "country" / "eu.json").write_text(content)
+
+    rng = random.Random(3)
+    rates = {
+        currency["code"]: rng.uniform(0.001, 100)
+        for item in countries
+        for currency in item["currencies"]
+    }
+    (media_path / "currency_rates.json").write_text(
+        json.dumps({"base": "RUB", "date": "2022-09-14", "rates": rates})
+    )
+
+    write_weather(media_path, countries)
+
+
+def write_weather(media_path: Path, countries: list[dict]) -> None:
+    """
+    Создание файлов с данными о погоде для столиц всех стран.
+
+    :param media_path: Директория с файлами кэша
+    :param countries: Данные о странах
+    :return:
+    """
+
+    (media_path / "weather").mkdir()
+    content = json.dumps(WEATHER_PAYLOAD)
+    for item in countries:
+        filename = f"{item['capital']}_{item['alpha2code']}".lower()
+        (media_path / "weather" / f"{filename}.json").write_text(content)
+
+
+def make_queries(countries: list[dict], count: int) -> list[str]:
+    """
+    Формирование поисковых запросов: столицы, коды, опечатки и промахи.
+
+    :param countries: Данные о странах
+    :param count: Количество запросов
+    :return:
+    """
+
+    rng = random.Random(2)
+    queries = []
+    for position in range(count):
+        country = rng.choice(countries)
+        kind = position % 4
+        if kind == 0:
+            queries.append(country["capital"])
+        elif kind == 1:
+            queries.append(country["alpha2code"])
+        elif kind == 2:
+            queries.append(country["capital"][:-1] + "x")
+        else:
+            queries.append("Atlantis")
+
+    return queries
+
+
+async def make_cases(media_path: Path, scale: Scale, server_url: str) -> list[Case]:
+    """
+    Формирование сценариев замера для масштаба данных.
+
+    :param media_path: Директория с файлами кэша
+    :param scale: Масштаб данных
+    :param server_url: URL тестового сервера с данными о погоде
+    :return:
+    """
+
+    countries = generate_countries(scale.countries)
+    write_media(media_path, countries)
+    queries = make_queries(countries, scale.queries)
+    reader = Reader()
+
+    async def read_countries() -> None:
+        # чтение без данных, сохраненных в памяти процесса
+        store.clear()
+        await CountryCollector.read()
+
+    async def clear_results() -> None:
+        # замеряется поиск, а не чтение сохраненных результатов
+        Reader.cache.clear()
+
+    async def find() -> None:
+        for query in queries:
+            await reader.find(query)
+
+    async def warm_results() -> None:
+        Reader.cache.clear()
+        await find()
+
+    country_models = await CountryCollector.read() or []
+
+    async def match() -> None:
+        for query in queries[:10]:
+            for country in country_models:
+                await Reader._match(query, country)
+
+    locations = frozenset(
+        LocationDTO(capital=item["capital"], alpha2code=item["alpha2code"])
+        for item in countries
+    )
+
+    async def clear_weather() -> None:
+        shutil.rmtree(media_path / "weather", ignore_errors=True)
+
+    async def collect_weather() -> None:
+        with mock.patch.object(
+            WeatherClient, "get_base_url", mock.AsyncMock(return_value=server_url)
+        ):
+            await WeatherCollector().collect(locations)
+
+    location_infos = [
+        location_info
+        for item in countries[: scale.queries]
+        if (location_info := await reader.find(item["capital"]))
+    ]
+
+    async def render() -> None:
+        for location_info in location_infos:
+            await Renderer(location_info).render()
+
+    return [
+        Case("CountryCollector.read", read_countries),
+        Case("Reader.find", find, setup=clear_results, operations=len(queries)),
+        Case(
+            "Reader.find (cached)",
+            find,
+            setup=warm_results,
+            operations=len(queries),
+        ),
+        Case("Reader._match", match, operations=10 * len(country_models)),
+        Case(
+            "WeatherCollector.collect",
+            collect_weather,
+            setup=clear_weather,
+            operations=len(locations),
+        ),
+        Case("Renderer.render", render, operations=len(location_infos)),
+    ]
+
+
+async def import_main() -> None:
+    """
+    Запуск нового процесса Python с импортом модуля консольного приложения.
+
+    :return:
+    """
+
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", "import main", cwd=SOURCE_PATH
+    )
+    if await process.wait():
+        raise RuntimeError("Не удалось импортировать модуль main.")
+
+
+async def measure(case: Case, repeat: int) -> float:
+    """
+    Медианное время одной операции сценария (в миллисекундах).
+
+    :param case: Сценарий замера
+    :param repeat: Количество повторений
+    :return:
+    """
+
+    timings = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            await case.setup()
+
+        started = time.perf_counter()
+        await case.run()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) / case.operations * 1000
+
+
+async def run_scale(name: str, scale: Scale, server_url: str) -> dict[str, float]:
+    """
+    Выполнение всех сценариев для масштаба данных.
+
+    :param name: Название масштаба
+    :param scale: Масштаб данных
+    :param server_url: URL тестового сервера с данными о погоде
+    :return: Название замера -> время одной операции (в миллисекундах)
+    """
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, mock.patch(
+        "collectors.readers.MEDIA_PATH", directory
+    ), mock.patch("collectors.collector.COUNTRY_BLOCS", ["eu"]), mock.patch.object(
+        WeatherClient, "rate_limit", 0
+    ):
+        store.clear()
+        cases = await make_cases(Path(directory), scale, server_url)
+        for case in cases:
+            results[f"{case.name}[{name}]"] = await measure(case, scale.repeat)
+
+    store.clear()
+
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    """
+    Вывод результатов и поиск регрессий относительно базовых значений.
+
+    :param results: Результаты замеров
+    :param baseline: Базовые значения
+    :param tolerance: Допустимое отношение времени к базовому значению
+    :return: Названия замеров с регрессией
+    """
+
+    regressions = []
+    for name, value in results.items():
+        line = f"{name:<40} {value:>10.4f} мс/оп."
+        if expected := baseline.get(name):
+            ratio = value / expected
+            line += f"  базовое {expected:>10.4f}  x{ratio:.2f}"
+            if ratio > tolerance:
+                regressions.append(name)
+                line += "  РЕГРЕССИЯ"
+
+        print(line)
+
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--scale",
+    "scales",
+    type=click.Choice(list(SCALES)),
+    multiple=True,
+    help="Масштаб данных (по умолчанию – все)",
+)
+@click.option(
+    "--save", is_flag=True, help="Сохранение результатов в качестве базовых значений"
+)
+@click.option(
+    "--tolerance",
+    default=1.5,
+    show_default=True,
+    help="Допустимое замедление относительно базовых значений",
+)
+async def main(scales: tuple[str, ...], save: bool, tolerance: float) -> None:
+    """
+    Замер производительности основных сценариев.
+    """
+
+    async def weather(request: web.Request) -> web.Response:
+        return web.json_response(WEATHER_PAYLOAD)
+
+    app = web.Application()
+    app.router.add_get("/weather", weather)
+    server = TestServer(app)
+    await server.start_server()
+
+    results = {
+        "main import[cold]": await measure(
+            Case("main import", import_main), STARTUP_REPEAT
+        )
+    }
+    try:
+        for name in scales or SCALES:
+            results.update(
+                await run_scale(name, SCALES[name], str(server.make_url("/weather")))
+            )
+    finally:
+        await BaseClient.close_session()
+        await server.close()
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    regressions = compare(results, baseline, tolerance)
+
+    if save:
+        BASELINE_PATH.write_text(json.dumps({**baseline, **results}, indent=4) + "\n")
+        print(f"Базовые значения сохранены в {BASELINE_PATH}.")
+    elif regressions:
+        print(f"Обнаружены регрессии: {', '.join(regressions)}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # pylint: disable=E1120
+    main(_anyio_backend="asyncio")
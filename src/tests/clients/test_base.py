@@ -0,0 +1,198 @@
+"""
+Тестирование базовых функций клиентов внешних сервисов.
+"""
+
+import json
+import time
+
+import aiofiles
+import pytest
+from aiohttp import web
+
+from clients.base import BaseClient, CacheValidators, TokenBucket
+from clients.country import CountryClient
+from clients.weather import WeatherClient
+
+
+@pytest.mark.asyncio
+class TestClientBase:
+    """
+    Тестирование общей сессии и выполнения запросов клиентов.
+    """
+
+    @pytest.fixture
+    async def server(self, aiohttp_server):
+        # ответы тестового сервера для каждого пути в порядке следования запросов
+        responses = {
+            "/retry": [
+                web.json_response({}, status=429, headers={"Retry-After": "0"}),
+                web.json_response({}, status=503),
+                web.json_response({"result": "ok"}),
+            ],
+            "/missing": [web.json_response({}, status=404)],
+            "/failing": [web.json_response({}, status=500) for _ in range(10)],
+            "/throttled": [
+                web.json_response({}, status=429, headers={"Retry-After": "3600"}),
+                web.json_response({"result": "ok"}),
+            ],
+        }
+        requests = []
+
+        async def handler(request):
+            requests.append(request.path)
+            return responses[request.path].pop(0)
+
+        async def conditional(request):
+            requests.append(request.path)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+
+            return web.json_response({"result": "ok"}, headers={"ETag": '"v1"'})
+
+        async def unconditional(request):
+            requests.append(request.path)
+            return web.json_response({"result": "ok"})
+
+        async def malformed(request):
+            requests.append(request.path)
+            # границы документа корректны, но синтаксис нарушен внутри
+            return web.Response(
+                body=b"[" + b'{"code": "EUR"}, ' * 100 + b'{"code": ]',
+                content_type="application/json",
+            )
+
+        async def page(request):
+            requests.append(request.path)
+            return web.Response(text="<html>Error</html>", content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/page", page)
+        app.router.add_get("/malformed", malformed)
+        app.router.add_get("/conditional", conditional)
+        app.router.add_get("/unconditional", unconditional)
+        app.router.add_get("/{path}", handler)
+        server = await aiohttp_server(app)
+        server.requests = requests
+
+        yield server
+        await BaseClient.close_session()
+
+    @pytest.fixture(autouse=True)
+    def settings(self, mocker):
+        mocker.patch("clients.base.HTTP_RETRIES", 3)
+        mocker.patch("clients.base.HTTP_BACKOFF_BASE", 0.01)
+        mocker.patch("clients.weather.WeatherClient.rate_limit", 0)
+
+    async def test_shared_session(self):
+        session = await CountryClient().get_session()
+        try:
+            assert await WeatherClient().get_session() is session
+            assert not session.closed
+        finally:
+            await BaseClient.close_session()
+
+        assert session.closed
+        assert await BaseClient.get_session() is not session
+        await BaseClient.close_session()
+
+    async def test_fetch_retry(self, server):
+        result = await WeatherClient()._fetch(str(server.make_url("/retry")))
+
+        assert result == {"result": "ok"}
+        assert server.requests == ["/retry"] * 3
+
+    async def test_fetch_no_retry(self, server):
+        assert await WeatherClient()._fetch(str(server.make_url("/missing"))) is None
+        assert server.requests == ["/missing"]
+
+    async def test_fetch_retries_exhausted(self, server):
+        assert await WeatherClient()._fetch(str(server.make_url("/failing"))) is None
+        assert server.requests == ["/failing"] * 4
+
+    async def test_fetch_retry_after_exceeded(self, server):
+        # слишком долгое ожидание не выполняется, запросы к сервису не приостанавливаются
+        client = WeatherClient()
+        assert await client._fetch(str(server.make_url("/throttled"))) is None
+        assert server.requests == ["/throttled"]
+        assert client.get_bucket().paused_until == 0
+
+    async def test_download_conditional(self, server, tmp_path):
+        client = WeatherClient()
+        url = str(server.make_url("/conditional"))
+        validators = CacheValidators()
+
+        async with aiofiles.open(tmp_path / "data.json", mode="wb") as file:
+            assert await client._download(url, file, validators=validators)
+        assert validators.etag == '"v1"'
+        assert not validators.not_modified
+
+        # повторный запрос с сохраненными валидаторами получает ответ 304
+        validators = CacheValidators(**validators.to_dict())
+        async with aiofiles.open(tmp_path / "data.json", mode="wb") as file:
+            assert not await client._download(url, file, validators=validators)
+        assert validators.not_modified
+
+    async def test_download(self, server, tmp_path):
+        client = WeatherClient()
+        url = str(server.make_url("/unconditional"))
+        validators = CacheValidators()
+
+        async with aiofiles.open(tmp_path / "data.json", mode="wb") as file:
+            assert await client._download(url, file, validators=validators)
+        assert json.loads((tmp_path / "data.json").read_text()) == {"result": "ok"}
+        assert validators.content_hash
+
+        # неизменные данные определяются по хэшу записанного ответа
+        validators = CacheValidators(**validators.to_dict())
+        async with aiofiles.open(tmp_path / "data.json", mode="wb") as file:
+            assert not await client._download(url, file, validators=validators)
+        assert validators.not_modified
+
+    async def test_download_invalid(self, server, tmp_path):
+        async with aiofiles.open(tmp_path / "data.json", mode="wb") as file:
+            assert not await WeatherClient()._download(
+                str(server.make_url("/page")), file
+            )
+
+    async def test_download_malformed(self, server, tmp_path):
+        async with aiofiles.open(tmp_path / "data.json", mode="wb") as file:
+            assert not await WeatherClient()._download(
+                str(server.make_url("/malformed")), file
+            )
+
+    async def test_fetch_connection_error(self, unused_tcp_port):
+        result = await WeatherClient()._fetch(f"http://127.0.0.1:{unused_tcp_port}/")
+        await BaseClient.close_session()
+
+        assert result is None
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            (None, None),
+            ("5", 5),
+            ("-1", 0),
+            ("Wed, 21 Oct 2015 07:28:00 GMT", 0),
+            ("invalid", None),
+        ],
+    )
+    async def test_parse_retry_after(self, value, expected):
+        assert BaseClient.parse_retry_after(value) == expected
+
+    async def test_token_bucket(self):
+        bucket = TokenBucket(rate=20)
+
+        started = time.perf_counter()
+        for _ in range(30):
+            await bucket.acquire()
+
+        # первые 20 запросов выполняются сразу, остальные – со скоростью 20 в секунду
+        assert 0.4 < time.perf_counter() - started < 1
+
+    async def test_token_bucket_pause(self):
+        bucket = TokenBucket(rate=0)
+        bucket.pause(0.2)
+
+        started = time.perf_counter()
+        await bucket.acquire()
+        assert time.perf_counter() - started >= 0.2
@@ -1,3 +1,77 @@
 """
 Тестирование функций клиента для получения информации о погоде.
 """
+
+import pytest
+from aiohttp import web
+
+from clients.base import BaseClient
+from clients.weather import WeatherClient
+
+
+@pytest.mark.asyncio
+class TestClientWeather:
+    """
+    Тестирование клиента для получения информации о погоде.
+    """
+
+    base_url = "https://api.openweathermap.org/data/2.5/weather"
+
+    @pytest.fixture
+    def client(self, mocker):
+        mocker.patch("clients.weather.WeatherClient.rate_limit", 0)
+
+        return WeatherClient()
+
+    @pytest.fixture
+    async def server(self, aiohttp_server):
+        async def group(request):
+            ids = request.query["id"].split(",")
+            # неизвестные идентификаторы отсутствуют в ответе сервиса
+            items = [
+                {"id": int(city_id), "main": {"temp": 10.0 + int(city_id)}}
+                for city_id in ids
+                if city_id != "404"
+            ]
+
+            return web.json_response({"cnt": len(items), "list": items})
+
+        app = web.Application()
+        app.router.add_get("/data/2.5/group", group)
+        server = await aiohttp_server(app)
+
+        yield server
+        await BaseClient.close_session()
+
+    async def test_get_base_url(self, client):
+        assert await client.get_base_url() == self.base_url
+
+    async def test_get_group_url(self, client):
+        assert (
+            await client.get_group_url()
+            == "https://api.openweathermap.org/data/2.5/group"
+        )
+
+    async def test_get_weather(self, mocker, client):
+        mocker.patch("clients.weather.WeatherClient._request")
+        await client.get_weather("Helsinki,FI")
+
+        url = client._request.call_args.args[0]
+        assert url.startswith(f"{self.base_url}?units=metric&q=Helsinki,FI&appid=")
+
+    async def test_get_weather_group(self, mocker, client, server):
+        mocker.patch(
+            "clients.weather.WeatherClient.get_base_url",
+            return_value=str(server.make_url("/data/2.5/weather")),
+        )
+
+        result = await client.get_weather_group([1, 2, 404])
+        assert {city_id: item["main"]["temp"] for city_id, item in result.items()} == {
+            1: 11.0,
+            2: 12.0,
+        }
+
+    async def test_get_weather_group_error(self, mocker, client):
+        mocker.patch("clients.weather.WeatherClient._request", return_value=None)
+
+        assert await client.get_weather_group([1]) is None
@@ -0,0 +1,106 @@
+"""
+Тестирование базовых функций сборщиков информации.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import time
+
+import pytest
+
+from collectors.base import BaseCollector, CacheState
+from collectors.collector import CountryCollector, CurrencyRatesCollector
+
+
+@pytest.mark.asyncio
+class TestCollectorBase:
+    """
+    Тестирование работы сборщиков с файлами кэша.
+    """
+
+    async def test_write_cache(self, tmp_path):
+        file_path = tmp_path / "data.json"
+        file_path.write_text("old")
+
+        await BaseCollector.write_cache(str(file_path), "new")
+
+        assert file_path.read_text() == "new"
+        # временные файлы не остаются в директории
+        assert os.listdir(tmp_path) == ["data.json"]
+
+    async def test_write_cache_error(self, tmp_path, mocker):
+        file_path = tmp_path / "data.json"
+        file_path.write_text("old")
+        mocker.patch("atomic.os.replace", side_effect=OSError)
+
+        with pytest.raises(OSError):
+            await BaseCollector.write_cache(str(file_path), "new")
+
+        # при ошибке прежнее содержимое файла сохраняется
+        assert file_path.read_text() == "old"
+        assert os.listdir(tmp_path) == ["data.json"]
+
+    async def test_cache_state(self, media_path):
+        collector = CountryCollector()
+        assert await collector.cache_state() is CacheState.FRESH
+        assert not await collector.cache_invalid()
+
+        file_path = media_path / "country" / "eu.json"
+        expired = time.time() - await collector.get_cache_ttl() - 1
+        os.utime(file_path, (expired, expired))
+        assert await collector.cache_state() is CacheState.STALE
+        assert await collector.cache_invalid()
+
+        file_path.write_text("")
+        assert await collector.cache_state() is CacheState.MISSING
+
+        file_path.unlink()
+        assert await collector.cache_state() is CacheState.MISSING
+        assert await collector.cache_invalid()
+
+    async def test_update_cache_single_flight(
+        self, media_path, mocker, currency_rates_data
+    ):
+        os.utime(media_path / "currency_rates.json", (0, 0))
+
+        async def download_rates(file, *args, **kwargs):
+            await asyncio.sleep(0.05)
+            await file.write(json.dumps(currency_rates_data).encode())
+            return True
+
+        download_rates = mocker.patch(
+            "clients.currency.CurrencyClient.download_rates",
+            side_effect=download_rates,
+        )
+        write_cache_stream = mocker.spy(BaseCollector, "write_cache_stream")
+
+        # одновременные обновления одного файла выполняют один запрос и одну запись
+        await asyncio.gather(*(CurrencyRatesCollector().collect() for _ in range(5)))
+        assert download_rates.call_count == 1
+        assert [call.args[0] for call in write_cache_stream.call_args_list] == [
+            str(media_path / "currency_rates.json"),
+            str(media_path / ".currency_rates.json.validators"),
+        ]
+
+    async def test_cache_lock_process(self, tmp_path, mocker):
+        mocker.patch("collectors.base.LOCK_POLL_INTERVAL", 0.01)
+        file_path = tmp_path / "data.json"
+
+        # блокировка, захваченная другим процессом (отдельным дескриптором файла)
+        handle = os.open(tmp_path / ".data.json.lock", os.O_RDWR | os.O_CREAT)
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        acquired = asyncio.Event()
+
+        async def update():
+            async with BaseCollector.cache_lock(str(file_path)):
+                acquired.set()
+
+        task = asyncio.create_task(update())
+        await asyncio.sleep(0.05)
+        assert not acquired.is_set()
+
+        os.close(handle)
+        await asyncio.wait_for(task, 1)
+        assert acquired.is_set()
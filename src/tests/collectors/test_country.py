@@ -1,3 +1,251 @@
 """
 Тестирование функций сбора информации о странах.
 """
+
+import json
+import os
+
+import pytest
+
+from collectors.base import CacheState
+from collectors.collector import CountryCollector
+from collectors.models import CurrencyInfoDTO
+
+
+def downloader(get_data):
+    """
+    Имитация загрузки ответа внешнего сервиса в файл кэша.
+
+    :param get_data: Функция получения данных региона
+    :return:
+    """
+
+    async def download(file, bloc, validators=None):
+        if data := get_data(bloc):
+            await file.write(json.dumps(data).encode())
+            return True
+
+        return False
+
+    return download
+
+
+@pytest.mark.asyncio
+class TestCollectorCountry:
+    """
+    Тестирование сборщика информации о странах.
+    """
+
+    async def test_read(self, media_path):
+        countries = await CountryCollector.read()
+        assert [country.alpha2code for country in countries] == ["AX", "FI", "SE"]
+
+    async def test_read_cached(self, media_path, mocker):
+        parse = mocker.spy(CountryCollector, "_parse")
+
+        first = await CountryCollector.read()
+        assert await CountryCollector.read() is first
+        assert parse.call_count == 1
+
+    async def test_read_invalidated(self, media_path, country_data):
+        first = await CountryCollector.read()
+
+        file_path = media_path / "country.json"
+        file_path.write_text(json.dumps(country_data[:1]))
+        # гарантированное изменение времени модификации файла
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = await CountryCollector.read()
+        assert second is not first
+        assert [country.alpha2code for country in second] == ["AX"]
+
+    @pytest.mark.parametrize(
+        "search,alpha2code",
+        [
+            ("fi", "FI"),
+            ("Stockholm", "SE"),
+            ("  sweden ", "SE"),
+            ("Suomi", "FI"),
+            ("åland islands", "AX"),
+        ],
+    )
+    async def test_read_index(self, media_path, search, alpha2code):
+        index = await CountryCollector.read_index()
+        assert index.get(search).alpha2code == alpha2code
+
+    async def test_read_index_missing(self, media_path):
+        index = await CountryCollector.read_index()
+        assert index.get("Atlantis") is None
+
+    async def test_read_partial_write(self, media_path):
+        first = await CountryCollector.read()
+
+        # частично записанный файл не приводит к ошибке чтения
+        (media_path / "country.json").write_text('[{"capital": "Mari')
+        assert await CountryCollector.read() is first
+
+    async def test_collect_stale(self, media_path, mocker):
+        file_path = media_path / "country" / "eu.json"
+        os.utime(file_path, (0, 0))
+        mocker.patch(
+            "clients.country.CountryClient.download_countries", return_value=False
+        )
+
+        # при ошибке обновления используются устаревшие данные
+        locations = await CountryCollector().collect()
+        assert {location.alpha2code for location in locations} == {"AX", "FI", "SE"}
+
+    async def test_collect_refresh(self, media_path, mocker, country_data):
+        file_path = media_path / "country.json"
+        os.utime(media_path / "country" / "eu.json", (0, 0))
+        mocker.patch(
+            "clients.country.CountryClient.download_countries",
+            side_effect=downloader(lambda bloc: country_data[1:]),
+        )
+
+        locations = await CountryCollector().collect()
+        assert {location.alpha2code for location in locations} == {"FI", "SE"}
+        merged = json.loads(file_path.read_text())
+        assert [item["alpha2code"] for item in merged] == ["FI", "SE"]
+
+    async def test_collect_blocs(self, media_path, mocker, country_data):
+        blocs = {"eu": country_data[:2], "efta": country_data[1:]}
+        download_countries = mocker.patch(
+            "clients.country.CountryClient.download_countries",
+            side_effect=downloader(blocs.get),
+        )
+        os.utime(media_path / "country" / "eu.json", (0, 0))
+
+        collector = CountryCollector(blocs=["eu", "efta"])
+        locations = await collector.collect()
+
+        # страны, входящие в несколько регионов, не дублируются
+        assert sorted(location.alpha2code for location in locations) == [
+            "AX",
+            "FI",
+            "SE",
+        ]
+        merged = json.loads((media_path / "country.json").read_text())
+        assert [item["alpha2code"] for item in merged] == ["AX", "FI", "SE"]
+        assert download_countries.call_count == 2
+
+        # актуальные данные регионов повторно не запрашиваются
+        download_countries.reset_mock()
+        await collector.collect()
+        download_countries.assert_not_called()
+
+    async def test_collect_blocs_changed(self, media_path, mocker, country_data):
+        (media_path / "country" / "eu.json").write_text(json.dumps(country_data[:2]))
+        (media_path / "country" / "efta.json").write_text(json.dumps(country_data[2:]))
+        download_countries = mocker.patch(
+            "clients.country.CountryClient.download_countries"
+        )
+
+        # данные регионов актуальны, но объединяются заново при изменении их списка
+        for blocs, expected in (
+            (["eu", "efta"], ["AX", "FI", "SE"]),
+            (["eu"], ["AX", "FI"]),
+            (["efta", "eu"], ["AX", "FI", "SE"]),
+        ):
+            locations = await CountryCollector(blocs=blocs).collect()
+            assert sorted(location.alpha2code for location in locations) == expected
+        assert json.loads((media_path / ".country.json.blocs").read_text()) == [
+            "efta",
+            "eu",
+        ]
+        download_countries.assert_not_called()
+
+    async def test_collect_bloc_refresh(self, media_path, mocker, country_data):
+        collector = CountryCollector(blocs=["eu", "efta"])
+        (media_path / "country" / "efta.json").write_text(json.dumps(country_data[2:]))
+        os.utime(media_path / "country" / "efta.json", (0, 0))
+        download_countries = mocker.patch(
+            "clients.country.CountryClient.download_countries",
+            side_effect=downloader(lambda bloc: country_data[2:]),
+        )
+
+        await collector.collect()
+
+        # обновляются только данные региона с истекшим сроком актуальности
+        download_countries.assert_called_once_with(
+            mocker.ANY, "efta", validators=mocker.ANY
+        )
+
+    async def test_collect_not_modified(self, media_path, mocker):
+        file_path = media_path / "country" / "eu.json"
+        content = file_path.read_text()
+        os.utime(file_path, (0, 0))
+
+        async def not_modified(file, bloc, validators):
+            validators.not_modified = True
+            return False
+
+        mocker.patch(
+            "clients.country.CountryClient.download_countries",
+            side_effect=not_modified,
+        )
+        merge = mocker.spy(CountryCollector, "merge")
+
+        collector = CountryCollector()
+        assert not await collector.collect_bloc("eu")
+
+        # неизменные данные не перезаписываются, а срок их актуальности продлевается
+        assert file_path.read_text() == content
+        assert await collector.cache_state(bloc="eu") is CacheState.FRESH
+        await collector.collect()
+        merge.assert_not_called()
+
+    async def test_collect_validators(self, media_path, mocker, country_data):
+        file_path = media_path / "country" / "eu.json"
+        os.utime(file_path, (0, 0))
+
+        async def modified(file, bloc, validators):
+            validators.etag = '"v2"'
+            return await downloader(lambda bloc: country_data)(file, bloc)
+
+        download_countries = mocker.patch(
+            "clients.country.CountryClient.download_countries", side_effect=modified
+        )
+        collector = CountryCollector()
+        assert await collector.collect_bloc("eu")
+
+        # валидаторы сохраняются рядом с файлом кэша и передаются при обновлении
+        os.utime(file_path, (0, 0))
+        await collector.collect_bloc("eu")
+        assert download_countries.call_args.kwargs["validators"].etag == '"v2"'
+
+    async def test_collect_invalid(self, media_path, mocker, country_data):
+        os.utime(media_path / "country" / "eu.json", (0, 0))
+        mocker.patch(
+            "clients.country.CountryClient.download_countries",
+            side_effect=downloader(
+                lambda bloc: [
+                    {**country_data[0], "population": "unknown"},
+                    country_data[1],
+                ]
+            ),
+        )
+
+        # некорректные данные не попадают в общий файл кэша
+        locations = await CountryCollector().collect()
+        assert {location.alpha2code for location in locations} == {"FI"}
+
+    async def test_merge_unreadable(self, media_path, country_data):
+        (media_path / "country" / "efta.json").write_text('[{"a":1},{"b":]')
+
+        # нечитаемый файл региона пропускается, данные остальных регионов сохраняются
+        await CountryCollector(blocs=["efta", "eu"]).merge()
+        merged = json.loads((media_path / "country.json").read_text())
+        assert [item["alpha2code"] for item in merged] == ["AX", "FI", "SE"]
+
+    async def test_read_trusted(self, media_path, country_data):
+        countries = await CountryCollector.read()
+
+        # данные, прочитанные без валидации, совпадают с валидированными
+        assert [dict(country) for country in countries] == [
+            dict(CountryCollector.validate_country(item)) for item in country_data
+        ]
+        assert hash(next(iter(countries[0].currencies))) == hash(
+            CurrencyInfoDTO(code="EUR")
+        )
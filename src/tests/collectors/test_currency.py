@@ -1,3 +1,57 @@
 """
 Тестирование функций сбора информации о курсах валют.
 """
+
+import pytest
+
+from collectors.collector import CurrencyRatesCollector
+from collectors.models import CurrencyRatesDTO
+from collectors.store import CurrencyRateTable
+
+
+@pytest.mark.asyncio
+class TestCollectorCurrencyRates:
+    """
+    Тестирование сборщика информации о курсах валют.
+    """
+
+    @pytest.fixture
+    def table(self):
+        return CurrencyRateTable(
+            CurrencyRatesDTO(
+                base="RUB",
+                date="2022-09-14",
+                rates={"EUR": 0.02, "USD": 0.025, "XXX": 0},
+            )
+        )
+
+    async def test_read_table_cached(self, media_path, mocker):
+        parse = mocker.spy(CurrencyRatesCollector, "_parse")
+
+        table = await CurrencyRatesCollector.read_table()
+        assert await CurrencyRatesCollector.read_table() is table
+        assert (await CurrencyRatesCollector.read()).base == "RUB"
+        assert parse.call_count == 1
+
+    @pytest.mark.parametrize(
+        "code,base,expected",
+        [
+            ("EUR", "RUB", 50),
+            ("usd", "rub", 40),
+            ("RUB", "RUB", 1),
+            ("EUR", "USD", 1.25),
+            ("RUB", "EUR", 0.02),
+            ("XXX", "RUB", None),
+            ("EUR", "GBP", None),
+        ],
+    )
+    async def test_get_rate(self, table, code, base, expected):
+        assert table.get_rate(code, base) == pytest.approx(expected)
+
+    async def test_get_rates(self, table):
+        # валюты с неизвестным курсом пропускаются
+        assert table.get_rates(["EUR", "USD", "GBP"], "USD") == {
+            "EUR": pytest.approx(1.25),
+            "USD": pytest.approx(1),
+        }
+        assert table.get_rates(["EUR"], "GBP") == {}
@@ -0,0 +1,43 @@
+"""
+Тестирование очереди обновления данных.
+"""
+
+from collectors.refresh import RefreshQueue
+
+
+class TestRefreshQueue:
+    """
+    Тестирование планирования обновления записей.
+    """
+
+    def test_pop_due(self):
+        queue = RefreshQueue({"a": 100, "b": 0, "c": 50}, ttl=100)
+
+        assert queue.pop_due(149) == ["b"]
+        assert queue.pop_due(200) == ["c", "a"]
+        assert queue.pop_due(1000) == []
+        assert not queue.is_scheduled("a")
+
+    def test_update(self):
+        queue = RefreshQueue({"a": 0, "b": 10}, ttl=100)
+        queue.update("a", 50)
+
+        # прежнее время обновления записи не учитывается
+        assert queue.pop_due(120) == ["b"]
+        assert queue.get_expires_in("a", 120) == 30
+        assert queue.pop_due(150) == ["a"]
+        assert queue.get_expires_in("a", 150) == 0
+
+    def test_jitter(self):
+        keys = [f"city{index}_xx" for index in range(100)]
+        queue = RefreshQueue(dict.fromkeys(keys, 0), ttl=1000, jitter=0.2)
+        due = [queue.get_expires_in(key, 0) for key in keys]
+
+        # записи, полученные одновременно, обновляются в пределах окна в разное время
+        assert all(800 <= value <= 1000 for value in due)
+        assert max(due) - min(due) > 150
+        assert len(set(due)) == len(keys)
+        assert len(queue.pop_due(900)) < len(keys)
+        assert RefreshQueue({"city0_xx": 0}, ttl=1000, jitter=0.2).get_due(
+            "city0_xx", 0
+        ) == queue.get_due("city0_xx", 0)
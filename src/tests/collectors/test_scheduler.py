@@ -0,0 +1,69 @@
+"""
+Тестирование функций сбора информации в режиме службы.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from collectors.models import LocationDTO
+from collectors.scheduler import Scheduler
+from settings import CACHE_TTL_COUNTRY
+
+
+@pytest.mark.asyncio
+class TestScheduler:
+    """
+    Тестирование планировщика сбора данных.
+    """
+
+    @pytest.fixture
+    def scheduler(self):
+        return Scheduler(min_delay=0)
+
+    async def test_get_cache_expires_in(self, media_path, scheduler):
+        expires_in = await scheduler.country_collector.get_cache_expires_in()
+        assert CACHE_TTL_COUNTRY - 5 < expires_in <= CACHE_TTL_COUNTRY
+
+        (media_path / "country" / "eu.json").unlink()
+        assert await scheduler.country_collector.get_cache_expires_in() == 0
+
+    async def test_wait_event(self, scheduler):
+        event = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.05, event.set)
+
+        started = time.perf_counter()
+        await scheduler.wait(10, event)
+        assert time.perf_counter() - started < 1
+
+    async def test_wait_min_delay(self, mocker):
+        sleep = mocker.patch("asyncio.sleep")
+        await Scheduler(min_delay=60).wait(-5)
+        sleep.assert_called_once_with(60)
+
+    async def test_run_countries(self, mocker, scheduler):
+        locations = frozenset({LocationDTO(capital="Helsinki", alpha2code="FI")})
+        mocker.patch.object(
+            scheduler.country_collector, "collect", return_value=locations
+        )
+        mocker.patch.object(
+            scheduler.country_collector, "get_cache_expires_in", return_value=100
+        )
+        # прерывание бесконечного цикла после первого обновления
+        wait = mocker.patch.object(
+            scheduler, "wait", side_effect=asyncio.CancelledError
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await scheduler.run_countries()
+
+        assert scheduler.locations == locations
+        assert scheduler.locations_changed.is_set()
+        wait.assert_called_once_with(100)
+
+    async def test_safe_collect(self, scheduler):
+        async def failing():
+            raise RuntimeError("test")
+
+        assert await scheduler.safe_collect(failing()) is None
@@ -0,0 +1,162 @@
+"""
+Тестирование хранилищ данных о странах и курсах валют.
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from collectors.collector import CountryCollector, CurrencyRatesCollector
+from collectors.readers import CountryReader
+from collectors.storage import (
+    FileCountryStorage,
+    SQLiteCountryStorage,
+    SQLiteCurrencyRatesStorage,
+    query,
+)
+from collectors.store import store
+from reader import Reader
+
+
+@pytest.mark.asyncio
+class TestCountryStorage:
+    """
+    Тестирование хранилищ данных о странах.
+    """
+
+    @pytest.fixture(params=["files", "sqlite"])
+    def storage(self, request, tmp_path):
+        store.clear()
+        yield (
+            SQLiteCountryStorage(str(tmp_path / "country.sqlite3"))
+            if request.param == "sqlite"
+            else FileCountryStorage(
+                str(tmp_path / "country.json"), CountryReader._parse
+            )
+        )
+        store.clear()
+
+    @pytest.fixture
+    def countries(self, country_data):
+        return [CountryCollector.validate_country(item) for item in country_data]
+
+    async def test_save(self, storage, countries):
+        await storage.save(countries)
+
+        index = await storage.read()
+        assert [country.alpha2code for country in index.countries] == ["AX", "FI", "SE"]
+        assert index.get("suomi").capital == "Helsinki"
+        assert await storage.read() is index
+
+        # данные заменяются целиком, а изменение видно читателям без перезапуска
+        await storage.save(countries[1:2])
+        assert [country.alpha2code for country in (await storage.read()).countries] == [
+            "FI"
+        ]
+
+    @pytest.mark.parametrize(
+        "subregion,min_population,expected",
+        [
+            (None, 0, ["AX", "FI", "SE"]),
+            ("northern europe", 0, ["AX", "FI", "SE"]),
+            ("Northern Europe", 5_491_817, ["FI", "SE"]),
+            (None, 9_000_000, ["SE"]),
+            ("Western Europe", 0, []),
+        ],
+    )
+    async def test_filter(
+        self, storage, countries, subregion, min_population, expected
+    ):
+        await storage.save(countries)
+
+        result = await storage.filter(subregion, min_population)
+        assert [country.alpha2code for country in result] == expected
+
+    async def test_read_missing(self, storage):
+        # отсутствующее хранилище не создается при чтении
+        with pytest.raises(FileNotFoundError):
+            await storage.read()
+        with pytest.raises(FileNotFoundError):
+            await storage.filter("Northern Europe")
+        assert not os.path.exists(storage.get_path())
+
+
+@pytest.mark.asyncio
+class TestSQLiteStorage:
+    """
+    Тестирование хранения данных в базах данных SQLite.
+    """
+
+    @pytest.fixture
+    def sqlite_storage(self, media_path, mocker):
+        mocker.patch("collectors.readers.CACHE_STORAGE", "sqlite")
+
+        return media_path
+
+    async def test_collect(self, sqlite_storage, mocker):
+        mocker.patch("clients.currency.CurrencyClient.download_rates")
+
+        # данные, загруженные ранее, сохраняются в хранилище при первом сборе
+        locations = await CountryCollector().collect()
+        await CurrencyRatesCollector().collect()
+
+        assert {location.alpha2code for location in locations} == {"AX", "FI", "SE"}
+        for name in ("country", "currency_rates"):
+            connection = sqlite3.connect(sqlite_storage / f"{name}.sqlite3")
+            assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+            assert connection.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+            connection.close()
+
+        (sqlite_storage / "country.json").unlink()
+        (sqlite_storage / "currency_rates.json").unlink()
+        country = await CountryReader.filter("Northern Europe", 9_000_000)
+        assert [item.name for item in country] == ["Sweden"]
+        assert (await Reader().find("Helsinki")).currency_rates
+
+    async def test_read_during_write(self, sqlite_storage, country_data):
+        storage = SQLiteCountryStorage(str(sqlite_storage / "country.sqlite3"))
+        await storage.save(
+            [CountryCollector.validate_country(item) for item in country_data]
+        )
+
+        # в режиме WAL незавершенная запись не блокирует чтение
+        connection = sqlite3.connect(storage.get_path(), timeout=0)
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute("DELETE FROM country")
+        try:
+            assert len(await storage.filter()) == 3
+        finally:
+            connection.rollback()
+            connection.close()
+
+    async def test_read_connection(self, sqlite_storage, country_data, mocker):
+        countries = [CountryCollector.validate_country(item) for item in country_data]
+        file_path = str(sqlite_storage / "country.sqlite3")
+        await SQLiteCountryStorage(file_path).save(countries)
+        connect = mocker.spy(sqlite3, "connect")
+
+        # соединение для чтения открывается только для чтения и переиспользуется
+        for _ in range(2):
+            assert query(file_path, "SELECT count(*) FROM country") == [(3,)]
+        assert connect.call_count == 1
+        with pytest.raises(sqlite3.OperationalError):
+            query(file_path, "DELETE FROM country")
+
+        # после замены файла базы данных соединение открывается заново
+        replica_path = str(sqlite_storage / "replica.sqlite3")
+        await SQLiteCountryStorage(replica_path).save(countries[:1])
+        os.replace(replica_path, file_path)
+        assert query(file_path, "SELECT count(*) FROM country") == [(1,)]
+        assert connect.call_count == 3
+
+    async def test_currency_rates(self, sqlite_storage, currency_rates_data):
+        storage = SQLiteCurrencyRatesStorage(
+            str(sqlite_storage / "currency_rates.sqlite3")
+        )
+        await CurrencyRatesCollector().save()
+
+        table = await storage.read()
+        assert table.currency_rates.base == currency_rates_data["base"]
+        assert table.currency_rates.rates == pytest.approx(currency_rates_data["rates"])
+        assert table.currency_rates.date == currency_rates_data["date"]
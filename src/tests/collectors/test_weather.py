@@ -1,3 +1,263 @@
 """
 Тестирование функций сбора информации о погоде.
 """
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from clients.base import BaseClient
+from clients.weather import WeatherClient
+from collectors.collector import WeatherCollector
+from collectors.models import LocationDTO
+from collectors.weather_storage import FileWeatherStorage
+from settings import RATE_LIMIT_OPENWEATHER
+
+
+@pytest.mark.asyncio
+class TestCollectorWeather:
+    """
+    Тестирование сборщика информации о погоде.
+    """
+
+    # задержка ответа тестового сервера (в секундах)
+    delay = 0.1
+
+    locations = frozenset(
+        LocationDTO(capital=f"City{index}", alpha2code="XX") for index in range(8)
+    )
+
+    @pytest.fixture
+    async def server(self, aiohttp_server):
+        async def handler(request):
+            await asyncio.sleep(self.delay)
+            return web.json_response(
+                {
+                    "main": {"temp": 13.92, "pressure": 1023, "humidity": 54},
+                    "wind": {"speed": 4.63},
+                    "weather": [{"description": "scattered clouds"}],
+                    "name": request.query["q"],
+                }
+            )
+
+        app = web.Application()
+        app.router.add_get("/weather", handler)
+
+        return await aiohttp_server(app)
+
+    @pytest.fixture(autouse=True)
+    async def settings(self, mocker, tmp_path, server):
+        mocker.patch("collectors.readers.MEDIA_PATH", str(tmp_path))
+        mocker.patch("clients.weather.WeatherClient.rate_limit", 0)
+        mocker.patch(
+            "clients.weather.WeatherClient.get_base_url",
+            return_value=str(server.make_url("/weather")),
+        )
+        yield
+        await BaseClient.close_session()
+
+    async def collect(self, concurrency_limit: int) -> float:
+        started = time.perf_counter()
+        await WeatherCollector(concurrency_limit=concurrency_limit).collect(
+            self.locations
+        )
+
+        return time.perf_counter() - started
+
+    async def test_collect(self):
+        await self.collect(concurrency_limit=4)
+
+        for location in self.locations:
+            weather = await WeatherCollector.read(location)
+            assert weather.temp == 13.92
+            assert weather.description == "scattered clouds"
+
+    async def test_collect_concurrency_limit(self, tmp_path):
+        sequential = await self.collect(concurrency_limit=1)
+        assert sequential >= self.delay * len(self.locations)
+
+        # очистка кэша для повторного сбора данных
+        for path in (tmp_path / "weather").iterdir():
+            path.unlink()
+
+        concurrent = await self.collect(concurrency_limit=len(self.locations))
+        assert concurrent < self.delay * 3
+        assert concurrent * 2 < sequential
+
+    async def test_collect_error_isolation(self, mocker, tmp_path):
+        get_weather = WeatherCollector().client.get_weather
+
+        async def failing(location):
+            if location.startswith("City0"):
+                raise RuntimeError("test")
+
+            return await get_weather(location)
+
+        mocker.patch("clients.weather.WeatherClient.get_weather", side_effect=failing)
+        await self.collect(concurrency_limit=2)
+
+        for location in self.locations:
+            path = (
+                tmp_path / "weather" / f"{WeatherCollector.get_filename(location)}.json"
+            )
+            assert path.is_file() is (location.capital != "City0")
+
+    async def test_collect_default_rate_limit(self, mocker):
+        # ограничитель частоты с настройками по умолчанию не замедляет сбор
+        mocker.patch("clients.weather.WeatherClient.rate_limit", RATE_LIMIT_OPENWEATHER)
+        await BaseClient.close_session()
+
+        assert await self.collect(concurrency_limit=8) < 4 * self.delay
+
+    async def test_collect_fresh(self, mocker):
+        await self.collect(concurrency_limit=4)
+
+        get_weather = mocker.patch("clients.weather.WeatherClient.get_weather")
+        await self.collect(concurrency_limit=4)
+        # актуальные данные повторно не запрашиваются
+        get_weather.assert_not_called()
+
+    async def test_collect_sqlite(self, mocker, tmp_path):
+        mocker.patch("collectors.readers.WEATHER_STORAGE", "sqlite")
+        await self.collect(concurrency_limit=4)
+
+        # все данные сохраняются в одном файле (кроме скрытого файла блокировки)
+        assert [
+            path.name for path in tmp_path.iterdir() if not path.name.startswith(".")
+        ] == ["weather.sqlite3"]
+        for location in self.locations:
+            weather = await WeatherCollector.read(location)
+            assert weather.temp == 13.92
+            assert weather.description == "scattered clouds"
+
+        expires_in = await WeatherCollector().get_expires_in(self.locations)
+        assert all(value > 0 for value in expires_in.values())
+
+    async def test_collect_manifest(self, mocker, tmp_path):
+        await self.collect(concurrency_limit=4)
+        assert (tmp_path / ".weather.manifest").is_file()
+
+        # время обновления записей читается из манифеста без обхода хранилища
+        get_updated = mocker.spy(FileWeatherStorage, "get_updated")
+        get_weather = mocker.spy(WeatherClient, "get_weather")
+        await self.collect(concurrency_limit=4)
+        get_updated.assert_not_called()
+        get_weather.assert_not_called()
+
+        # при изменении хранилища без обновления манифеста он не используется
+        path = tmp_path / "weather" / "city0_xx.json"
+        path.unlink()
+        await self.collect(concurrency_limit=4)
+        get_updated.assert_called_once()
+        assert get_weather.call_count == 1
+        assert path.is_file()
+
+    async def test_collect_due(self, mocker):
+        collector = WeatherCollector(concurrency_limit=4)
+        await collector.collect(self.locations)
+
+        # обновляются только записи, время обновления которых наступило
+        queue = await collector.get_queue()
+        queue.update("city1_xx", 0)
+        get_updated = mocker.spy(FileWeatherStorage, "get_updated")
+        get_weather = mocker.spy(WeatherClient, "get_weather")
+        await collector.collect(self.locations)
+
+        get_weather.assert_called_once_with(mocker.ANY, "City1,XX")
+        get_updated.assert_not_called()
+        assert queue.get_expires_in("city1_xx", time.time()) > 0
+
+    async def test_collect_group_due(self, mocker):
+        locations = [
+            LocationDTO(capital=f"Capital{index}", alpha2code="XX")
+            for index in range(27)
+        ]
+        collector = WeatherCollector(concurrency_limit=4)
+        collector.cities = {
+            collector.get_filename(location): index
+            for index, location in enumerate(locations)
+        }
+        get_weather_group = mocker.patch.object(
+            collector.client,
+            "get_weather_group",
+            side_effect=lambda city_ids: {
+                city_id: {
+                    "id": city_id,
+                    "main": {"temp": 13.92, "pressure": 1023, "humidity": 54},
+                    "wind": {"speed": 4.63},
+                    "weather": [{"description": "scattered clouds"}],
+                }
+                for city_id in city_ids
+            },
+        )
+        get_weather = mocker.patch.object(collector.client, "get_weather")
+        clock = mocker.patch("collectors.collector.time")
+        ttl = await collector.get_cache_ttl()
+
+        # запуск каждую минуту в течение двух сроков актуальности
+        started = time.time()
+        for minute in range(2 * ttl // 60):
+            clock.time.return_value = now = started + minute * 60
+            await collector.collect_due(frozenset(locations))
+            queue = await collector.get_queue()
+            assert min(queue.updated.values()) > now - ttl
+
+        # групповые запросы заполняются ближайшими по времени обновления записями
+        get_weather.assert_not_called()
+        assert get_weather_group.call_count == 2 * 3
+
+    async def test_collect_group(self, mocker, aiohttp_server, tmp_path):
+        requests = []
+
+        def payload(city_id):
+            return {
+                "id": city_id,
+                "main": {"temp": float(city_id), "pressure": 1023, "humidity": 54},
+                "wind": {"speed": 4.63},
+                "weather": [{"description": "scattered clouds"}],
+            }
+
+        async def weather(request):
+            requests.append(request.path)
+            return web.json_response(payload(int(request.query["q"][4])))
+
+        async def group(request):
+            requests.append(request.path)
+            ids = [int(city_id) for city_id in request.query["id"].split(",")]
+            return web.json_response({"list": [payload(city_id) for city_id in ids]})
+
+        app = web.Application()
+        app.router.add_get("/weather", weather)
+        app.router.add_get("/group", group)
+        server = await aiohttp_server(app)
+        mocker.patch(
+            "clients.weather.WeatherClient.get_base_url",
+            return_value=str(server.make_url("/weather")),
+        )
+        mocker.patch("collectors.collector.WEATHER_GROUP_SIZE", 3)
+
+        # первое обновление определяет идентификаторы городов отдельными запросами
+        await self.collect(concurrency_limit=4)
+        assert requests == ["/weather"] * len(self.locations)
+
+        # следующие обновления выполняются групповыми запросами
+        requests.clear()
+        for path in (tmp_path / "weather").iterdir():
+            path.unlink()
+        await self.collect(concurrency_limit=4)
+        assert requests == ["/group"] * 3
+        for location in self.locations:
+            weather = await WeatherCollector.read(location)
+            assert weather.temp == int(location.capital[4])
+
+        # при ошибке группового запроса данные получаются отдельными запросами
+        mocker.patch(
+            "clients.weather.WeatherClient.get_weather_group", side_effect=RuntimeError
+        )
+        requests.clear()
+        for path in (tmp_path / "weather").iterdir():
+            path.unlink()
+        await self.collect(concurrency_limit=4)
+        assert requests == ["/weather"] * len(self.locations)
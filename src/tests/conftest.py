@@ -1,3 +1,113 @@
 """
 Фикстуры для моделей объектов.
 """
+
+import json
+
+import pytest
+
+from collectors.store import store
+from metrics import metrics
+from reader import Reader
+
+
+@pytest.fixture(autouse=True)
+def metrics_path(mocker, tmp_path):
+    """
+    Директория для файла с показателями работы вместо директории логов.
+    """
+
+    mocker.patch("metrics.LOGGING_PATH", str(tmp_path / "logs"))
+    metrics.clear()
+
+    yield tmp_path / "logs"
+    metrics.clear()
+
+
+@pytest.fixture
+def country_data():
+    return [
+        {
+            "capital": "Mariehamn",
+            "alpha2code": "AX",
+            "alt_spellings": ["AX", "Aaland", "Aland", "Ahvenanmaa"],
+            "currencies": [{"code": "EUR"}],
+            "flag": "http://assets.promptapi.com/flags/AX.svg",
+            "languages": [{"name": "Swedish", "native_name": "svenska"}],
+            "name": "Åland Islands",
+            "population": 28875,
+            "subregion": "Northern Europe",
+            "timezones": ["UTC+02:00"],
+        },
+        {
+            "capital": "Helsinki",
+            "alpha2code": "FI",
+            "alt_spellings": ["FI", "Suomi", "Republic of Finland"],
+            "currencies": [{"code": "EUR"}],
+            "flag": "http://assets.promptapi.com/flags/FI.svg",
+            "languages": [
+                {"name": "Finnish", "native_name": "suomi"},
+                {"name": "Swedish", "native_name": "svenska"},
+            ],
+            "name": "Finland",
+            "population": 5491817,
+            "subregion": "Northern Europe",
+            "timezones": ["UTC+02:00"],
+        },
+        {
+            "capital": "Stockholm",
+            "alpha2code": "SE",
+            "alt_spellings": ["SE", "Kingdom of Sweden", "Konungariket Sverige"],
+            "currencies": [{"code": "SEK"}],
+            "flag": "http://assets.promptapi.com/flags/SE.svg",
+            "languages": [{"name": "Swedish", "native_name": "svenska"}],
+            "name": "Sweden",
+            "population": 9894888,
+            "subregion": "Northern Europe",
+            "timezones": ["UTC+01:00"],
+        },
+    ]
+
+
+@pytest.fixture
+def currency_rates_data():
+    return {
+        "base": "RUB",
+        "date": "2022-09-14",
+        "rates": {"EUR": 0.016503, "SEK": 0.176, "USD": 0.016575},
+    }
+
+
+@pytest.fixture
+def weather_data():
+    return {
+        "main": {"temp": 13.92, "pressure": 1023, "humidity": 54},
+        "wind": {"speed": 4.63},
+        "weather": [{"description": "scattered clouds"}],
+    }
+
+
+@pytest.fixture
+def media_path(mocker, tmp_path, country_data, currency_rates_data, weather_data):
+    """
+    Директория с файлами кэша, заполненными тестовыми данными.
+    """
+
+    mocker.patch("collectors.readers.MEDIA_PATH", str(tmp_path))
+    mocker.patch("collectors.collector.COUNTRY_BLOCS", ["eu"])
+    store.clear()
+    Reader.cache.clear()
+
+    (tmp_path / "country.json").write_text(json.dumps(country_data))
+    (tmp_path / ".country.json.blocs").write_text(json.dumps(["eu"]))
+    (tmp_path / "country").mkdir()
+    (tmp_path / "country" / "eu.json").write_text(json.dumps(country_data))
+    (tmp_path / "currency_rates.json").write_text(json.dumps(currency_rates_data))
+    (tmp_path / "weather").mkdir()
+    for country in country_data:
+        filename = f"{country['capital']}_{country['alpha2code']}".lower()
+        (tmp_path / "weather" / f"{filename}.json").write_text(json.dumps(weather_data))
+
+    yield tmp_path
+    store.clear()
+    Reader.cache.clear()
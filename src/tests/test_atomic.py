@@ -0,0 +1,38 @@
+"""
+Тестирование атомарной записи файлов.
+"""
+
+import os
+import stat
+
+import pytest
+
+import atomic
+
+
+class TestAtomic:
+    """
+    Тестирование атомарной записи файлов.
+    """
+
+    def test_write_text(self, tmp_path):
+        file_path = tmp_path / "logs" / "metrics.json"
+        atomic.write_text(str(file_path), "{}")
+
+        assert file_path.read_text() == "{}"
+        assert stat.S_IMODE(file_path.stat().st_mode) == atomic.FILE_MODE
+        # временные файлы не остаются в директории
+        assert os.listdir(file_path.parent) == ["metrics.json"]
+
+    def test_open_atomic_error(self, tmp_path):
+        file_path = tmp_path / "snapshot.tar.gz"
+        file_path.write_bytes(b"old")
+
+        with pytest.raises(RuntimeError):
+            with atomic.open_atomic(str(file_path)) as file:
+                file.write(b"new")
+                raise RuntimeError
+
+        # при ошибке прежнее содержимое файла сохраняется
+        assert file_path.read_bytes() == b"old"
+        assert os.listdir(tmp_path) == ["snapshot.tar.gz"]
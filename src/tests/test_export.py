@@ -0,0 +1,79 @@
+"""
+Тестирование выгрузки информации обо всех собранных странах.
+"""
+
+import csv
+import json
+
+import pytest
+
+from export import export, render_chunk
+from reader import Reader
+from renderer import Renderer
+
+
+@pytest.mark.asyncio
+class TestExport:
+    """
+    Тестирование выгрузки справочника в файл.
+    """
+
+    @pytest.fixture(autouse=True)
+    def cpu_count(self, mocker):
+        # пул процессов используется независимо от количества процессоров
+        mocker.patch("export.os.cpu_count", return_value=4)
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    async def test_export_json(self, media_path, tmp_path, workers):
+        file_path = tmp_path / "report.jsonl"
+
+        assert await export(str(file_path), "json", workers, chunk_size=2) == 3
+
+        # порядок стран сохраняется при форматировании в нескольких процессах
+        items = [json.loads(line) for line in file_path.read_text().splitlines()]
+        assert [item["location"]["alpha2code"] for item in items] == ["AX", "FI", "SE"]
+        assert list(items[2]["currency_rates"]) == ["SEK"]
+
+    async def test_export_csv(self, media_path, tmp_path):
+        file_path = tmp_path / "report.csv"
+
+        await export(str(file_path), "csv", workers=2, chunk_size=1)
+
+        with open(file_path, newline="") as file:
+            rows = list(csv.reader(file))
+        assert rows[0] == list(Renderer.ROW_HEADER)
+        assert [row[0] for row in rows[1:]] == ["AX", "FI", "SE"]
+        assert rows[2][5] == "5.491.817"
+
+    async def test_export_text(self, media_path, tmp_path):
+        file_path = tmp_path / "report.txt"
+
+        await export(str(file_path), "text", workers=0)
+
+        location_info = await Reader().find("Helsinki")
+        blocks = file_path.read_text().split("\n\n")
+        assert blocks[1].splitlines() == list(await Renderer(location_info).render())
+
+    async def test_export_missing_weather(self, media_path, tmp_path):
+        (media_path / "weather" / "helsinki_fi.json").unlink()
+        file_path = tmp_path / "report.jsonl"
+
+        # страны без данных о погоде пропускаются
+        assert await export(str(file_path), "json", workers=0) == 2
+        assert len(file_path.read_text().splitlines()) == 2
+
+    async def test_render_chunk(self, media_path):
+        location_info = await Reader().find("Stockholm")
+        lines = await Renderer(location_info).render()
+
+        assert render_chunk([location_info], "text") == "\n".join(lines) + "\n\n"
+        assert render_chunk([location_info], "csv").startswith("SE,Sweden,Stockholm,")
+        assert render_chunk([], "csv") == ""
+
+    async def test_export_single_cpu(self, media_path, tmp_path, mocker):
+        mocker.patch("export.os.cpu_count", return_value=1)
+        pool = mocker.patch("export.ProcessPoolExecutor")
+
+        # на одном процессоре данные форматируются без пула процессов
+        assert await export(str(tmp_path / "report.txt"), "text", workers=4) == 3
+        pool.assert_not_called()
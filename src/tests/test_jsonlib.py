@@ -0,0 +1,76 @@
+"""
+Тестирование функций для работы с JSON.
+"""
+
+import pytest
+
+import jsonlib
+from collectors.models import CurrencyInfoDTO, json_default
+
+
+class TestJSONLib:
+    """
+    Тестирование разбора, сериализации и проверки JSON.
+    """
+
+    @pytest.fixture(params=[True, False], ids=["orjson", "json"])
+    def backend(self, request, mocker):
+        # проверка работы как с пакетом orjson, так и без него
+        if not request.param:
+            mocker.patch("jsonlib.orjson", None)
+
+    def test_loads(self, backend):
+        assert jsonlib.loads(b'{"a": [1, 2.5, "\\u0444"]}') == {"a": [1, 2.5, "ф"]}
+        assert jsonlib.loads('["ф"]') == ["ф"]
+
+        with pytest.raises(ValueError):
+            jsonlib.loads('[{"a": 1')
+
+    def test_dumps(self, backend):
+        content = jsonlib.dumps(
+            {"currencies": {CurrencyInfoDTO(code="EUR")}}, default=json_default
+        )
+
+        assert isinstance(content, str)
+        assert jsonlib.loads(content) == {"currencies": [{"code": "EUR"}]}
+
+    @pytest.mark.parametrize(
+        "chunks,valid",
+        [
+            ([b' [{"a": ', b"1}, ", b'{"b": 2}]\n'], True),
+            ([b'{"rates": {"EUR": ', b"0.016} }"], True),
+            ([b"[", b"", b"1]"], True),
+            ([b'[{"a": 1}', b', {"b": '], False),
+            ([b"<html>Error</html>"], False),
+            ([b"[]"], True),
+            ([b" {}\n"], True),
+            ([b"null"], False),
+            ([b'{"a": 1]'], False),
+            ([], False),
+        ],
+    )
+    def test_stream_check(self, backend, chunks, valid):
+        check = jsonlib.JSONStreamCheck()
+        for chunk in chunks:
+            check.feed(chunk)
+
+        assert check.is_valid() is valid
+
+    @pytest.mark.parametrize(
+        "content,valid",
+        [
+            (b'[{"a":1},{"b":2}]', True),
+            (b'[{"a":1},{"b":]', False),
+            (b"[" + b'{"code": "EUR"}, ' * 100 + b'{"code": ]', False),
+            (b"{}", False),
+            (b"<html>Error</html>", False),
+        ],
+    )
+    def test_check_file(self, backend, tmp_path, content, valid):
+        file_path = tmp_path / "data.json"
+        file_path.write_bytes(content)
+
+        assert jsonlib.check_file(str(file_path)) is valid
+
+    def test_check_file_missing(self, tmp_path):
+        assert not jsonlib.check_file(str(tmp_path / "missing.json"))
@@ -0,0 +1,101 @@
+"""
+Тестирование запуска консольного приложения.
+"""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from main import process_batch
+
+# директория с исходным кодом приложения
+SOURCE_PATH = Path(__file__).parents[1]
+
+
+def get_imported_modules(module: str) -> set[str]:
+    """
+    Получение модулей, загружаемых при импорте модуля в новом процессе
+    (по выводу ``python -X importtime``).
+
+    :param module: Название модуля
+    :return:
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SOURCE_PATH,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+class TestStartup:
+    """
+    Тестирование модулей, загружаемых при поиске информации.
+    """
+
+    @pytest.mark.parametrize("module", ["main", "reader"])
+    def test_lookup_imports(self, module):
+        modules = get_imported_modules(module)
+
+        # поиск не загружает клиентов внешних сервисов и модули сбора данных
+        assert "reader" in modules
+        assert "collectors.readers" in modules
+        assert not modules & {
+            "aiohttp",
+            "clients.base",
+            "collectors.base",
+            "collectors.collector",
+            "logger",
+        }
+
+    def test_collect_imports(self):
+        modules = get_imported_modules("collectors.collector")
+
+        assert {"aiohttp", "clients.base", "collectors.readers"} <= modules
+
+
+@pytest.mark.asyncio
+class TestBatch:
+    """
+    Тестирование пакетного поиска.
+    """
+
+    async def test_streaming(self, media_path, mocker):
+        printed = threading.Event()
+        results = []
+
+        async def output(search, location_info, output_format, show_search=False):
+            results.append((search, location_info.location.alpha2code))
+            printed.set()
+
+        mocker.patch("main.output", side_effect=output)
+
+        class Pipe:
+            """
+            Ввод, следующая строка которого поступает только после вывода результата.
+            """
+
+            lines = ["Helsinki\n", "\n", "Stockholm\n"]
+
+            def readline(self):
+                if not self.lines:
+                    return ""
+                if len(self.lines) == 1:
+                    assert printed.wait(5), "поиск не начат до окончания ввода"
+                return self.lines.pop(0)
+
+        await process_batch(Pipe(), "json", concurrency=2)
+
+        # пустые строки пропускаются
+        assert results == [("Helsinki", "FI"), ("Stockholm", "SE")]
@@ -0,0 +1,128 @@
+"""
+Тестирование функций сбора показателей работы.
+"""
+
+import json
+import os
+
+import pytest
+from aiohttp import web
+
+from clients.base import BaseClient
+from clients.weather import WeatherClient
+from collectors.collector import CurrencyRatesCollector
+from metrics import Metrics, metrics
+
+
+@pytest.mark.asyncio
+class TestMetrics:
+    """
+    Тестирование хранилища показателей и их выгрузки.
+    """
+
+    @pytest.fixture
+    def collected(self):
+        collected = Metrics()
+        collected.inc("cache_lookups_total", collector="Country", result="hit")
+        collected.inc("cache_lookups_total", 2, collector="Country", result="hit")
+        collected.observe("collector_duration_seconds", 0.5, collector="Country")
+        collected.observe("collector_duration_seconds", 1.5, collector="Country")
+
+        return collected
+
+    async def test_snapshot(self, collected):
+        snapshot = collected.snapshot()
+
+        assert snapshot["counters"] == [
+            {
+                "name": "cache_lookups_total",
+                "labels": {"collector": "Country", "result": "hit"},
+                "value": 3,
+            }
+        ]
+        assert snapshot["timers"] == [
+            {
+                "name": "collector_duration_seconds",
+                "labels": {"collector": "Country"},
+                "count": 2,
+                "sum": 2.0,
+                "max": 1.5,
+            }
+        ]
+
+    async def test_to_prometheus(self, collected):
+        collected.inc("http_request_errors_total", error='Bad "quoted"')
+
+        assert collected.to_prometheus().splitlines() == [
+            "# TYPE cache_lookups_total counter",
+            'cache_lookups_total{collector="Country",result="hit"} 3',
+            "# TYPE http_request_errors_total counter",
+            'http_request_errors_total{error="Bad \\"quoted\\""} 1',
+            "# TYPE collector_duration_seconds summary",
+            'collector_duration_seconds_count{collector="Country"} 2',
+            'collector_duration_seconds_sum{collector="Country"} 2.0',
+        ]
+
+    @pytest.mark.parametrize(
+        "metrics_format,filename",
+        [("json", "metrics.json"), ("prometheus", "metrics.prom"), ("none", None)],
+    )
+    async def test_export(
+        self, mocker, metrics_path, collected, metrics_format, filename
+    ):
+        mocker.patch("metrics.METRICS_FORMAT", metrics_format)
+
+        file_path = await collected.export()
+        if filename is None:
+            assert file_path is None
+            assert not metrics_path.exists()
+        else:
+            assert file_path == str(metrics_path / filename)
+            assert os.listdir(metrics_path) == [filename]
+
+    async def test_collect(self, media_path, metrics_path, mocker):
+        mocker.patch("metrics.METRICS_FORMAT", "json")
+        os.utime(media_path / "currency_rates.json", (0, 0))
+        mocker.patch(
+            "clients.currency.CurrencyClient.download_rates", return_value=False
+        )
+
+        collector = CurrencyRatesCollector()
+        await collector.collect()
+        await collector.collect()
+        await metrics.export()
+
+        snapshot = json.loads((metrics_path / "metrics.json").read_text())
+        assert snapshot["counters"] == [
+            {
+                "name": "cache_lookups_total",
+                "labels": {"collector": "CurrencyRatesCollector", "result": "stale"},
+                "value": 2,
+            }
+        ]
+        assert snapshot["timers"][0]["name"] == "collector_duration_seconds"
+        assert snapshot["timers"][0]["count"] == 2
+
+    async def test_http_requests(self, aiohttp_server, mocker, unused_tcp_port):
+        mocker.patch("clients.base.HTTP_RETRIES", 0)
+        mocker.patch("clients.weather.WeatherClient.rate_limit", 0)
+
+        async def handler(request):
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        server = await aiohttp_server(app)
+
+        try:
+            await WeatherClient()._fetch(str(server.make_url("/")))
+            await WeatherClient()._fetch(f"http://127.0.0.1:{unused_tcp_port}/")
+        finally:
+            await BaseClient.close_session()
+
+        timers = metrics.timers["http_request_duration_seconds"]
+        assert timers[(("host", "127.0.0.1"), ("status", "200"))][0] == 1
+        assert timers[(("host", "127.0.0.1"), ("status", "error"))][0] == 1
+        assert metrics.counters["http_request_errors_total"] == {
+            (("error", "ClientConnectorError"), ("host", "127.0.0.1")): 1
+        }
@@ -1,3 +1,106 @@
 """
 Тестирование функций поиска (чтения) собранной информации в файлах.
 """
+
+import json
+import os
+import time
+
+import pytest
+
+from collectors.collector import CountryCollector
+from collectors.models import CurrencyInfoDTO
+from collectors.store import ResultCache
+from collectors.weather_storage import SQLiteWeatherStorage
+from reader import Reader
+
+
+@pytest.mark.asyncio
+class TestReader:
+    """
+    Тестирование чтения сохраненных данных.
+    """
+
+    @pytest.mark.parametrize(
+        "search,alpha2code",
+        [("SE", "SE"), ("Helsinki", "FI"), ("Helsinky", "FI"), ("Aaland", "AX")],
+    )
+    async def test_find_country(self, media_path, search, alpha2code):
+        country = await Reader().find_country(search)
+        assert country.alpha2code == alpha2code
+
+    async def test_find_country_missing(self, media_path):
+        assert await Reader().find_country("Atlantis") is None
+
+    async def test_find(self, media_path):
+        location_info = await Reader().find("Stockholm")
+
+        assert location_info.location.name == "Sweden"
+        assert location_info.weather.temp == 13.92
+        assert location_info.currency_rates == {"SEK": pytest.approx(1 / 0.176)}
+
+    @pytest.mark.parametrize("weather_storage", ["files", "sqlite"])
+    async def test_find_weather_missing(
+        self, media_path, weather_data, mocker, weather_storage
+    ):
+        mocker.patch("collectors.readers.WEATHER_STORAGE", weather_storage)
+        (media_path / "weather" / "helsinki_fi.json").unlink()
+        await SQLiteWeatherStorage(str(media_path / "weather.sqlite3")).save(
+            {"stockholm_se": weather_data}
+        )
+
+        # отсутствие данных о погоде для страны одинаково обрабатывается хранилищами
+        assert (await Reader().find("Stockholm")).weather.temp == 13.92
+        with pytest.raises(FileNotFoundError):
+            await Reader().find("Helsinki")
+
+    async def test_get_currency_rates_base(self, media_path):
+        currencies = {CurrencyInfoDTO(code="SEK"), CurrencyInfoDTO(code="EUR")}
+
+        # пересчет курсов относительно валюты, отличной от базовой валюты данных
+        assert await Reader.get_currency_rates(currencies, base="EUR") == {
+            "SEK": pytest.approx(0.016503 / 0.176),
+            "EUR": pytest.approx(1),
+        }
+
+    async def test_find_cached(self, media_path, mocker):
+        find_country = mocker.spy(Reader, "find_country")
+
+        first = await Reader().find("Stockholm")
+        # строки, совпадающие после нормализации, используют один результат
+        assert await Reader().find("  stockholm ") is first
+        assert await Reader().find("Atlantis") is None
+        assert await Reader().find("atlantis") is None
+
+        assert find_country.call_count == 2
+        assert (Reader.cache.hits, Reader.cache.misses) == (2, 2)
+
+    async def test_find_cached_invalidated(self, media_path, weather_data):
+        first = await Reader().find("Stockholm")
+
+        # изменение данных о погоде для найденной страны сбрасывает результат
+        file_path = media_path / "weather" / "stockholm_se.json"
+        weather_data["main"]["temp"] = 1.5
+        file_path.write_text(json.dumps(weather_data))
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = await Reader().find("Stockholm")
+        assert second is not first
+        assert second.weather.temp == 1.5
+
+    async def test_result_cache(self, media_path, mocker):
+        cache = ResultCache(maxsize=2, ttl=60)
+        dependencies = {str(media_path / "country.json"): 100}
+        await CountryCollector.read()
+
+        for key in ("a", "b", "c"):
+            cache.put(key, key.upper(), dependencies)
+
+        # удаляется результат, который дольше всего не запрашивался
+        assert await cache.get("a") is None
+        assert await cache.get("c") == "C"
+
+        # результат не хранится дольше срока актуальности данных
+        mocker.patch("time.time", return_value=time.time() + 101)
+        assert await cache.get("c") is None
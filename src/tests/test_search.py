@@ -0,0 +1,95 @@
+"""
+Тестирование функций нечеткого поиска стран.
+"""
+
+import pytest
+
+from collectors.models import CountryDTO
+from search import CountrySearch, normalize
+
+
+class TestCountrySearch:
+    """
+    Тестирование поиска страны.
+    """
+
+    @pytest.fixture
+    def search(self, country_data):
+        return CountrySearch([CountryDTO(**item) for item in country_data])
+
+    def test_normalize(self):
+        assert normalize("  Republic   of  FINLAND ") == "republic of finland"
+
+    @pytest.mark.parametrize(
+        "query,alpha2code",
+        [
+            # точное совпадение
+            ("Helsinki", "FI"),
+            # вхождение строки
+            ("sverige", "SE"),
+            ("hvenan", "AX"),
+            # опечатки
+            ("Helsinky", "FI"),
+            ("Stokholm", "SE"),
+            ("weather in Mariehamm", "AX"),
+        ],
+    )
+    def test_find(self, search, query, alpha2code):
+        assert search.find(query).alpha2code == alpha2code
+
+    @pytest.mark.parametrize("query", ["", "   ", "Atlantis", "qz"])
+    def test_find_missing(self, search, query):
+        assert search.find(query) is None
+
+    @pytest.fixture
+    def capitals(self):
+        return CountrySearch(
+            [
+                CountryDTO.construct(capital=capital, alt_spellings=alt_spellings)
+                for capital, alt_spellings in (
+                    ("Rome", ["IT", "Italia"]),
+                    ("Riga", ["LV", "Latvija"]),
+                    ("Oslo", ["NO", "Norge"]),
+                )
+            ]
+        )
+
+    @pytest.mark.parametrize(
+        "query,capital",
+        [
+            # опечатки в коротких названиях без общих триграмм с ними
+            ("Rone", "Rome"),
+            ("Rixa", "Riga"),
+            ("Rima", "Riga"),
+            # схожесть с двухбуквенными написаниями
+            ("lva", "Riga"),
+            ("ita", "Rome"),
+        ],
+    )
+    def test_find_short(self, capitals, query, capital):
+        assert capitals.find(query).capital == capital
+
+    def test_find_consistent(self, capitals):
+        # поиск по индексу находит страну тогда же, когда и сравнение со всеми странами
+        for query in ("Rone", "Rixa", "Osla", "Nor", "Lat", "Xyz", "Ri", "I", "Qq"):
+            found = capitals.find(query)
+            matched = [
+                country
+                for country in capitals.countries
+                if CountrySearch.match(query, country)
+            ]
+            assert (found is None) == (not matched)
+            assert found is None or found in matched
+
+    def test_find_best_match(self, search):
+        # "Aland" является точным совпадением для AX и лишь похоже на "Finland"
+        assert search.find("aland").alpha2code == "AX"
+        # вхождение строки приоритетнее нечеткого совпадения
+        assert search.find("Republic of").alpha2code == "FI"
+
+    @pytest.mark.parametrize(
+        "query,expected",
+        [("Stockholm", True), ("Stokholm", True), ("sverige", True), ("Oslo", False)],
+    )
+    def test_match(self, search, query, expected):
+        assert CountrySearch.match(query, search.countries[2]) is expected
@@ -0,0 +1,113 @@
+"""
+Тестирование HTTP-сервиса для поиска информации о странах.
+"""
+
+import json
+import os
+
+import pytest
+
+from collectors.store import store
+from collectors.weather_storage import SQLiteWeatherStorage
+from metrics import metrics
+from server import create_app
+
+
+@pytest.mark.asyncio
+class TestServer:
+    """
+    Тестирование обработки запросов HTTP-сервиса.
+    """
+
+    @pytest.fixture
+    async def client(self, aiohttp_client):
+        client = await aiohttp_client(create_app(reload_interval=0))
+
+        yield client
+        store.check_interval = 0
+
+    async def test_lookup(self, media_path, client):
+        response = await client.get("/lookup", params={"q": "Stockholm"})
+        assert response.status == 200
+
+        result = await response.json()
+        assert result["location"]["alpha2code"] == "SE"
+        assert result["weather"]["temp"] == 13.92
+        assert result["currency_rates"] == {"SEK": pytest.approx(1 / 0.176)}
+
+    @pytest.mark.parametrize("params,status", [({}, 400), ({"q": "Atlantis"}, 404)])
+    async def test_lookup_error(self, media_path, client, params, status):
+        response = await client.get("/lookup", params=params)
+        assert response.status == status
+        assert "error" in await response.json()
+
+    async def test_country(self, media_path, client):
+        response = await client.get("/country/fi")
+        assert response.status == 200
+        assert (await response.json())["location"]["capital"] == "Helsinki"
+
+        response = await client.get("/country/XX")
+        assert response.status == 404
+
+    async def test_countries(self, media_path, client):
+        response = await client.get(
+            "/countries",
+            params={"subregion": "northern europe", "min_population": "1000000"},
+        )
+        assert response.status == 200
+        assert [item["alpha2code"] for item in await response.json()] == ["FI", "SE"]
+
+        response = await client.get("/countries", params={"min_population": "many"})
+        assert response.status == 400
+
+    async def test_metrics(self, media_path, tmp_path, client):
+        metrics.clear()
+        await client.get("/lookup", params={"q": "Stockholm"})
+        await client.get("/lookup", params={"q": "stockholm"})
+
+        # попадания в кэш результатов поиска доступны для сбора показателей
+        response = await client.get("/metrics")
+        assert response.status == 200
+        text = await response.text()
+        assert 'result_cache_total{result="hit"} 1' in text
+        assert 'result_cache_total{result="miss"} 1' in text
+
+        # при остановке сервиса показатели сохраняются в директорию логов
+        await client.close()
+        assert (tmp_path / "logs" / "metrics.json").is_file()
+
+    async def test_missing_data(self, tmp_path, mocker, client):
+        mocker.patch("collectors.readers.MEDIA_PATH", str(tmp_path / "missing"))
+        store.clear()
+
+        response = await client.get("/country/FI")
+        assert response.status == 503
+
+    async def test_missing_weather(self, media_path, weather_data, mocker, client):
+        mocker.patch("collectors.readers.WEATHER_STORAGE", "sqlite")
+        await SQLiteWeatherStorage(str(media_path / "weather.sqlite3")).save(
+            {"stockholm_se": weather_data}
+        )
+
+        assert (await client.get("/country/SE")).status == 200
+        response = await client.get("/country/FI")
+        assert response.status == 503
+
+    async def test_reload(self, media_path, client, country_data):
+        assert (await client.get("/country/SE")).status == 200
+
+        # обновление файла сборщиком применяется без перезапуска сервиса
+        file_path = media_path / "country.json"
+        file_path.write_text(json.dumps(country_data[:1]))
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert (await client.get("/country/SE")).status == 404
+
+    async def test_reload_interval(self, media_path, client, country_data):
+        store.check_interval = 60
+        assert (await client.get("/country/SE")).status == 200
+
+        # в пределах интервала данные возвращаются без проверки изменения файла
+        (media_path / "country.json").write_text(json.dumps(country_data[:1]))
+        assert (await client.get("/country/SE")).status == 200
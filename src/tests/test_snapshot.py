@@ -0,0 +1,143 @@
+"""
+Тестирование упаковки и загрузки снимка файлов кэша.
+"""
+
+import io
+import json
+import os
+import sqlite3
+import tarfile
+
+import pytest
+
+import atomic
+from collectors.collector import CountryCollector, WeatherCollector
+from collectors.models import LocationDTO
+from collectors.storage import SQLiteCountryStorage
+from reader import Reader
+from snapshot import MANIFEST_NAME, load, pack
+
+
+class TestSnapshot:
+    """
+    Тестирование снимка файлов кэша.
+    """
+
+    @pytest.fixture
+    def snapshot_path(self, media_path, tmp_path_factory):
+        (media_path / ".currency_rates.json.validators").write_text("{}")
+        (media_path / ".weather.lock").write_text("")
+        os.utime(media_path / "country.json", ns=(10**18, 10**18 + 123))
+
+        file_path = tmp_path_factory.mktemp("snapshot") / "media.tar.gz"
+        assert pack(str(media_path), str(file_path)) == 8
+
+        return file_path
+
+    def test_load(self, media_path, snapshot_path, tmp_path_factory, mocker):
+        directory = tmp_path_factory.mktemp("replica")
+        # на диск сбрасываются только загружаемые файлы, а не все файловые системы
+        mocker.patch("os.sync", side_effect=AssertionError)
+        fsync_path = mocker.spy(atomic, "fsync_path")
+
+        assert load(str(snapshot_path), str(directory)) == 8
+        assert fsync_path.call_count == 8 + 3
+
+        # содержимое и время изменения файлов совпадают, файлы блокировок не упаковываются
+        for name in ("country.json", "weather/helsinki_fi.json", "country/eu.json"):
+            assert (directory / name).read_bytes() == (media_path / name).read_bytes()
+            assert (directory / name).stat().st_mtime_ns == (
+                media_path / name
+            ).stat().st_mtime_ns
+        assert (directory / ".currency_rates.json.validators").exists()
+        assert not (directory / ".weather.lock").exists()
+        assert (directory / "weather").stat().st_mtime_ns == (
+            media_path / "weather"
+        ).stat().st_mtime_ns
+        assert not list(directory.glob(".snapshot.*"))
+
+    @pytest.mark.asyncio
+    async def test_load_warm(self, media_path, snapshot_path, mocker):
+        for path in media_path.glob("weather/*.json"):
+            path.unlink()
+        Reader.cache.clear()
+
+        load(str(snapshot_path), str(media_path))
+
+        # загруженные данные актуальны и не запрашиваются повторно
+        collector = WeatherCollector()
+        fetch = mocker.patch.object(collector, "fetch", return_value={})
+        await collector.collect_due(
+            frozenset(
+                LocationDTO(capital=capital, alpha2code=alpha2code)
+                for capital, alpha2code in (("Helsinki", "FI"), ("Stockholm", "SE"))
+            )
+        )
+        fetch.assert_called_once_with({})
+        assert (await Reader().find("Helsinki")).weather
+
+    @pytest.mark.asyncio
+    async def test_sqlite(self, media_path, country_data, tmp_path_factory):
+        countries = [CountryCollector.validate_country(item) for item in country_data]
+        storage = SQLiteCountryStorage(str(media_path / "country.sqlite3"))
+        await storage.save(countries[:1])
+        # пока база данных открыта другим процессом, изменения остаются в журнале WAL
+        connection = sqlite3.connect(storage.get_path())
+        connection.execute("SELECT count(*) FROM country").fetchone()
+        await storage.save(countries)
+        assert (media_path / "country.sqlite3-wal").stat().st_size
+
+        file_path = tmp_path_factory.mktemp("snapshot") / "media.tar.gz"
+        try:
+            pack(str(media_path), str(file_path))
+        finally:
+            connection.close()
+        directory = tmp_path_factory.mktemp("replica")
+        load(str(file_path), str(directory))
+
+        assert not (directory / "country.sqlite3-wal").exists()
+        replica = SQLiteCountryStorage(str(directory / "country.sqlite3"))
+        assert len(await replica.filter("Northern Europe")) == 3
+
+    def test_load_invalid(self, media_path, snapshot_path, tmp_path):
+        with tarfile.open(snapshot_path, "r:gz") as archive:
+            members = [
+                (member, archive.extractfile(member).read()) for member in archive
+            ]
+
+        broken_path = tmp_path / "broken.tar.gz"
+        with tarfile.open(broken_path, "w:gz") as archive:
+            for member, content in members:
+                if member.name == "country.json":
+                    content = b"[]"
+                    member.size = len(content)
+                archive.addfile(member, io.BytesIO(content))
+
+        original = (media_path / "country.json").read_bytes()
+
+        # при несовпадении хэшей файлы кэша не изменяются
+        with pytest.raises(ValueError):
+            load(str(broken_path), str(media_path))
+        assert (media_path / "country.json").read_bytes() == original
+        assert not list(media_path.glob(".snapshot.*"))
+
+    def test_load_unsupported(self, media_path, tmp_path):
+        file_path = tmp_path / "future.tar.gz"
+        content = json.dumps({"format": 2, "files": {}, "directories": {}}).encode()
+        with tarfile.open(file_path, "w:gz") as archive:
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+
+        with pytest.raises(ValueError):
+            load(str(file_path), str(media_path))
+
+    def test_load_unsafe_path(self, media_path, tmp_path):
+        file_path = tmp_path / "unsafe.tar.gz"
+        with tarfile.open(file_path, "w:gz") as archive:
+            info = tarfile.TarInfo("../outside.json")
+            archive.addfile(info, io.BytesIO(b""))
+
+        with pytest.raises(ValueError):
+            load(str(file_path), str(media_path))
+        assert not (media_path.parent / "outside.json").exists()